@@ -0,0 +1,40 @@
+"""Add profile_descriptions, the self-description cache
+
+Revision ID: a9d3e5b7c1f2
+Revises: f2a8c6d0e4b1
+Create Date: 2026-10-17 14:02:13.508211
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d3e5b7c1f2'
+down_revision: Union[str, None] = 'f2a8c6d0e4b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'profile_descriptions',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('tenant', sa.String(), nullable=False),
+        sa.Column('prompt_version', sa.String(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['tenant'], ['tenants.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('tenant', 'prompt_version', name='uq_profile_description_tenant_prompt'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('profile_descriptions')
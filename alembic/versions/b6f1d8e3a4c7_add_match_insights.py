@@ -0,0 +1,44 @@
+"""Add match_insights, the AI insight cache
+
+Revision ID: b6f1d8e3a4c7
+Revises: a9d3e5b7c1f2
+Create Date: 2026-10-17 16:20:05.731904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6f1d8e3a4c7'
+down_revision: Union[str, None] = 'a9d3e5b7c1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'match_insights',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('viewer', sa.String(), nullable=False),
+        sa.Column('candidate', sa.String(), nullable=False),
+        sa.Column('query', sa.String(), nullable=False),
+        sa.Column('profile_hash', sa.String(), nullable=False),
+        sa.Column('insight', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['viewer'], ['tenants.id'], ),
+        sa.ForeignKeyConstraint(['candidate'], ['tenants.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('viewer', 'candidate', 'query', name='uq_match_insight_viewer_candidate_query'),
+    )
+    op.create_index(op.f('ix_match_insights_viewer'), 'match_insights', ['viewer'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_match_insights_viewer'), table_name='match_insights')
+    op.drop_table('match_insights')
@@ -0,0 +1,43 @@
+"""Add daily_recommendations, the precomputed daily feed
+
+Revision ID: c2a7e9f4b1d5
+Revises: b6f1d8e3a4c7
+Create Date: 2026-10-17 16:24:41.208317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2a7e9f4b1d5'
+down_revision: Union[str, None] = 'b6f1d8e3a4c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'daily_recommendations',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('tenant', sa.String(), nullable=False),
+        sa.Column('candidate', sa.String(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('ai_insight', sa.Text(), nullable=True),
+        sa.Column('feed_date', sa.Date(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['tenant'], ['tenants.id'], ),
+        sa.ForeignKeyConstraint(['candidate'], ['tenants.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_daily_recommendations_tenant_rank', 'daily_recommendations', ['tenant', 'rank'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_daily_recommendations_tenant_rank', table_name='daily_recommendations')
+    op.drop_table('daily_recommendations')
@@ -0,0 +1,42 @@
+"""Add profile_decisions, profiles excluded from recommendations
+
+Revision ID: d8b3f5a2c6e9
+Revises: c2a7e9f4b1d5
+Create Date: 2026-10-17 16:31:17.640952
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8b3f5a2c6e9'
+down_revision: Union[str, None] = 'c2a7e9f4b1d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'profile_decisions',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('tenant', sa.String(), nullable=False),
+        sa.Column('candidate', sa.String(), nullable=False),
+        sa.Column('decision', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.CheckConstraint("decision IN ('declined', 'archived', 'matched')", name='check_profile_decision'),
+        sa.ForeignKeyConstraint(['tenant'], ['tenants.id'], ),
+        sa.ForeignKeyConstraint(['candidate'], ['tenants.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('tenant', 'candidate', name='uq_profile_decision_tenant_candidate'),
+    )
+    op.create_index(op.f('ix_profile_decisions_tenant'), 'profile_decisions', ['tenant'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_profile_decisions_tenant'), table_name='profile_decisions')
+    op.drop_table('profile_decisions')
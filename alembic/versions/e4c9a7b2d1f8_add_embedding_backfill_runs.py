@@ -0,0 +1,46 @@
+"""Add embedding_backfill_runs, checkpoints of resumable backfills
+
+Revision ID: e4c9a7b2d1f8
+Revises: d8b3f5a2c6e9
+Create Date: 2026-10-17 16:38:52.917430
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4c9a7b2d1f8'
+down_revision: Union[str, None] = 'd8b3f5a2c6e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'embedding_backfill_runs',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('only_dirty', sa.Boolean(), nullable=False),
+        sa.Column('batch_size', sa.Integer(), nullable=False),
+        sa.Column('window', sa.Integer(), nullable=False),
+        sa.Column('last_tenant_id', sa.String(), nullable=True),
+        sa.Column('processed', sa.Integer(), nullable=False),
+        sa.Column('embedded', sa.Integer(), nullable=False),
+        sa.Column('unchanged', sa.Integer(), nullable=False),
+        sa.Column('failed', sa.Integer(), nullable=False),
+        sa.Column('elapsed_seconds', sa.Float(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.CheckConstraint("status IN ('running', 'completed', 'failed')", name='check_embedding_backfill_status'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('embedding_backfill_runs')
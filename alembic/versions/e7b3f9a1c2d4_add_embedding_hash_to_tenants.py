@@ -0,0 +1,32 @@
+"""Add embedded_version and embedding_hash to Tenant model
+
+Revision ID: e7b3f9a1c2d4
+Revises: c4e7a1d2b9f0
+Create Date: 2026-10-17 11:02:19.604512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3f9a1c2d4'
+down_revision: Union[str, None] = 'c4e7a1d2b9f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tenants', sa.Column('embedded_version', sa.Integer(), nullable=True))
+    op.add_column('tenants', sa.Column('embedding_hash', sa.String(length=64), nullable=True))
+    # Existing embeddings count as current; only later edits make a tenant dirty
+    op.execute("UPDATE tenants SET embedded_version = profile_version WHERE embedding_id IS NOT NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tenants', 'embedding_hash')
+    op.drop_column('tenants', 'embedded_version')
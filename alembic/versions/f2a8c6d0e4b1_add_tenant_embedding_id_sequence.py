@@ -0,0 +1,30 @@
+"""Add a sequence for Tenant.embedding_id
+
+Revision ID: f2a8c6d0e4b1
+Revises: e7b3f9a1c2d4
+Create Date: 2026-10-17 12:26:51.317840
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a8c6d0e4b1'
+down_revision: Union[str, None] = 'e7b3f9a1c2d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.schema.CreateSequence(sa.Sequence('tenant_embedding_id_seq')))
+    # Continue after the ids handed out by the old max(embedding_id) + 1 scheme
+    op.execute("SELECT setval('tenant_embedding_id_seq', COALESCE((SELECT MAX(embedding_id) FROM tenants), 0) + 1, false)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(sa.schema.DropSequence(sa.Sequence('tenant_embedding_id_seq')))
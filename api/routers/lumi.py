@@ -7,5 +7,5 @@ router = APIRouter()
 @router.post("/chat/")
 async def lumi_endpoint(query: str):
     lumi = AICoachingSystem()
-    response = lumi.process_message(query)
+    response = await lumi.aprocess_message(query)
     return {"LumiAI": response}
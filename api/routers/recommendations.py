@@ -1,104 +1,276 @@
 import asyncio
-from typing import List
+import json
+import os
+from typing import Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.exc import SQLAlchemyError
-from elinity_ai.milvus_db import MilvusUserSimilarityPipeline
 from models.user import Tenant
 from schemas.user import RecommendedUserSchema, TenantSchema
-from database.session import get_db
+from database.session import get_db, Session as SessionLocal
 from utils.token import get_current_user
-from elinity_ai.milvus_db import milvus_db
+from elinity_ai.milvus_db import get_query_embedding, normalize_query
+from elinity_ai.vector_store import get_vector_store
 from elinity_ai.insights import ElinityInsights
+from services.insight_cache import MatchInsightCache
+from services.recommendation_service import candidate_fields, fallback_insight, filter_active, DailyRecommendationService
+from services.exclusion_service import ExclusionService
+from services.compatibility_service import CompatibilityService
+from schemas.recommendations import ProfileDecisionCreate, ProfileDecisionSchema, RecommendationFilters
 
 router = APIRouter()
 
 insights = ElinityInsights()
+insight_cache = MatchInsightCache()
+daily_recommendations = DailyRecommendationService()
+exclusions = ExclusionService()
+compatibility = CompatibilityService()
 
-async def process_tenant_insight(tenant: Tenant, query: str, score: float) -> RecommendedUserSchema:
-    """Helper function to process one tenant and get AI insight."""
-    try:
-        user_id = tenant.id
-        name_parts = [
-            tenant.personal_info.first_name,
-            tenant.personal_info.middle_name,
-            tenant.personal_info.last_name
-        ]
-        user_name = " ".join(part for part in name_parts if part)
-        
-        user_interests = ','.join(tenant.interests_and_hobbies.interests or [])
+# "batch" generates every insight of a page in one LLM call, "single" makes one call per tenant
+INSIGHT_MODE = os.getenv("RECOMMENDATION_INSIGHT_MODE", "batch").lower()
+SEARCH_TOP_K = int(os.getenv("SEARCH_TOP_K", 6))
+# Most vector hits a search with active_within_days scans for recently active tenants
+ACTIVE_SEARCH_MAX_CANDIDATES = int(os.getenv("ACTIVE_SEARCH_MAX_CANDIDATES", 1000))
 
+async def generate_insight(candidate: dict, query: str) -> Optional[str]:
+    """Helper function to get the AI insight for one candidate, None if it fails."""
+    try:
         # Use asyncio.to_thread to run the SYNC function in a thread
-        ai_insight_text = await asyncio.to_thread(
-            insights.generate_insight,
-            query=query,
-            user_id=user_id,
-            user_name=user_name,
-            score=score,
-            user_interests=user_interests
-        )
-
-        return RecommendedUserSchema(
-            tenant=TenantSchema.model_validate(tenant),
-            score=score,
-            ai_insight=ai_insight_text
-        )
+        return await asyncio.to_thread(insights.generate_insight, query=query, **candidate)
     except Exception as e:
-        print(f"Error processing insight for user {tenant.id}: {e}")
-        return RecommendedUserSchema(
+        print(f"Error processing insight for user {candidate['user_id']}: {e}")
+        return None
+
+
+async def generate_insights(candidates: List[dict], query: str) -> Dict[str, str]:
+    """Helper function to get AI insights for candidates, keyed by user id. Failed candidates are left out."""
+    if not candidates:
+        return {}
+
+    if INSIGHT_MODE == "batch":
+        try:
+            return await asyncio.to_thread(insights.generate_insights, query, candidates)
+        except Exception as e:
+            print(f"Error processing batch insights: {e}")
+            return {}
+
+    texts = await asyncio.gather(*(generate_insight(candidate, query) for candidate in candidates))
+    return {candidate["user_id"]: text for candidate, text in zip(candidates, texts) if text}
+
+
+async def build_recommendations(db: Session, viewer: Tenant, tenants: List[Tenant], score_map: dict, query: str) -> List[RecommendedUserSchema]:
+    """Attach scores and AI insights to hydrated tenants, best match first.
+
+    Insights are served from the match insight cache while neither profile has
+    changed; only the remaining candidates go to the LLM.
+    """
+    scored_tenants = [
+        (tenant, score_map[tenant.embedding_id])
+        for tenant in tenants
+        if score_map.get(tenant.embedding_id) is not None
+    ]
+    candidates = {tenant.id: candidate_fields(tenant, score) for tenant, score in scored_tenants}
+    cache_query = normalize_query(query)
+
+    cached = await asyncio.to_thread(insight_cache.get_many, db, viewer, tenants, cache_query)
+    generated = await generate_insights(
+        [candidate for tenant_id, candidate in candidates.items() if tenant_id not in cached],
+        query
+    )
+    ai_insights = {**cached, **generated}
+
+    users_with_insights = [
+        RecommendedUserSchema(
             tenant=TenantSchema.model_validate(tenant),
             score=score,
-            ai_insight=f"Could not generate insight for {user_name}."
+            ai_insight=ai_insights.get(tenant.id) or fallback_insight(candidates[tenant.id])
         )
+        for tenant, score in scored_tenants
+    ]
+    users_with_insights.sort(key=lambda x: x.score, reverse=True)
+
+    if generated:
+        try:
+            await asyncio.to_thread(insight_cache.set_many, db, viewer, tenants, cache_query, generated)
+        except SQLAlchemyError as e:
+            print(f"Error caching insights: {e}")
+
+    return users_with_insights
+
+
+async def _hydrate_tenants(db: Session, current_user: Tenant, score_map: dict) -> List[Tenant]:
+    """Load the tenants behind vector store hits, excluding the current user."""
+    if not score_map:
+        return []
+
+    # Query Database (Optimized with joinedload)
+    return await asyncio.to_thread(
+        db.query(Tenant)
+          .options(
+              joinedload(Tenant.personal_info), 
+              joinedload(Tenant.interests_and_hobbies)
+          )
+          .filter(
+              Tenant.embedding_id.in_(list(score_map.keys())), 
+              Tenant.id != current_user.id
+          )
+          .all
+    )
+
+
+async def excluded_ids(db: Session, current_user: Tenant) -> List[int]:
+    """Embedding ids never to recommend: the user themself and every profile they declined, archived or matched."""
+    ids = await asyncio.to_thread(exclusions.get, db, current_user.id)
+    if current_user.embedding_id is not None:
+        return [current_user.embedding_id, *ids.tolist()]
+    return ids.tolist()
+
+
+def vector_filters(filters: RecommendationFilters) -> dict:
+    """The filters the vector store applies; recency is checked in Postgres by filter_active."""
+    return filters.model_dump(exclude={"active_within_days"})
+
+
+async def search_candidates(db: Session, query_vector, top_k: int, exclude_ids: List[int], filters: RecommendationFilters) -> dict:
+    """Score map of the ``top_k * overfetch`` best hits that pass every filter.
+
+    With ``active_within_days`` the search pages on past the hits it has already
+    seen (excluded inside the vector store), each page twice the last, until
+    enough recently active tenants are found, the store runs out of matches, or
+    ``ACTIVE_SEARCH_MAX_CANDIDATES`` hits were checked. A strict recency filter
+    thus still fills the page whenever enough active matches exist.
+    """
+    vector_store = get_vector_store()
+    wanted = top_k * compatibility.overfetch
+    exclude_ids = list(exclude_ids)
+    fetch, checked, score_map = wanted, 0, {}
+    while True:
+        hits = await vector_store.asearch(query_vector, top_k=fetch, exclude_ids=exclude_ids, filters=vector_filters(filters))
+        # IMPORTANT: The vector store id IS the 'embedding_id' in Tenant
+        page = {user['id']: user['score'] for user in hits}
+        score_map.update(await asyncio.to_thread(filter_active, db, page, filters.active_within_days))
+        checked += len(page)
+        if not filters.active_within_days or len(score_map) >= wanted or len(hits) < fetch or checked >= ACTIVE_SEARCH_MAX_CANDIDATES:
+            return score_map
+        exclude_ids.extend(page)
+        fetch = min(fetch * 2, ACTIVE_SEARCH_MAX_CANDIDATES - checked)
+
+
+async def search_matches(db: Session, current_user: Tenant, query: str, filters: RecommendationFilters) -> dict:
+    """Score map (embedding_id -> score) for a free text query, re-ranked by trait compatibility."""
+    exclude_ids = await excluded_ids(db, current_user)
+    query_vector = await get_query_embedding().acreate_embedding(query)
+    score_map = await search_candidates(db, query_vector, SEARCH_TOP_K, exclude_ids, filters)
+    return await compatibility.arerank(db, current_user, score_map, SEARCH_TOP_K)
+
+
+async def profile_matches(db: Session, current_user: Tenant, filters: RecommendationFilters, top_k: int = 5) -> dict:
+    """Score map (embedding_id -> score) of the tenants most similar to the current user, re-ranked by trait compatibility."""
+    if current_user.embedding_id is None:
+        return {}
+
+    vector_store = get_vector_store()
+    user_vector = await vector_store.aget_vector(current_user.embedding_id)
+    if user_vector is None:
+        return {}
+
+    exclude_ids = await excluded_ids(db, current_user)
+    score_map = await search_candidates(db, user_vector, top_k, exclude_ids, filters)
+    return await compatibility.arerank(db, current_user, score_map, top_k)
+
+
+def _ndjson(event: dict) -> bytes:
+    return (json.dumps(event, default=str) + "\n").encode("utf-8")
+
+
+def _cache_insights(viewer: Tenant, tenants: List[Tenant], cache_query: str, generated: Dict[str, str]):
+    # The request session may already be closed once the stream finishes
+    with SessionLocal() as db:
+        insight_cache.set_many(db, viewer, tenants, cache_query, generated)
+
+
+async def stream_recommendations(db: Session, viewer: Tenant, tenants: List[Tenant], score_map: dict, query: str) -> StreamingResponse:
+    """Stream ranked tenant cards immediately, then each AI insight as soon as it is ready.
+
+    The response is newline delimited JSON with three event types:
+    ``recommendations`` (ranked cards, ``ai_insight`` filled from cache or null),
+    one ``insight`` per remaining tenant in completion order, and ``done``.
+    Insights are generated one call per tenant so none waits for the slowest.
+    """
+    scored_tenants = sorted(
+        ((tenant, score_map[tenant.embedding_id]) for tenant in tenants if score_map.get(tenant.embedding_id) is not None),
+        key=lambda item: item[1],
+        reverse=True
+    )
+    candidates = {tenant.id: candidate_fields(tenant, score) for tenant, score in scored_tenants}
+    cache_query = normalize_query(query)
+    cached = await asyncio.to_thread(insight_cache.get_many, db, viewer, tenants, cache_query)
+    cards = [
+        {
+            "tenant": TenantSchema.model_validate(tenant).model_dump(mode="json"),
+            "score": score,
+            "ai_insight": cached.get(tenant.id),
+        }
+        for tenant, score in scored_tenants
+    ]
+
+    async def insight_for(candidate: dict):
+        return candidate["user_id"], await generate_insight(candidate, query)
+
+    async def events():
+        yield _ndjson({"type": "recommendations", "results": cards})
+
+        pending = [
+            asyncio.create_task(insight_for(candidate))
+            for tenant_id, candidate in candidates.items()
+            if tenant_id not in cached
+        ]
+        generated = {}
+        try:
+            for next_insight in asyncio.as_completed(pending):
+                tenant_id, text = await next_insight
+                if text:
+                    generated[tenant_id] = text
+                yield _ndjson({
+                    "type": "insight",
+                    "tenant_id": tenant_id,
+                    "ai_insight": text or fallback_insight(candidates[tenant_id]),
+                })
+        finally:
+            # Client went away: stop paying for insights nobody will read
+            for task in pending:
+                task.cancel()
+
+        yield _ndjson({"type": "done"})
+
+        if generated:
+            try:
+                await asyncio.to_thread(_cache_insights, viewer, tenants, cache_query, generated)
+            except SQLAlchemyError as e:
+                print(f"Error caching insights: {e}")
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
 
 
 @router.get("/search", tags=["Recommendations"], response_model=List[RecommendedUserSchema])
 async def get_recommendations_optimized(
     query: str, 
+    filters: RecommendationFilters = Depends(),
     current_user: Tenant = Depends(get_current_user), 
     db: Session = Depends(get_db)
 ): 
     try:
-        # 1. Query Milvus (Assuming this part is reasonably fast or sync)
-        res = milvus_db.query(query)
-        if not res or not res[0]:
+        # 1. Query the vector store for a Score Map (ID -> Score)
+        score_map = await search_matches(db, current_user, query, filters)
+        if not score_map:
             return [] # No results found
 
-        milvus_items = res[0]
-        
-        # 2. Create Score Map for reliable lookup (ID -> Score)
-        # IMPORTANT: Assuming 'item.id' from Milvus IS the 'embedding_id' in Tenant
-        score_map = {item.id: item.score for item in milvus_items}
-        ids_to_fetch = list(score_map.keys())
-
-        if not ids_to_fetch:
-            return []
-
-        # 3. Query Database (Optimized with joinedload)
-        tenants = await asyncio.to_thread(
-            db.query(Tenant)
-              .options(
-                  joinedload(Tenant.personal_info), 
-                  joinedload(Tenant.interests_and_hobbies)
-              )
-              .filter(
-                  Tenant.embedding_id.in_(ids_to_fetch), 
-                  Tenant.id != current_user.id
-              )
-              .all
-        )
+        # 2. Query Database
+        tenants = await _hydrate_tenants(db, current_user, score_map)
 
-        tasks = []
-        for tenant in tenants:
-            score = score_map.get(tenant.embedding_id)
-            if score is not None:
-                tasks.append(process_tenant_insight(tenant, query, score))
-
-        users_with_insights = await asyncio.gather(*tasks)
-
-        users_with_insights.sort(key=lambda x: x.score, reverse=True)
-
-        return users_with_insights
+        # 3. Attach AI insights
+        return await build_recommendations(db, current_user, tenants, score_map, query)
 
     except SQLAlchemyError as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.")
@@ -106,55 +278,82 @@ async def get_recommendations_optimized(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
+@router.get("/search/stream", tags=["Recommendations"])
+async def stream_search_recommendations(
+    query: str,
+    filters: RecommendationFilters = Depends(),
+    current_user: Tenant = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Streaming variant of /search, see stream_recommendations for the event format"""
+    try:
+        score_map = await search_matches(db, current_user, query, filters)
+        tenants = await _hydrate_tenants(db, current_user, score_map)
+        return await stream_recommendations(db, current_user, tenants, score_map, query)
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.")
+
+
 @router.get("/", tags=["Recommendations"])
-async def get_recommendations(current_user: Tenant = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_recommendations(filters: RecommendationFilters = Depends(), current_user: Tenant = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get recommendations for the current user"""
 
-    # 4. Query database for similar users
-    # 5. Return list of recommended users
-    # embedding_id = current_user.embedding_id
-    # Initialize the pipeline using environment variables
-    pipeline = MilvusUserSimilarityPipeline()
-    
-    # Find similar users for a specific user ID
     '''
     # 1. Query tenants for embedding id
-    # 2. Query milvus for current user embedding id
-    # 3. Query milvus for similar users
+    # 2. Query the vector store for current user embedding
+    # 3. Query the vector store for similar users
     '''
-    similar_users = pipeline.find_similar_users_by_id(current_user.embedding_id, top_k=5)
-    # Close connection
-    pipeline.close()
+    score_map = await profile_matches(db, current_user, filters)
+    if not score_map:
+        return []
 
-    score_map = {user['id']: user['score'] for user in similar_users}
-    ids_to_fetch = [user['id'] for user in similar_users]
+    tenants = await _hydrate_tenants(db, current_user, score_map)
+    return await build_recommendations(db, current_user, tenants, score_map, "")
 
-    if not ids_to_fetch:
-        return []
 
-    # 3. Query Database (Optimized with joinedload)
-    tenants = await asyncio.to_thread(
-        db.query(Tenant)
-            .options(
-                joinedload(Tenant.personal_info), 
-                joinedload(Tenant.interests_and_hobbies)
-            )
-            .filter(
-                Tenant.embedding_id.in_(ids_to_fetch), 
-                Tenant.id != current_user.id
-            )
-            .all
-    )
+@router.get("/stream", tags=["Recommendations"])
+async def stream_user_recommendations(filters: RecommendationFilters = Depends(), current_user: Tenant = Depends(get_current_user), db: Session = Depends(get_db)):
+    """Streaming variant of GET /recommendations/, see stream_recommendations for the event format"""
+    score_map = await profile_matches(db, current_user, filters)
+    tenants = await _hydrate_tenants(db, current_user, score_map)
+    return await stream_recommendations(db, current_user, tenants, score_map, "")
 
-    tasks = []
-    for tenant in tenants:
-        score = score_map.get(tenant.embedding_id)
-        if score is not None:
-            tasks.append(process_tenant_insight(tenant, "", score))
 
-    users_with_insights = await asyncio.gather(*tasks)
+@router.get("/daily", tags=["Recommendations"], response_model=List[RecommendedUserSchema])
+async def get_daily_recommendations(current_user: Tenant = Depends(get_current_user), db: Session = Depends(get_db)):
+    """Get the current user's precomputed daily feed (built nightly by the Celery beat job)
+
+    Without a current feed, e.g. for a user who only just came back, the matches are computed live.
+    """
+    feed = await asyncio.to_thread(daily_recommendations.get_feed, db, current_user.id)
+    if not feed:
+        score_map = await profile_matches(db, current_user, RecommendationFilters(), daily_recommendations.count)
+        tenants = await _hydrate_tenants(db, current_user, score_map)
+        return await build_recommendations(db, current_user, tenants, score_map, "")
+    return [
+        RecommendedUserSchema(
+            tenant=TenantSchema.model_validate(item.candidate_obj),
+            score=item.score,
+            ai_insight=item.ai_insight or ""
+        )
+        for item in feed
+        if item.candidate_obj is not None
+    ]
+
+
+@router.post("/decisions", tags=["Recommendations"], response_model=ProfileDecisionSchema, status_code=status.HTTP_201_CREATED)
+async def create_profile_decision(req: ProfileDecisionCreate, current_user: Tenant = Depends(get_current_user), db: Session = Depends(get_db)):
+    """Decline, archive or match a recommended profile; it is excluded from all future recommendations"""
+    if req.candidate_id == current_user.id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot record a decision about yourself.")
+    candidate = db.query(Tenant).filter(Tenant.id == req.candidate_id).first()
+    if not candidate:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return await asyncio.to_thread(exclusions.record, db, current_user.id, req.candidate_id, req.decision)
 
-    users_with_insights.sort(key=lambda x: x.score, reverse=True)
 
-    return users_with_insights 
- 
\ No newline at end of file
+@router.delete("/decisions/{candidate_id}", tags=["Recommendations"], status_code=status.HTTP_204_NO_CONTENT)
+async def delete_profile_decision(candidate_id: str, current_user: Tenant = Depends(get_current_user), db: Session = Depends(get_db)):
+    """Undo a decision so the profile can be recommended again"""
+    if not await asyncio.to_thread(exclusions.remove, db, current_user.id, candidate_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Decision not found")
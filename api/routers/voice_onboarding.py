@@ -13,6 +13,7 @@ import requests
 
 # Import project components
 from utils.gemini_genai import configure_genai, GeminiGenAIClient, transform_for_backend
+from elinity_ai.llm_gateway import get_llm_gateway
 from schemas.user import User
 
 load_dotenv()
@@ -59,7 +60,7 @@ and the kinds of people they are seeking in romantic, friendship, and collaborat
 # ------------------------------
 class ElinityVoiceOnboarding:
     def __init__(self, model_name="gemini-2.0-flash", system_prompt=ONBOARD_PROMPT):
-        self.model = genai.GenerativeModel(model_name)
+        self.model = get_llm_gateway().model(model_name)
         self.conversation_history = []
         self.system_prompt = system_prompt
         self.genai_client = GeminiGenAIClient()
@@ -75,8 +76,7 @@ class ElinityVoiceOnboarding:
         if not user_message:
             return "I didn't catch that. Could you please repeat?"
         self.add_message("user", user_message)
-        response = self.chat.send_message(user_message)
-        assistant_message = response.text
+        assistant_message = get_llm_gateway().send_message(self.chat, user_message)
         self.add_message("assistant", assistant_message)
         return assistant_message
 
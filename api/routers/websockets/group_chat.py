@@ -24,7 +24,7 @@ async def send_ai_message(room_id: str, conversation: List[ChatSchema], db: Sess
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid room ID.")
     try: 
         elinity_chatbot = ElinityChatbot(history=conversation)
-        chat = Chat(group=room_id, message=elinity_chatbot.get_message())
+        chat = Chat(group=room_id, message=await elinity_chatbot.aget_message())
         db.add(chat)
         db.commit(); db.refresh(chat)
     
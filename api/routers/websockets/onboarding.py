@@ -95,7 +95,7 @@ async def continue_conversation(body: ContinueConversation,current_user: Tenant
         prompt = body.user_message
     
     # Get next prompt
-    next_prompt = model.get_next_prompt(prompt)
+    next_prompt = await model.aget_next_prompt(prompt)
     
     # Store the chat and user message
     chat_objs = [
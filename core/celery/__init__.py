@@ -1,7 +1,19 @@
 from ._celery import celery_app
-from ._tasks import create_profile_embeddings
+from ._tasks import (
+    create_profile_embeddings,
+    generate_daily_recommendations,
+    embed_tenant_batch,
+    backfill_embeddings,
+    backfill_window_done,
+    maintain_vector_store,
+)
 
 __all__ = (
     "celery_app",
     "create_profile_embeddings",
-)
\ No newline at end of file
+    "generate_daily_recommendations",
+    "embed_tenant_batch",
+    "backfill_embeddings",
+    "backfill_window_done",
+    "maintain_vector_store",
+)
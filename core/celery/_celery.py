@@ -1,4 +1,6 @@
 from celery import Celery
+from celery.signals import worker_init, worker_process_init
+from celery.schedules import crontab
 from dotenv import load_dotenv
 import os
 
@@ -31,10 +33,36 @@ celery_app.conf.update(
         'run-create-profile-embeddings-every-minute': {
             'task': 'core.celery._tasks.create_profile_embeddings',
             'schedule': 60,  # Execute every 60 seconds
-        }
+        },
+        'run-maintain-vector-store-hourly': {
+            'task': 'core.celery._tasks.maintain_vector_store',
+            'schedule': int(os.getenv("VECTOR_STORE_MAINTENANCE_INTERVAL", 3600)),  # Flush and compaction
+        },
+        'run-generate-daily-recommendations-nightly': {
+            'task': 'core.celery._tasks.generate_daily_recommendations',
+            'schedule': crontab(hour=int(os.getenv("DAILY_RECOMMENDATIONS_HOUR", 3)), minute=0),  # Off-peak, UTC
+        },
     },
     timezone='UTC',
 )
 
 # Optional: Auto-discover tasks in your packages
 celery_app.autodiscover_tasks(['core.celery._tasks'])
+
+
+@worker_init.connect
+def preload_worker_models(**kwargs):
+    """Load embedding models in the parent before the prefork pool starts.
+
+    Pool processes are forked afterwards and share the weights copy-on-write
+    instead of each loading its own copy.
+    """
+    from elinity_ai.embedding_service import preload_models
+    preload_models()
+
+
+@worker_process_init.connect
+def reset_worker_clients(**kwargs):
+    """Drop network clients inherited from the parent; each pool process opens its own."""
+    from elinity_ai.embedding_service import reset_clients
+    reset_clients()
@@ -2,46 +2,104 @@ from schemas.user import User
 from ._celery import celery_app
 from datetime import datetime,timezone 
 import traceback
+import os
 from core.logging import logger
 from services.user_service import UserService
-from services.model_converter import tenant_to_dict
-from elinity_ai.embeddings import ElinityEmbedding
-from elinity_ai.embeddings import milvus_client
+from services.model_converter import tenant_to_dict, profile_content_hash, embedding_content
+from elinity_ai.embeddings import get_elinity_embedding, profile_text
+from elinity_ai.vector_store import get_vector_store, tenant_vector_fields
+from elinity_ai.insights import ElinityInsights
+from services.recommendation_service import DailyRecommendationService
+from services.embedding_backfill import EmbeddingBackfillService
+from services.description_cache import ProfileDescriptionCache
+from services.exclusion_service import ExclusionService
+from database.session import Session
+from celery import chord
 
 
 user_service = UserService()
+embedding_backfill = EmbeddingBackfillService()
+description_cache = ProfileDescriptionCache()
+exclusions = ExclusionService()
 
-def prepare_tenant_metadata(tenants,start_index=1):
+# Keys prepare_tenant_metadata adds for the database write-back, not stored with the vector
+BOOKKEEPING_KEYS = ("tenant_id", "content_hash", "profile_version")
+
+def prepare_tenant_metadata(tenants):
     """
     Prepare metadata for all tenants, filtering out failed embeddings.
     Returns a list of successfully processed metadata objects.
+
+    A tenant that already has an embedding keeps its id, so its vector is
+    replaced; new tenants get one reserved from the embedding id sequence.
     """
-    elinity_embedding = ElinityEmbedding()
+    elinity_embedding = get_elinity_embedding()
     metadata_list = []
     failed_tenants = []
+    new_tenant_ids = [user_profile["id"] for user_profile in tenants if user_profile.get("embedding_id") is None]
+    embedding_ids = user_service.reserve_embedding_ids(new_tenant_ids)
+    if new_tenant_ids:
+        # Decisions made about these tenants can only now be resolved to embedding ids
+        try:
+            with Session() as db:
+                exclusions.invalidate_candidates(db, new_tenant_ids)
+        except Exception as e:
+            logger.warning(f"Could not invalidate exclusion sets: {e}")
     
-    for i, user_profile in enumerate(tenants,start=start_index):
+    # Describe exactly the content the hash covers (no credentials or bookkeeping columns),
+    # every tenant concurrently, then encode all descriptions in one batch
+    contents = [embedding_content(user_profile) for user_profile in tenants]
+    content_hashes = {
+        user_profile["id"]: user_profile.get("content_hash") or profile_content_hash(user_profile)
+        for user_profile in tenants
+    }
+    cached = {}
+    if elinity_embedding.description_mode != "template":
+        try:
+            with Session() as db:
+                cached = description_cache.get_many(db, elinity_embedding.prompt_version, content_hashes)
+            logger.info(f"Reusing {len(cached)} cached self-descriptions")
+        except Exception as e:
+            logger.warning(f"Self-description cache unavailable, describing every tenant: {e}")
+    # A cached description is embedded as is, without another LLM call
+    embeddings = elinity_embedding.create_embeddings([
+        cached.get(user_profile["id"]) or content for user_profile, content in zip(tenants, contents)
+    ])
+    if elinity_embedding.description_mode != "template":
+        # Saved before the vectors are written, so a failed upsert does not cost the LLM calls again.
+        # Template texts (the llm-fallback mode's substitute) are free to rebuild and not cached.
+        generated = {
+            user_profile["id"]: text
+            for user_profile, content, (text, _) in zip(tenants, contents, embeddings)
+            if text and user_profile["id"] not in cached and text != profile_text(content)
+        }
+        try:
+            with Session() as db:
+                description_cache.set_many(db, elinity_embedding.prompt_version, content_hashes, generated)
+        except Exception as e:
+            logger.warning(f"Could not cache {len(generated)} self-descriptions: {e}")
+
+    for user_profile, (text, embedding) in zip(tenants, embeddings):
+        i = user_profile.get("embedding_id") or embedding_ids.get(user_profile["id"])
         try:
-            # Create a single embedding instance for all tenants
-            text, embedding = elinity_embedding.create_embedding(user_profile)
-            
             if not text or embedding is None:
-                logger.error(f"Failed to generate embedding for tenant {user_profile.get('id', i+1)}")
-                failed_tenants.append(user_profile.get('id', i+1))
+                logger.error(f"Failed to generate embedding for tenant {user_profile.get('id', i)}")
+                failed_tenants.append(user_profile.get('id', i))
                 continue
                 
+            # Only typed scalar fields travel with the vector, not the whole profile
             metadata = {
-                "created_at": datetime.now(timezone.utc).isoformat(),  
-                "source": "profile_embedding", 
-                "tenant": user_profile,
                 "id": i,  
                 "vector": embedding,
-                "bio": text
+                "tenant_id": user_profile["id"],
+                "content_hash": content_hashes[user_profile["id"]],
+                "profile_version": user_profile.get("profile_version") or 0,
+                **tenant_vector_fields(user_profile),
             }
             metadata_list.append(metadata)
             
         except Exception as e:
-            tenant_id = user_profile.get('id', i+1)
+            tenant_id = user_profile.get('id', i)
             logger.error(f"Error processing tenant {tenant_id}: {str(e)}")
             logger.debug(traceback.format_exc())
             failed_tenants.append(tenant_id)
@@ -53,32 +111,135 @@ def prepare_tenant_metadata(tenants,start_index=1):
     
     return metadata_list
 
+def embed_tenants(tenants, force=False):
+    """Embed a batch of loaded tenants and record the result in one transaction.
+
+    Tenants whose embedding-relevant content did not change since their last
+    embedding are only marked current, unless ``force`` is set. Returns counts
+    of ``embedded``, ``unchanged`` and ``failed`` tenants.
+    """
+    to_embed, unchanged = [], []
+    for profile in (tenant_to_dict(tenant) for tenant in tenants):
+        profile["content_hash"] = profile_content_hash(profile)
+        if not force and profile.get("embedding_id") is not None and profile.get("embedding_hash") == profile["content_hash"]:
+            # Edited, but nothing the embedding is built from changed: no LLM call, no encode
+            unchanged.append({
+                "tenant_id": profile["id"],
+                "embedding_id": profile["embedding_id"],
+                "content_hash": profile["content_hash"],
+                "profile_version": profile["profile_version"],
+            })
+        else:
+            to_embed.append(profile)
+    user_service.mark_embedded(unchanged)
+    logger.info(f"{len(to_embed)} tenants need a new embedding, {len(unchanged)} unchanged")
+    stats = {"embedded": 0, "unchanged": len(unchanged), "failed": 0}
+    if not to_embed:
+        return stats
+
+    metadata_list = prepare_tenant_metadata(to_embed)
+    
+    records = [{k: v for k, v in data.items() if k not in BOOKKEEPING_KEYS} for data in metadata_list]
+    rows = [{"embedding_id": data["id"], **{key: data[key] for key in BOOKKEEPING_KEYS}} for data in metadata_list]
+    vector_store = get_vector_store()
+
+    def write_vectors():
+        count = vector_store.upsert(records)
+        if vector_store.flush_after_upsert:
+            vector_store.flush()
+        return count
+
+    # One UPDATE for the whole batch, committed only if the vector upsert succeeded
+    user_service.mark_embedded(rows, write_vectors=write_vectors)
+    stats["embedded"] = len(metadata_list)
+    stats["failed"] = len(to_embed) - len(metadata_list)
+    return stats
+
+
 @celery_app.task(name="core.celery._tasks.create_profile_embeddings", bind=True)
 def create_profile_embeddings(self):
 
     try: 
-        limit = 10
-        offset = 0
-        tenants = []
-        tenants = user_service.get_tenants(limit, offset)
+        limit = int(os.getenv("EMBEDDING_TASK_BATCH_SIZE", 10))
+        tenants = user_service.get_dirty_tenants(limit)
 
         if not tenants: 
-            logger.info("No tenants found")
+            logger.info("No tenants to embed")
             return 
         
-        logger.info(f"Found {tenants.count()} tenants") 
-        tenants = [tenant_to_dict(tenant) for tenant in tenants]
-        last_index = user_service.get_last_index()
-        metadata_list = prepare_tenant_metadata(tenants,start_index=last_index+1)
-        
-        update_user = [user_service.update_embedding_id(data["tenant"]["id"],data["id"]) for data in metadata_list]
-        result = milvus_client.upsert(metadata_list)
+        logger.info(f"Found {len(tenants)} new or edited tenants") 
+        result = embed_tenants(tenants)
         logger.info(f"✅ Task completed at {datetime.now(timezone.utc).isoformat()}")
         logger.info(f"✅ Task result: {result}")
+        return result
         
     except Exception as e:
         error_msg = f"Task failed: {str(e)}\n{traceback.format_exc()}"
         logger.error(error_msg)
         raise  RuntimeError(error_msg)
-    
- 
\ No newline at end of file
+
+
+@celery_app.task(name="core.celery._tasks.embed_tenant_batch")
+def embed_tenant_batch(tenant_ids, force=False):
+    """One backfill batch. Never raises, so a bad batch cannot break the chord;
+    its tenants stay dirty and are counted as failed."""
+    try:
+        tenants = user_service.get_tenants_by_ids(tenant_ids, only_dirty=not force)
+        stats = embed_tenants(tenants, force=force)
+        stats["skipped"] = len(tenant_ids) - len(tenants)
+        return stats
+    except Exception as e:
+        logger.error(f"Backfill batch of {len(tenant_ids)} tenants failed: {e}\n{traceback.format_exc()}")
+        return {"embedded": 0, "unchanged": 0, "failed": len(tenant_ids), "skipped": 0}
+
+
+@celery_app.task(name="core.celery._tasks.backfill_embeddings")
+def backfill_embeddings(run_id):
+    """Fan the next window of a backfill run out to the workers as a chord.
+
+    The chord callback checkpoints the run and schedules the following window,
+    so the run walks the tenants table by primary key until it is exhausted.
+    """
+    window = embedding_backfill.next_window(run_id)
+    if window is None:
+        return
+    batches, last_tenant_id, force = window
+    if not batches:
+        run = embedding_backfill.finish(run_id)
+        logger.info(f"✅ Backfill {run_id} completed: {embedding_backfill.summary(run)}")
+        maintain_vector_store.delay()
+        return
+    chord(embed_tenant_batch.s(batch, force) for batch in batches)(backfill_window_done.s(run_id, last_tenant_id))
+
+
+@celery_app.task(name="core.celery._tasks.backfill_window_done")
+def backfill_window_done(results, run_id, last_tenant_id):
+    run = embedding_backfill.checkpoint(run_id, last_tenant_id, results)
+    logger.info(f"Backfill {run_id}: {embedding_backfill.summary(run)}")
+    backfill_embeddings.delay(run_id)
+
+
+@celery_app.task(name="core.celery._tasks.maintain_vector_store")
+def maintain_vector_store():
+    """Flush buffered vector writes and compact away replaced rows, on a schedule."""
+    vector_store = get_vector_store()
+    started = datetime.now(timezone.utc)
+    vector_store.flush()
+    vector_store.compact()
+    elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+    logger.info(f"✅ Vector store maintained in {elapsed:.1f}s, {vector_store.count()} vectors")
+
+
+@celery_app.task(name="core.celery._tasks.generate_daily_recommendations", bind=True)
+def generate_daily_recommendations(self):
+    """Precompute every active tenant's daily feed (top matches, scores and AI insights)."""
+    try:
+        started = datetime.now(timezone.utc)
+        processed = DailyRecommendationService().generate_all(get_vector_store(), ElinityInsights())
+        elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+        logger.info(f"✅ Daily recommendations built for {processed} tenants in {elapsed:.1f}s")
+        return processed
+    except Exception as e:
+        error_msg = f"Task failed: {str(e)}\n{traceback.format_exc()}"
+        logger.error(error_msg)
+        raise  RuntimeError(error_msg)
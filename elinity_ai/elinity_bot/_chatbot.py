@@ -1,8 +1,4 @@
-from pydantic import Field 
-from langchain_core.language_models.llms import LLM
-from google import generativeai as genai
-from typing import Optional, List
-from google.generativeai import GenerativeModel
+from elinity_ai.llm_gateway import GeminiLLM
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.runnables import RunnableSequence,Runnable
@@ -11,24 +7,6 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-class GeminiLLM(LLM):
-    model_name: str = Field(default="gemini-1.5-flash")
-    model: GenerativeModel = Field(default=None, exclude=True)
-
-    @property
-    def _llm_type(self) -> str:
-        return "gemini_custom"
-
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-        self.model = genai.GenerativeModel(self.model_name)
-
-    def _call(self, prompt: str, stop: Optional[List[str]] = None) -> str:
-        response = self.model.generate_content(prompt)
-        return response.text if hasattr(response, 'text') else response.parts[0].text
-
-
 class ExtractTextRunnable(Runnable):
     def invoke(self, input, *args, **kwargs):
         return input['text']
@@ -70,3 +48,7 @@ class ElinityChatbot:
         result = self.chain.invoke({"conversation": self._get_conversation_text()})
         return result['message']
 
+    async def aget_message(self):
+        result = await self.chain.ainvoke({"conversation": self._get_conversation_text()})
+        return result['message']
+
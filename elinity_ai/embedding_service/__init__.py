@@ -0,0 +1,25 @@
+from ._batcher import EmbeddingBatcher
+from ._onnx import BACKENDS, load_onnx_model
+from ._registry import (
+    DEFAULT_MODEL,
+    get_sentence_model,
+    get_embedding_batcher,
+    get_client,
+    get_mongo_client,
+    preload_models,
+    reset_clients,
+)
+
+
+__all__ = [
+    "EmbeddingBatcher",
+    "BACKENDS",
+    "load_onnx_model",
+    "DEFAULT_MODEL",
+    "get_sentence_model",
+    "get_embedding_batcher",
+    "get_client",
+    "get_mongo_client",
+    "preload_models",
+    "reset_clients",
+]
@@ -0,0 +1,110 @@
+"""
+Micro-batching front end for a sentence embedding model
+"""
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List
+import numpy as np
+from dotenv import load_dotenv
+from core.logging import logger
+
+load_dotenv()
+
+
+class EmbeddingBatcher:
+    """Collects concurrent encode calls into one batched forward pass.
+
+    Callers from any thread (``encode``) or event loop (``aencode``) put their
+    text on a queue. A single worker thread takes the first waiting text, keeps
+    collecting for up to ``max_wait_ms`` or ``max_batch_size`` texts, encodes the
+    unique ones in one ``model.encode`` call and resolves every caller's future.
+    Inference therefore never runs on the event loop. The worker is started
+    lazily and again after a fork, so pre-forked workers each get their own.
+    Requests cancelled while queued (a client that disconnected) are skipped.
+    """
+
+    def __init__(self, model, max_batch_size: int = None, max_wait_ms: float = None):
+        self.model = model
+        self.max_batch_size = max_batch_size or int(os.getenv("EMBEDDING_BATCH_SIZE", 64))
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else float(os.getenv("EMBEDDING_BATCH_WAIT_MS", 5))) / 1000
+        self._lock = threading.Lock()
+        self._queue = None
+        self._pid = None
+        self._thread = None
+        self._stats = {"requests": 0, "batches": 0, "encoded": 0}
+
+    def _ensure_worker(self) -> queue.Queue:
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = None
+            if self._thread is None or not self._thread.is_alive():
+                if self._thread is not None:
+                    logger.error("Embedding batcher worker died, restarting it")
+                self._thread = threading.Thread(target=self._run, args=(self._queue,), name="embedding-batcher", daemon=True)
+                self._thread.start()
+            return self._queue
+
+    def submit(self, text: str) -> Future:
+        future = Future()
+        self._ensure_worker().put((text, future))
+        return future
+
+    def encode(self, text: str) -> np.ndarray:
+        return self.submit(text).result()
+
+    async def aencode(self, text: str) -> np.ndarray:
+        return await asyncio.wrap_future(self.submit(text))
+
+    def encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Encode a list the caller already has in hand (bulk jobs), bypassing the queue."""
+        return self.model.encode(texts, batch_size=self.max_batch_size, convert_to_numpy=True)
+
+    def _collect(self, pending: queue.Queue):
+        batch = [pending.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(pending.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self, pending: queue.Queue):
+        while True:
+            try:
+                self._process(self._collect(pending))
+            except Exception as e:
+                # Never let one bad batch take the worker (and every later query) down
+                logger.error(f"Embedding batcher failed to process a batch: {e}")
+
+    def _process(self, batch):
+        # Claims each future; cancelled ones are dropped and can no longer be cancelled later
+        batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            vectors = dict(zip(texts, self.model.encode(texts, batch_size=len(texts), convert_to_numpy=True)))
+        except Exception as e:
+            logger.error(f"Batched embedding of {len(texts)} texts failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for text, future in batch:
+            future.set_result(vectors[text])
+        self._stats["requests"] += len(batch)
+        self._stats["batches"] += 1
+        self._stats["encoded"] += len(texts)
+
+    def stats(self) -> dict:
+        batches = self._stats["batches"]
+        return {**self._stats, "avg_batch_size": self._stats["requests"] / batches if batches else 0.0}
@@ -0,0 +1,69 @@
+"""
+ONNX Runtime backend with dynamic int8 quantization for sentence embedding models
+"""
+import os
+import platform
+from dotenv import load_dotenv
+from core.logging import logger
+
+load_dotenv()
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def _cpu_flags() -> set:
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    return set(line.split(":", 1)[1].split())
+    except OSError:
+        pass
+    return set()
+
+
+def quantization_config() -> str:
+    """Dynamic quantization preset for this CPU (``EMBEDDING_ONNX_QUANTIZATION`` overrides)."""
+    configured = os.getenv("EMBEDDING_ONNX_QUANTIZATION")
+    if configured:
+        return configured
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "arm64"
+    flags = _cpu_flags()
+    if "avx512_vnni" in flags:
+        return "avx512_vnni"
+    if "avx512f" in flags:
+        return "avx512"
+    return "avx2"
+
+
+def load_onnx_model(name: str, quantized: bool = True):
+    """SentenceTransformer ``name`` running on ONNX Runtime.
+
+    The same weights as the PyTorch model, so vectors stay comparable with an
+    already embedded corpus. With ``quantized`` the linear layers run in int8.
+    The quantized file is taken from the model repository when it ships one,
+    otherwise it is exported once into ``EMBEDDING_ONNX_DIR``.
+    """
+    try:
+        from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+    except ImportError as e:
+        raise RuntimeError("The ONNX embedding backend needs: pip install 'sentence-transformers[onnx]'") from e
+
+    if not quantized:
+        return SentenceTransformer(name, backend="onnx")
+
+    config = quantization_config()
+    prefix = "quint8" if config == "avx2" else "qint8"
+    file_name = f"model_{prefix}_{config}.onnx"
+    try:
+        return SentenceTransformer(name, backend="onnx", model_kwargs={"file_name": f"onnx/{file_name}"})
+    except Exception as e:
+        logger.info(f"No pre-quantized {file_name} for {name} ({e}), exporting one")
+
+    export_dir = os.path.join(os.getenv("EMBEDDING_ONNX_DIR", "data/onnx"), name.replace("/", "__"))
+    if not os.path.exists(os.path.join(export_dir, "onnx", file_name)):
+        model = SentenceTransformer(name, backend="onnx")
+        model.save_pretrained(export_dir)
+        export_dynamic_quantized_onnx_model(model, config, export_dir)
+    return SentenceTransformer(export_dir, backend="onnx", model_kwargs={"file_name": f"onnx/{file_name}"})
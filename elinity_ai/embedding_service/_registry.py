@@ -0,0 +1,118 @@
+"""
+Process-wide registry of ML models and network clients
+"""
+import gc
+import os
+import threading
+from typing import Callable, Dict, Iterable, List
+from dotenv import load_dotenv
+from core.logging import logger
+from ._batcher import EmbeddingBatcher
+from ._onnx import BACKENDS, load_onnx_model
+
+load_dotenv()
+
+DEFAULT_MODEL = "all-mpnet-base-v2"
+
+_models: Dict[str, object] = {}
+_batchers: Dict[str, EmbeddingBatcher] = {}
+_clients: Dict[str, tuple] = {}
+_lock = threading.RLock()
+
+
+def _backend(backend: str = None) -> str:
+    backend = (backend or os.getenv("EMBEDDING_BACKEND", "torch")).lower()
+    if backend not in BACKENDS:
+        raise RuntimeError(f"Unknown EMBEDDING_BACKEND: {backend}, expected one of {', '.join(BACKENDS)}")
+    return backend
+
+
+def get_sentence_model(name: str = DEFAULT_MODEL, backend: str = None):
+    """The process' only instance of a SentenceTransformer model.
+
+    ``backend`` (``EMBEDDING_BACKEND``) is ``torch``, ``onnx`` or ``onnx-int8``,
+    see ``load_onnx_model``. Models are loaded once and kept across forks:
+    weights loaded in a parent before it forks (see ``preload_models``) are
+    shared copy-on-write by every child instead of being loaded again in each worker.
+    """
+    backend = _backend(backend)
+    key = f"{name}:{backend}"
+    model = _models.get(key)
+    if model is None:
+        with _lock:
+            model = _models.get(key)
+            if model is None:
+                logger.info(f"Loading embedding model {name} on {backend} (pid {os.getpid()})")
+                if backend == "torch":
+                    from sentence_transformers import SentenceTransformer
+                    model = SentenceTransformer(name)
+                else:
+                    model = load_onnx_model(name, quantized=backend == "onnx-int8")
+                model.eval()
+                _models[key] = model
+    return model
+
+
+def get_embedding_batcher(name: str = DEFAULT_MODEL, backend: str = None) -> EmbeddingBatcher:
+    """The shared micro-batcher in front of ``get_sentence_model(name, backend)``."""
+    backend = _backend(backend)
+    key = f"{name}:{backend}"
+    batcher = _batchers.get(key)
+    if batcher is None:
+        with _lock:
+            batcher = _batchers.get(key)
+            if batcher is None:
+                batcher = _batchers[key] = EmbeddingBatcher(get_sentence_model(name, backend))
+    return batcher
+
+
+def get_client(key: str, factory: Callable[[], object]):
+    """A per-process client built by ``factory`` once and reused.
+
+    Sockets and connection pools must not be shared across a fork, so a client
+    inherited from a parent process is discarded and built again in the child.
+    """
+    pid = os.getpid()
+    entry = _clients.get(key)
+    if entry is None or entry[0] != pid:
+        with _lock:
+            entry = _clients.get(key)
+            if entry is None or entry[0] != pid:
+                entry = _clients[key] = (pid, factory())
+    return entry[1]
+
+
+def get_mongo_client(url: str = None):
+    """Shared MongoClient for ``url`` (``MONGO_DB_URL``); it pools its own connections."""
+    url = url or os.getenv("MONGO_DB_URL")
+    if not url:
+        raise RuntimeError("MONGO_DB_URL is required.")
+
+    def connect():
+        from pymongo import MongoClient
+        return MongoClient(url, serverSelectionTimeoutMS=5000)
+
+    return get_client(f"mongo:{url}", connect)
+
+
+def preload_models(names: Iterable[str] = None) -> List[str]:
+    """Load models in a parent process before it forks workers.
+
+    ``EMBEDDING_PRELOAD_MODELS`` (comma separated) overrides the default list.
+    Objects that exist now are moved out of the garbage collector's generations
+    so later collections in the children do not touch, and thereby copy, their pages.
+    """
+    if names is None:
+        names = [name.strip() for name in os.getenv("EMBEDDING_PRELOAD_MODELS", DEFAULT_MODEL).split(",") if name.strip()]
+    names = list(names)
+    for name in names:
+        get_sentence_model(name)
+    gc.collect()
+    gc.freeze()
+    return names
+
+
+def reset_clients() -> None:
+    """Forget clients inherited from a parent; call in a freshly forked worker."""
+    with _lock:
+        _clients.clear()
@@ -1,13 +1,19 @@
-from ._embeddings import ElinityEmbedding
+from ._embeddings import ElinityEmbedding, get_elinity_embedding, DESCRIPTION_MODES
+from ._profile_text import profile_text
 from ._mongodb import MongoDB
-from ._pinecone import pinecone_client
-from ._milvus import milvus_client
+from ._pinecone import PineconeClient, get_pinecone_client, iter_json_records
+from ._milvus import get_milvus_client
 
 
 
 __all__ = [
     'ElinityEmbedding',
+    'get_elinity_embedding',
+    'DESCRIPTION_MODES',
+    'profile_text',
     'MongoDB', 
-    'pinecone_client',
-    'milvus_client'
+    'PineconeClient',
+    'get_pinecone_client',
+    'iter_json_records',
+    'get_milvus_client'
     ]
\ No newline at end of file
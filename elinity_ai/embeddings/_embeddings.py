@@ -1,21 +1,47 @@
-from sentence_transformers import SentenceTransformer
-import google.generativeai as genai
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 from ._mongodb import MongoDB
+from ._profile_text import profile_text
+from elinity_ai.embedding_service import get_client, get_embedding_batcher, get_sentence_model
+from elinity_ai.llm_gateway import DEFAULT_LLM_MODEL, get_llm_gateway
 import os
 from core.logging import logger
 
-# Configure the API key
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+# How a profile becomes the text that is embedded:
+# - llm: Gemini self-description; a failed call fails that tenant's embedding
+# - llm-fallback: Gemini, with the template text when the call fails or times out
+# - template: deterministic profile_text only, no network calls
+DESCRIPTION_MODES = ("llm", "llm-fallback", "template")
+
+# Identifies the generated text for caching: bump it whenever the model or prompt below changes
+DESCRIPTION_PROMPT_VERSION = f"{DEFAULT_LLM_MODEL}:self-description:1"
+
+
+def check_description_mode(mode: Optional[str]) -> str:
+    mode = (mode or "llm").lower()
+    if mode not in DESCRIPTION_MODES:
+        raise ValueError(f"Unknown description mode: {mode}, expected one of {', '.join(DESCRIPTION_MODES)}")
+    return mode
 
-# Set up the model
-model = genai.GenerativeModel('gemini-2.0-flash')  # Or 'gemini-1.5-pro' if you have access
 
 class ElinityEmbedding: 
-    def __init__(self,model=None): 
+    def __init__(self,model=None,description_mode: str = None): 
         self.model_name = 'all-mpnet-base-v2' 
-        self.model = SentenceTransformer(self.model_name)
-        self.mongodb =  MongoDB(db_name= "personas",collection_name="profiles")
+        self.model = get_sentence_model(self.model_name)
+        self.batcher = get_embedding_batcher(self.model_name)
+        self._mongodb = None
+        # Switching modes changes every vector: re-embed all tenants (backfill --all) after a change
+        self.description_mode = check_description_mode(description_mode or os.getenv("EMBEDDING_DESCRIPTION_MODE"))
+        self.description_timeout = float(os.getenv("EMBEDDING_DESCRIPTION_TIMEOUT", 30))
+        self.prompt_version = DESCRIPTION_PROMPT_VERSION
+
+    @property
+    def mongodb(self):
+        # Only store() needs Mongo; don't connect just to create embeddings
+        if self._mongodb is None:
+            self._mongodb = MongoDB(db_name= "personas",collection_name="profiles")
+        return self._mongodb
         
     def generate_dummy_embedding(dimension):
         """Generates a random embedding for testing."""
@@ -45,20 +71,72 @@ class ElinityEmbedding:
         ```
         """
         try:
-            response = model.generate_content(prompt)
-            return response.text
+            # No retries in llm-fallback mode: a failing call falls back to the template at once
+            return get_llm_gateway().generate(
+                prompt,
+                timeout=self.description_timeout,
+                max_retries=0 if self.description_mode == "llm-fallback" else None,
+            )
         except Exception as e:
             logger.debug(f"Error during generation: {e}")
             return None
             
     def create_embedding(self,user_profile):
         if isinstance(user_profile,dict): 
-            desc = self._generate_self_description(user_profile)
-            return desc,self.model.encode(desc)
+            desc = self._describe(user_profile)
+            return desc,self.batcher.encode(desc)
         if isinstance(user_profile,str): 
-            return user_profile,self.model.encode(user_profile)
+            return user_profile,self.batcher.encode(user_profile)
         return None,None
 
+    def _describe(self,user_profile) -> Optional[str]:
+        if isinstance(user_profile,dict):
+            if self.description_mode == "template":
+                return profile_text(user_profile)
+            desc = self._generate_self_description(user_profile)
+            if not desc and self.description_mode == "llm-fallback":
+                logger.warning("Self-description failed, embedding the template profile text instead")
+                return profile_text(user_profile)
+            return desc
+        if isinstance(user_profile,str):
+            return user_profile
+        return None
+
+    def create_embeddings(self,user_profiles,max_workers: int = None) -> List[Tuple[Optional[str], Optional[np.ndarray]]]:
+        """Batch version of create_embedding, in input order.
+
+        Self-descriptions (see ``DESCRIPTION_MODES``) are generated concurrently, at most ``max_workers``
+        (``EMBEDDING_DESCRIPTION_CONCURRENCY``) LLM calls in flight, then every
+        text is encoded in one batched forward pass. A profile whose description
+        or encoding fails gets ``(None, None)`` without affecting the others.
+        """
+        if not user_profiles:
+            return []
+        max_workers = max_workers or int(os.getenv("EMBEDDING_DESCRIPTION_CONCURRENCY", 8))
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(user_profiles))) as pool:
+            texts = list(pool.map(self._describe, user_profiles))
+
+        results = [(None, None)] * len(texts)
+        described = [i for i, text in enumerate(texts) if text]
+        if not described:
+            return results
+        try:
+            vectors = self.batcher.encode_batch([texts[i] for i in described])
+        except Exception as e:
+            # Find the offending texts instead of failing the whole batch
+            logger.warning(f"Batched encode of {len(described)} texts failed ({e}), encoding one by one")
+            vectors = []
+            for i in described:
+                try:
+                    vectors.append(self.batcher.encode(texts[i]))
+                except Exception as item_error:
+                    logger.debug(f"Error encoding description {i}: {item_error}")
+                    vectors.append(None)
+        for i, vector in zip(described, vectors):
+            if vector is not None:
+                results[i] = (texts[i], vector)
+        return results
+
     def store(self,metadata,profile): 
         try:
             text,embedding = self.create_embedding(profile)
@@ -70,4 +148,7 @@ class ElinityEmbedding:
             logger.debug(f"Error storing embedding: {e}")
             return None
 
- 
\ No newline at end of file
+
+def get_elinity_embedding() -> ElinityEmbedding:
+    """Process-wide ElinityEmbedding, built once instead of per task run."""
+    return get_client("elinity_embedding", ElinityEmbedding)
@@ -1,6 +1,8 @@
 from pymilvus import MilvusClient
+from elinity_ai.vector_store import upsert_by_id
 from dotenv import load_dotenv
 from pymilvus import model
+from elinity_ai.embedding_service import get_client
 import os 
 
 load_dotenv()
@@ -16,21 +18,29 @@ class MilvusDB:
             raise RuntimeError("MILVUS_TOKEN not found") 
         self.dim=dim
         self.collection_name=collection_name
-        self.embedding_fn = model.DefaultEmbeddingFunction()
         self.client  = MilvusClient(uri=self._uri,token=self._token)
         if not self.client.has_collection(collection_name="tenants"):
                 self.client.create_collection(
                     collection_name=self.collection_name,
                     dimension=self.dim,
                 )
+
+    @property
+    def embedding_fn(self):
+        return get_client("milvus_default_embedding_fn", model.DefaultEmbeddingFunction)
+
     def embed_docs(self,docs):  
         return self.embedding_fn.encode_documents(docs)
         
-    def upsert(self,data):
-        res = self.client.insert(collection_name=self.collection_name,data=data)
-        return res
+    def upsert(self,data,batch_size=None):
+        # Replace by primary key: re-running an embedding keeps one vector per tenant
+        return upsert_by_id(self.client,self.collection_name,data,batch_size)
     
     def query(self,query): 
         return self.client.query(query)
         
-milvus_client = MilvusDB()
\ No newline at end of file
+
+
+def get_milvus_client() -> MilvusDB:
+    """Process-wide MilvusDB, connected on first use rather than at import."""
+    return get_client("embeddings_milvus_db", MilvusDB)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pymongo import MongoClient
+from elinity_ai.embedding_service import get_mongo_client
 import os
 from core.logging import logger
 from dotenv import load_dotenv
@@ -25,7 +25,8 @@ class MongoDB:
         logger.debug(f"Attempting to connect to MongoDB with URL: {masked_url}")
         
         try:
-            self.client = MongoClient(_connection_string, serverSelectionTimeoutMS=5000)
+            # One pooled client per process and URL, shared by every MongoDB instance
+            self.client = get_mongo_client(_connection_string)
             self.db = self.client[self.db_name] 
             self.collection = self.db[self.collection_name]
             logger.debug(f"MongoDB client initialized for database '{self.db_name}' and collection '{self.collection_name}'")
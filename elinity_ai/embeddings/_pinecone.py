@@ -1,10 +1,74 @@
 import os
 import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List
 from dotenv import load_dotenv
 from pinecone import Pinecone, ServerlessSpec
+from core.logging import logger
+from elinity_ai.embedding_service import get_client
+from ._profile_text import profile_text
 
 load_dotenv()
 
+# upsert_records accepts at most 96 records per request on indexes with integrated embedding
+UPSERT_BATCH_SIZE = 96
+UPSERT_CONCURRENCY = int(os.getenv("PINECONE_UPSERT_CONCURRENCY", 4))
+UPSERT_MAX_RETRIES = int(os.getenv("PINECONE_UPSERT_MAX_RETRIES", 5))
+
+
+def iter_json_records(path: str, chunk_size: int = 1 << 16) -> Iterator[Dict]:
+    """Records of a JSON array file (or JSON Lines for ``.jsonl``), read incrementally.
+
+    Only the current chunk and the record being decoded are held in memory,
+    so exports larger than RAM can be imported.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        buffer, started, eof = "", False, False
+        while not eof:
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            pos = 0
+            while True:
+                while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == ","):
+                    pos += 1
+                if pos == len(buffer):
+                    break
+                if not started:
+                    if buffer[pos] != "[":
+                        raise ValueError(f"{path} is not a JSON array")
+                    started = True
+                    pos += 1
+                    continue
+                if buffer[pos] == "]":
+                    return
+                try:
+                    record, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    break  # record continues in the next chunk
+                yield record
+                pos = end
+            buffer = buffer[pos:]
+        if started:
+            raise ValueError(f"{path} ends before the closing bracket")
+
+
+def _retryable(error: Exception) -> bool:
+    """Throttling, server errors and network failures; not bad requests."""
+    status = getattr(error, "status", None)
+    return status is None or status == 429 or status >= 500
+
 
 class PineconeClient:
     def __init__(self):
@@ -28,95 +92,7 @@ class PineconeClient:
         """
         Extract meaningful text content from the persona record for embedding
         """
-        text_parts = []
-        
-        # Personal info
-        personal = record.get("personal_info", {})
-        if personal.get("first_name"):
-            text_parts.append(f"First name: {personal['first_name']}")
-        if personal.get("last_name"):
-            text_parts.append(f"Last name: {personal['last_name']}")
-        if personal.get("age") and personal["age"] > 0:
-            text_parts.append(f"Age: {personal['age']}")
-        if personal.get("gender"):
-            text_parts.append(f"Gender: {personal['gender']}")
-        if personal.get("location"):
-            text_parts.append(f"Location: {personal['location']}")
-        if personal.get("occupation"):
-            text_parts.append(f"Occupation: {personal['occupation']}")
-        if personal.get("education"):
-            text_parts.append(f"Education: {personal['education']}")
-        if personal.get("relationship_status"):
-            text_parts.append(f"Relationship status: {personal['relationship_status']}")
-        
-        # Interests and hobbies
-        interests_hobbies = record.get("interests_and_hobbies", {})
-        if interests_hobbies.get("interests"):
-            text_parts.append(f"Interests: {', '.join(interests_hobbies['interests'])}")
-        if interests_hobbies.get("hobbies"):
-            text_parts.append(f"Hobbies: {', '.join(interests_hobbies['hobbies'])}")
-        
-        # Values and goals
-        values_goals = record.get("values_beliefs_and_goals", {})
-        if values_goals.get("values"):
-            text_parts.append(f"Values: {', '.join(values_goals['values'])}")
-        if values_goals.get("personal_goals"):
-            text_parts.append(f"Personal goals: {', '.join(values_goals['personal_goals'])}")
-        if values_goals.get("professional_goals"):
-            text_parts.append(f"Professional goals: {', '.join(values_goals['professional_goals'])}")
-        
-        # Favorites
-        favorites = record.get("favorites", {})
-        for category in ["movies", "music", "books", "art"]:
-            if favorites.get(category):
-                text_parts.append(f"Favorite {category}: {', '.join(favorites[category])}")
-        if favorites.get("quotes"):
-            text_parts.append(f"Favorite quotes: {', '.join(favorites['quotes'])}")
-        
-        # Relationship preferences
-        rel_prefs = record.get("relationship_preferences", {})
-        if rel_prefs.get("looking_for"):
-            text_parts.append(f"Looking for in relationships: {', '.join(rel_prefs['looking_for'])}")
-        if rel_prefs.get("what_i_offer"):
-            text_parts.append(f"What I offer in relationships: {', '.join(rel_prefs['what_i_offer'])}")
-        
-        # Collaboration preferences
-        collab_prefs = record.get("collaboration_preferences", {})
-        if collab_prefs.get("areas_of_expertise"):
-            text_parts.append(f"Areas of expertise: {', '.join(collab_prefs['areas_of_expertise'])}")
-        if collab_prefs.get("achievements"):
-            text_parts.append(f"Achievements: {', '.join(collab_prefs['achievements'])}")
-        
-        # Aspirations
-        aspirations = record.get("aspiration_and_reflections", {})
-        if aspirations.get("life_goals"):
-            text_parts.append(f"Life goals: {', '.join(aspirations['life_goals'])}")
-        if aspirations.get("bucket_list"):
-            text_parts.append(f"Bucket list: {', '.join(aspirations['bucket_list'])}")
-        
-        # Personal free form
-        free_form = record.get("personal_free_form", {})
-        if free_form.get("things_to_share"):
-            text_parts.append(f"Personal thoughts: {free_form['things_to_share']}")
-        
-        # Big Five traits (only include significant scores)
-        big_five = record.get("big_five_traits", {})
-        significant_traits = []
-        for trait, score in big_five.items():
-            if score > 0.7:  # High scores
-                significant_traits.append(f"High {trait}")
-            elif score < 0.3:  # Low scores
-                significant_traits.append(f"Low {trait}")
-        if significant_traits:
-            text_parts.append(f"Personality traits: {', '.join(significant_traits)}")
-        
-        # Ideal characteristics (only include high scores)
-        ideal_chars = record.get("ideal_characteristics", {})
-        high_characteristics = [char for char, score in ideal_chars.items() if score > 0.7]
-        if high_characteristics:
-            text_parts.append(f"Values in others: {', '.join(high_characteristics)}")
-        
-        return ". ".join(text_parts)
+        return profile_text(record)
 
     # Function to prepare record for upsert
     def _prepare_record_for_upsert(self,record):
@@ -127,7 +103,8 @@ class PineconeClient:
         
         # For Pinecone inference API, we need to structure the record differently
         prepared_record = {
-            "id": record["id"],
+            # Exported personas (scripts/data/personas.json) carry their id as unique_user_id
+            "id": str(record.get("id") or record["unique_user_id"]),
             "chunk_text": chunk_text
         }
         
@@ -164,21 +141,77 @@ class PineconeClient:
         
         return prepared_record
         
+    def _upsert_with_retry(self, batch: List[Dict], namespace: str, max_retries: int) -> int:
+        for attempt in range(max_retries + 1):
+            try:
+                self.index.upsert_records(namespace=namespace, records=batch)
+                return len(batch)
+            except Exception as e:
+                if attempt == max_retries or not _retryable(e):
+                    raise
+                # Exponential backoff with full jitter, so throttled workers do not retry in lockstep
+                delay = random.uniform(0, min(30.0, 0.5 * 2 ** attempt))
+                logger.warning(f"Pinecone upsert of {len(batch)} records failed ({e}), retry {attempt + 1} in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _prepare_and_upsert(self, records: List[Dict], namespace: str, max_retries: int) -> int:
+        batch = [self._prepare_record_for_upsert(record) for record in records]
+        # Records without any text to embed would be rejected with the whole batch
+        batch = [record for record in batch if record["chunk_text"]]
+        return self._upsert_with_retry(batch, namespace, max_retries) if batch else 0
+
     # For bulk upsert of multiple records:
-    def bulk_upsert_personas(self,records, namespace="personas", batch_size=100):
+    def bulk_upsert_personas(self,records: Iterable[Dict], namespace="personas", batch_size=UPSERT_BATCH_SIZE,
+                             concurrency: int = None, max_retries: int = None) -> Dict[str, float]:
         """
         Bulk upsert persona records to Pinecone
+
+        ``records`` may be any iterable, e.g. ``iter_json_records(path)``; it is
+        consumed batch by batch. Each of ``concurrency`` (``PINECONE_UPSERT_CONCURRENCY``)
+        workers prepares a batch and upserts it, retrying throttled and failed
+        requests with backoff. At most ``2 * concurrency`` batches are read ahead.
+        A batch that still fails is logged and counted, and the import goes on.
         """
-        prepared_records = [self._prepare_record_for_upsert(record) for record in records]
-    
-        # Process in batches
-        for i in range(0, len(prepared_records), batch_size):
-            batch = prepared_records[i:i + batch_size]
-            self.index.upsert_records(
-                namespace=namespace,
-                records=batch
+        concurrency = concurrency or UPSERT_CONCURRENCY
+        max_retries = UPSERT_MAX_RETRIES if max_retries is None else max_retries
+        records = iter(records)
+        stats = {"records": 0, "upserted": 0, "batches": 0, "failed_batches": 0}
+        started = time.perf_counter()
+        in_flight = {}  # future -> batch size
+
+        def collect(done):
+            for future in done:
+                size = in_flight.pop(future)
+                try:
+                    stats["upserted"] += future.result()
+                except Exception as e:
+                    stats["failed_batches"] += 1
+                    logger.error(f"Pinecone upsert of {size} records failed permanently: {e}")
+                stats["batches"] += 1
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"Upserted {stats['upserted']}/{stats['records']} records in {stats['batches']} batches, "
+                f"{stats['upserted'] / elapsed:.1f} records/sec"
             )
-            print(f"Upserted batch {i//batch_size + 1}: {len(batch)} records")
-           
-pinecone_client = PineconeClient()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while True:
+                batch = list(islice(records, batch_size))
+                if not batch:
+                    break
+                stats["records"] += len(batch)
+                in_flight[pool.submit(self._prepare_and_upsert, batch, namespace, max_retries)] = len(batch)
+                if len(in_flight) >= 2 * concurrency:
+                    collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+            if in_flight:
+                collect(wait(in_flight).done)
+
+        stats["seconds"] = time.perf_counter() - started
+        stats["records_per_sec"] = stats["upserted"] / stats["seconds"] if stats["seconds"] else 0.0
+        return stats
+
+
+def get_pinecone_client() -> PineconeClient:
+    """Process-wide PineconeClient, connected on first use rather than at import."""
+    return get_client("pinecone_client", PineconeClient)
   
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+Deterministic profile text, an LLM-free input for sentence embeddings
+"""
+from numbers import Number
+from typing import Any, Dict, List
+
+
+def _section(record: Dict, name: str) -> Dict:
+    # tenant_to_dict omits missing sections; imported personas may carry nulls
+    return record.get(name) or {}
+
+
+def _join(values: Any) -> str:
+    if isinstance(values, (list, tuple)):
+        return ", ".join(str(value) for value in values if value not in (None, ""))
+    return str(values)
+
+
+def _scores(section: Dict) -> Dict[str, float]:
+    return {
+        key: float(value) for key, value in section.items()
+        if isinstance(value, Number) and not isinstance(value, bool)
+    }
+
+
+def profile_text(record: Dict) -> str:
+    """Flatten a persona or ``tenant_to_dict`` profile into labelled sentences.
+
+    The same profile always gives the same text, so it can stand in for the
+    LLM self-description when embedding, and is cheap to cache and test.
+    """
+    text_parts: List[str] = []
+
+    # Personal info
+    personal = _section(record, "personal_info")
+    for key, label in (("first_name", "First name"), ("last_name", "Last name")):
+        if personal.get(key):
+            text_parts.append(f"{label}: {personal[key]}")
+    if isinstance(personal.get("age"), Number) and personal["age"] > 0:
+        text_parts.append(f"Age: {personal['age']}")
+    for key, label in (
+        ("gender", "Gender"),
+        ("location", "Location"),
+        ("occupation", "Occupation"),
+        ("education", "Education"),
+        ("relationship_status", "Relationship status"),
+    ):
+        if personal.get(key):
+            text_parts.append(f"{label}: {personal[key]}")
+
+    # List sections
+    for section, fields in (
+        ("interests_and_hobbies", (("interests", "Interests"), ("hobbies", "Hobbies"))),
+        ("values_beliefs_and_goals", (
+            ("values", "Values"),
+            ("personal_goals", "Personal goals"),
+            ("professional_goals", "Professional goals"),
+        )),
+        ("favorites", (
+            ("movies", "Favorite movies"),
+            ("music", "Favorite music"),
+            ("books", "Favorite books"),
+            ("art", "Favorite art"),
+            ("quotes", "Favorite quotes"),
+        )),
+        ("relationship_preferences", (
+            ("looking_for", "Looking for in relationships"),
+            ("what_i_offer", "What I offer in relationships"),
+        )),
+        ("collaboration_preferences", (
+            ("areas_of_expertise", "Areas of expertise"),
+            ("achievements", "Achievements"),
+        )),
+        ("aspiration_and_reflections", (("life_goals", "Life goals"), ("bucket_list", "Bucket list"))),
+    ):
+        values = _section(record, section)
+        for key, label in fields:
+            if values.get(key):
+                text_parts.append(f"{label}: {_join(values[key])}")
+
+    # Personal free form
+    free_form = _section(record, "personal_free_form")
+    if free_form.get("things_to_share"):
+        text_parts.append(f"Personal thoughts: {free_form['things_to_share']}")
+
+    # Big Five traits (only include significant scores)
+    significant_traits = []
+    for trait, score in _scores(_section(record, "big_five_traits")).items():
+        if score > 0.7:
+            significant_traits.append(f"High {trait}")
+        elif score < 0.3:
+            significant_traits.append(f"Low {trait}")
+    if significant_traits:
+        text_parts.append(f"Personality traits: {', '.join(significant_traits)}")
+
+    # Ideal characteristics (only include high scores)
+    high_characteristics = [char for char, score in _scores(_section(record, "ideal_characteristics")).items() if score > 0.7]
+    if high_characteristics:
+        text_parts.append(f"Values in others: {', '.join(high_characteristics)}")
+
+    return ". ".join(text_parts)
@@ -1,26 +1,64 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
+import json
 import os 
+from typing import Dict, List
 from dotenv import load_dotenv
+from pydantic import BaseModel, Field
 from langchain.schema import HumanMessage
-from langsmith import Client
+from core.logging import logger
+from elinity_ai.prompt_registry import get_prompt
+from elinity_ai.llm_gateway import get_llm_gateway
 
 load_dotenv()
 
+# Managed in LangSmith as "match-insight-batch" (scripts/register_prompts.py creates it from this text).
+# Only used when neither LangSmith nor the registry's saved copy has it.
+BATCH_INSIGHT_PROMPT = """
+You are Elinity, an AI that explains why people on a social connection app could be a good match.
+The searcher is looking for: "{query}" (an empty value means a general recommendation for them).
+
+For EACH candidate below, write a short, warm, specific insight (2-3 sentences) explaining why they
+could be a good connection, grounded in their interests and the similarity score (0 to 1).
+Return exactly one insight per candidate, using the candidate's user_id unchanged.
+
+Candidates:
+```json
+{candidates}
+```
+"""
+
+
+class CandidateInsight(BaseModel):
+    user_id: str = Field(description="The candidate's user_id, copied unchanged")
+    insight: str = Field(description="Why this candidate is a good match")
+
+
+class BatchInsights(BaseModel):
+    insights: List[CandidateInsight]
+
 class ElinityInsights:
     def __init__(self, llm_model: str = "gemini-2.0-flash",langsmith_api_key:str=None):
-        self.llm = ChatGoogleGenerativeAI(model=llm_model, temperature=0.7)
+        self.llm_model = llm_model
         
-        # Initialize LangSmith client
+        # Prompts come from the process-wide registry, warmed up at startup
         self.langsmith_api_key = langsmith_api_key or os.getenv("LANGSMITH_API_KEY")
         if self.langsmith_api_key:
             os.environ["LANGSMITH_API_KEY"] = self.langsmith_api_key
-            self.langsmith_client = Client(api_key=self.langsmith_api_key)
         else:
-            raise RuntimeError("Warning: LANGSMITH_API_KEY not found. Using fallback prompt.")
+            # get_prompt falls back to the last-known-good copy saved on disk
+            print("Warning: LANGSMITH_API_KEY not found. Will use the saved prompts.")
+
+    @property
+    def llm(self):
+        # Looked up per call: routers build this object at import, before workers fork
+        return get_llm_gateway().chat_model(self.llm_model, temperature=0.7)
+
+    @property
+    def batch_llm(self):
+        return self.llm.with_structured_output(BatchInsights)
 
     def generate_insight(self,query,user_id,user_name,score,user_interests):
         try: 
-            prompt = self.langsmith_client.pull_prompt('match-insight-generation') 
+            prompt = get_prompt('match-insight-generation') 
             formatted_prompt = prompt.format(
                     query=query,
                     user_id=user_id,
@@ -34,3 +72,37 @@ class ElinityInsights:
             return response.content 
         except Exception as e:
             raise RuntimeError(f"Failed to pull insight prompt: {e}")
+
+    def generate_insights(self, query, candidates: List[Dict]) -> Dict[str, str]:
+        """
+        Generate insights for every candidate of a recommendation page in one LLM call.
+
+        Args:
+            query: The search query, or an empty string for profile-based recommendations.
+            candidates: Dicts with user_id, user_name, score and user_interests.
+
+        Returns:
+            A mapping of user_id to insight text. Candidates the model skipped are
+            missing from the mapping so the caller can apply its own fallback.
+        """
+        if not candidates:
+            return {}
+        try:
+            template = get_prompt('match-insight-batch')
+        except Exception as e:
+            logger.warning(f"Prompt match-insight-batch unavailable ({e}), using the built-in copy")
+            template = BATCH_INSIGHT_PROMPT
+        try:
+            prompt = template.format(
+                query=query,
+                candidates=json.dumps(candidates, default=str, indent=2),
+            )
+            response = self.batch_llm.invoke([HumanMessage(content=prompt)])
+            expected = {str(c["user_id"]) for c in candidates}
+            return {
+                item.user_id: item.insight
+                for item in response.insights
+                if item.user_id in expected and item.insight
+            }
+        except Exception as e:
+            raise RuntimeError(f"Failed to generate batch insights: {e}")
@@ -0,0 +1,3 @@
+from ._gateway import LLMGateway, GeminiLLM, get_llm_gateway, DEFAULT_LLM_MODEL
+
+__all__ = ["LLMGateway", "GeminiLLM", "get_llm_gateway", "DEFAULT_LLM_MODEL"]
@@ -0,0 +1,144 @@
+"""
+Process-wide gateway for every Gemini call
+"""
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from langchain_core.language_models.llms import LLM
+from pydantic import Field
+from dotenv import load_dotenv
+from core.logging import logger
+from elinity_ai.embedding_service import get_client
+
+load_dotenv()
+
+DEFAULT_LLM_MODEL = "gemini-2.0-flash"
+
+# Throttling and transient server errors (5xx, deadlines) are retried; bad requests are not
+RETRYABLE_ERRORS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServerError,
+)
+
+
+def _response_text(response) -> str:
+    return response.text if hasattr(response, 'text') else response.parts[0].text
+
+
+class LLMGateway:
+    """The single Gemini client of a process; every AI component calls through it.
+
+    ``genai.configure`` runs once here, so all models share one gRPC (HTTP/2)
+    channel instead of each component configuring the SDK and opening its own.
+    Models and LangChain chat models are built once per configuration and
+    reused. Every call has a deadline (``LLM_TIMEOUT``), is retried with
+    jittered exponential backoff on throttling and server errors
+    (``LLM_MAX_RETRIES``), and waits for one of ``LLM_MAX_CONCURRENCY`` slots.
+
+    The async methods run the call on a worker thread, so the event loop is
+    never blocked; unlike a ``grpc.aio`` channel, which is bound to the loop that
+    created it, the shared channel works from any loop or thread.
+    """
+
+    def __init__(self, api_key: str = None, timeout: float = None, max_retries: int = None, max_concurrency: int = None):
+        self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
+        if not self.api_key:
+            raise RuntimeError("GOOGLE_API_KEY is required.")
+        genai.configure(api_key=self.api_key)
+        self.timeout = timeout or float(os.getenv("LLM_TIMEOUT", 60))
+        self.max_retries = int(os.getenv("LLM_MAX_RETRIES", 3)) if max_retries is None else max_retries
+        self._slots = threading.BoundedSemaphore(max_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", 32)))
+        self._models: Dict[str, genai.GenerativeModel] = {}
+        self._chat_models: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def model(self, name: str = DEFAULT_LLM_MODEL, **config) -> genai.GenerativeModel:
+        """Shared ``GenerativeModel`` for ``name`` and its ``generation_config``/``safety_settings``."""
+        key = f"{name}:{json.dumps(config, sort_keys=True, default=str)}"
+        model = self._models.get(key)
+        if model is None:
+            with self._lock:
+                model = self._models.get(key)
+                if model is None:
+                    model = self._models[key] = genai.GenerativeModel(name, **config)
+        return model
+
+    def chat_model(self, name: str = DEFAULT_LLM_MODEL, temperature: float = 0.7):
+        """Shared LangChain ``ChatGoogleGenerativeAI`` with the gateway's timeout and retries."""
+        key = f"{name}:{temperature}"
+        chat_model = self._chat_models.get(key)
+        if chat_model is None:
+            with self._lock:
+                chat_model = self._chat_models.get(key)
+                if chat_model is None:
+                    from langchain_google_genai import ChatGoogleGenerativeAI
+                    chat_model = self._chat_models[key] = ChatGoogleGenerativeAI(
+                        model=name,
+                        temperature=temperature,
+                        google_api_key=self.api_key,
+                        timeout=self.timeout,
+                        max_retries=self.max_retries,
+                    )
+        return chat_model
+
+    def call(self, fn: Callable, *args, max_retries: int = None, **kwargs):
+        """``fn(*args, **kwargs)`` within a concurrency slot, retried on transient errors."""
+        max_retries = self.max_retries if max_retries is None else max_retries
+        for attempt in range(max_retries + 1):
+            try:
+                with self._slots:
+                    return fn(*args, **kwargs)
+            except RETRYABLE_ERRORS as e:
+                if attempt == max_retries:
+                    raise
+                delay = random.uniform(0, min(20.0, 2 ** attempt))
+                logger.warning(f"Gemini call failed ({e}), retry {attempt + 1} in {delay:.1f}s")
+                time.sleep(delay)
+
+    def generate(self, prompt, model: str = DEFAULT_LLM_MODEL, timeout: float = None, max_retries: int = None, **config) -> str:
+        """Text of a single ``generate_content`` call."""
+        response = self.call(
+            self.model(model, **config).generate_content,
+            prompt,
+            request_options={"timeout": timeout or self.timeout},
+            max_retries=max_retries,
+        )
+        return _response_text(response)
+
+    async def agenerate(self, prompt, model: str = DEFAULT_LLM_MODEL, timeout: float = None, max_retries: int = None, **config) -> str:
+        return await asyncio.to_thread(self.generate, prompt, model, timeout, max_retries, **config)
+
+    def send_message(self, chat, content, timeout: float = None) -> str:
+        """Text of the reply to ``content`` in a ``ChatSession`` (its history only grows on success)."""
+        response = self.call(chat.send_message, content, request_options={"timeout": timeout or self.timeout})
+        return _response_text(response)
+
+    async def asend_message(self, chat, content, timeout: float = None) -> str:
+        return await asyncio.to_thread(self.send_message, chat, content, timeout)
+
+
+def get_llm_gateway() -> LLMGateway:
+    """The process' LLMGateway; a forked worker builds its own instead of reusing the parent's channel."""
+    return get_client("llm_gateway", LLMGateway)
+
+
+class GeminiLLM(LLM):
+    """LangChain LLM over the gateway, for prompt | llm | parser chains."""
+    model_name: str = Field(default=DEFAULT_LLM_MODEL)
+
+    @property
+    def _llm_type(self) -> str:
+        return "gemini_custom"
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> str:
+        return get_llm_gateway().generate(prompt, self.model_name)
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> str:
+        return await get_llm_gateway().agenerate(prompt, self.model_name)
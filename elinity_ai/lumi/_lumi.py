@@ -2,10 +2,10 @@ from typing import Dict, List, Optional, TypedDict, Annotated
 from langgraph.graph import StateGraph, END
 from langchain.prompts import PromptTemplate
 from langchain.schema import HumanMessage, AIMessage 
-from langchain_google_genai import ChatGoogleGenerativeAI
+from elinity_ai.llm_gateway import get_llm_gateway
 from langchain.memory import ConversationBufferWindowMemory
 import operator
-from langsmith import Client
+from elinity_ai.prompt_registry import get_prompt
 import os
 from enum import Enum
 from dotenv import load_dotenv
@@ -31,17 +31,17 @@ class CoachingState(TypedDict):
 
 class AICoachingSystem:
     def __init__(self, llm_model: str = "gemini-2.0-flash",langsmith_api_key:str=None):
-        self.llm = ChatGoogleGenerativeAI(model=llm_model, temperature=0.7)
+        self.llm = get_llm_gateway().chat_model(llm_model, temperature=0.7)
         self.memory = ConversationBufferWindowMemory(k=10)
         self.graph = self._build_graph()
         
-        # Initialize LangSmith client
+        # Prompts come from the process-wide registry, warmed up at startup
         self.langsmith_api_key = langsmith_api_key or os.getenv("LANGSMITH_API_KEY")
         if self.langsmith_api_key:
             os.environ["LANGSMITH_API_KEY"] = self.langsmith_api_key
-            self.langsmith_client = Client(api_key=self.langsmith_api_key)
         else:
-            raise RuntimeError("Warning: LANGSMITH_API_KEY not found. Using fallback prompt.")
+            # get_prompt falls back to the last-known-good copy saved on disk
+            print("Warning: LANGSMITH_API_KEY not found. Will use the saved prompts.")
             
     def _build_graph(self) -> StateGraph:
         workflow = StateGraph(CoachingState)
@@ -80,7 +80,7 @@ class AICoachingSystem:
     def _mode_selector_node(self, state: CoachingState) -> Dict:
         """Analyzes user input to determine appropriate coaching mode"""
         try: 
-            prompt = self.langsmith_client.pull_prompt('elinity-mode-selector')
+            prompt = get_prompt('elinity-mode-selector')
             last_message = state["messages"][-1] if state["messages"] else ""
             formatted_prompt = prompt.format(
                     user_message=last_message,
@@ -105,7 +105,7 @@ class AICoachingSystem:
     def _deep_conversation_node(self, state: CoachingState) -> Dict:
         """Facilitates deep, meaningful conversations"""
         try:  
-            prompt = self.langsmith_client.pull_prompt('elinity-deep-conversation')
+            prompt = get_prompt('elinity-deep-conversation')
             response = self.llm.invoke([
                 HumanMessage(content=prompt.format(
                     conversation_depth=state.get("conversation_depth", 1),
@@ -123,7 +123,7 @@ class AICoachingSystem:
     def _socratic_learning_node(self, state: CoachingState) -> Dict:
         """Uses Socratic method for learning and growth"""
         try:
-            prompt = self.langsmith_client.pull_prompt("elinity-socratic-mode")
+            prompt = get_prompt("elinity-socratic-mode")
             response = self.llm.invoke([
                 HumanMessage(content=prompt.format(
                     current_topic=self._extract_current_topic(state["messages"]),
@@ -138,7 +138,7 @@ class AICoachingSystem:
     def _relationship_flourishing_node(self, state: CoachingState) -> Dict:
         try:
             """Focuses on building and strengthening relationships"""
-            prompt = self.langsmith_client.pull_prompt("elinity-relationship-fourish-mode")
+            prompt = get_prompt("elinity-relationship-fourish-mode")
             response = self.llm.invoke([
                 HumanMessage(content=prompt.format(
                     relationship_context=state.get("relationship_context", {}),
@@ -154,7 +154,7 @@ class AICoachingSystem:
     def _relationship_therapy_node(self, state: CoachingState) -> Dict:
         """Addresses relationship conflicts and therapeutic issues"""
         try: 
-            prompt = self.langsmith_client.pull_prompt("elinity-therapy-mode") 
+            prompt = get_prompt("elinity-therapy-mode") 
             response = self.llm.invoke([
                 HumanMessage(content=prompt.format(
                     relationship_issues=self._extract_relationship_issues(state["messages"]),
@@ -170,7 +170,7 @@ class AICoachingSystem:
     def _personal_coach_node(self, state: CoachingState) -> Dict:
         """Provides personal coaching for goals and development"""
         try: 
-            prompt = self.langsmith_client.pull_prompt("elinity-personal-coach-mode") 
+            prompt = get_prompt("elinity-personal-coach-mode") 
             response = self.llm.invoke([
                 HumanMessage(content=prompt.format(
                     user_goals=state.get("user_goals", []),
@@ -228,3 +228,20 @@ class AICoachingSystem:
         result = self.graph.invoke(current_state)
         return result
 
+    async def aprocess_message(self, user_message: str, current_state: Optional[CoachingState] = None) -> Dict:
+        """Like process_message, for async routes: the graph runs its nodes off the event loop."""
+        if current_state is None:
+            current_state = {
+                "messages": [HumanMessage(content=user_message)],
+                "current_mode": "",
+                "conversation_depth": 1,
+                "user_goals": [],
+                "session_context": {},
+                "emotional_state": "neutral",
+                "relationship_context": {}
+            }
+        else:
+            current_state["messages"].append(HumanMessage(content=user_message))
+
+        return await self.graph.ainvoke(current_state)
+
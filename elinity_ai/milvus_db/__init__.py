@@ -1,5 +1,6 @@
-from ._milvus_db import milvus_db
-from ._similarity_pipeline import MilvusUserSimilarityPipeline
+from ._milvus_db import MilvusDB, ElinityQueryEmbedding, get_milvus_db, get_query_embedding
+from ._similarity_pipeline import MilvusUserSimilarityPipeline, get_similarity_pipeline
+from ._query_cache import QueryEmbeddingCache, normalize_query
 
 
-__all__ = ["milvus_db", "MilvusUserSimilarityPipeline"]
\ No newline at end of file
+__all__ = ["MilvusDB", "ElinityQueryEmbedding", "get_milvus_db", "get_query_embedding", "MilvusUserSimilarityPipeline", "get_similarity_pipeline", "QueryEmbeddingCache", "normalize_query"]
\ No newline at end of file
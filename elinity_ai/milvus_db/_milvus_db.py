@@ -1,22 +1,46 @@
+import asyncio
 from pymilvus import MilvusClient
+from elinity_ai.vector_store import upsert_by_id
 import google.generativeai as genai
 import numpy as np
 import json
-from sentence_transformers import SentenceTransformer
 from pymilvus import model
 from dotenv import load_dotenv
 import os 
+import threading
+from ._query_cache import QueryEmbeddingCache, normalize_query
+from elinity_ai.embedding_service import get_client, get_embedding_batcher, get_sentence_model
 
 load_dotenv()
 
 
 class ElinityQueryEmbedding: 
-    def __init__(self,model=None): 
+    def __init__(self,model=None,cache=None): 
         self.model_name = 'all-mpnet-base-v2' 
-        self.model = SentenceTransformer(self.model_name)
+        self.model = get_sentence_model(self.model_name)
+        self.batcher = get_embedding_batcher(self.model_name)
+        self.cache = cache
 
     def create_embedding(self,desc): 
-        return self.model.encode(desc) 
+        if self.cache is None:
+            return self.batcher.encode(desc)
+        normalized = normalize_query(desc)
+        embedding = self.cache.get(normalized)
+        if embedding is None:
+            embedding = self.batcher.encode(normalized)
+            self.cache.set(normalized, embedding)
+        return embedding
+
+    async def acreate_embedding(self,desc):
+        """Like create_embedding, but awaits the batcher instead of blocking the event loop."""
+        if self.cache is None:
+            return await self.batcher.aencode(desc)
+        normalized = normalize_query(desc)
+        embedding = await asyncio.to_thread(self.cache.get, normalized)
+        if embedding is None:
+            embedding = await self.batcher.aencode(normalized)
+            await asyncio.to_thread(self.cache.set, normalized, embedding)
+        return embedding
 
 
 class MilvusDB: 
@@ -28,10 +52,9 @@ class MilvusDB:
         if not self._token:
             raise RuntimeError("MILVUS_TOKEN not found") 
         self.dim=dim
-        self.embedding = ElinityQueryEmbedding()
+        self.embedding = get_query_embedding()
         self.collection_name=collection_name
         self.top_k = top_k
-        self.embedding_fn = model.DefaultEmbeddingFunction()
         self.client  = MilvusClient(uri=self._uri,token=self._token)
         if not self.client.has_collection(collection_name=self.collection_name):
                 self.client.create_collection(
@@ -39,12 +62,17 @@ class MilvusDB:
                     dimension=self.dim,
                 )
             
+    @property
+    def embedding_fn(self):
+        # pymilvus' default ONNX model is only loaded if embed_docs is actually used
+        return get_client("milvus_default_embedding_fn", model.DefaultEmbeddingFunction)
+
     def embed_docs(self,docs):  
         return self.embedding_fn.encode_documents(docs)
         
-    def upsert(self,data):
-        res = self.client.insert(collection_name=self.collection_name,data=data)
-        return res
+    def upsert(self,data,batch_size=None):
+        # Replace by primary key: re-running an embedding keeps one vector per tenant
+        return upsert_by_id(self.client,self.collection_name,data,batch_size)
     
     def query(self,query): 
         query_vector = self.embedding.create_embedding(query)
@@ -56,7 +84,27 @@ class MilvusDB:
         )
 
 
- 
 
- 
-milvus_db = MilvusDB()
\ No newline at end of file
+_query_embedding = None
+_milvus_db = None
+_lock = threading.RLock()
+
+
+def get_query_embedding() -> ElinityQueryEmbedding:
+    """Process-wide query embedder (shared model, batcher and cache), created on first use."""
+    global _query_embedding
+    if _query_embedding is None:
+        with _lock:
+            if _query_embedding is None:
+                _query_embedding = ElinityQueryEmbedding(cache=QueryEmbeddingCache('all-mpnet-base-v2'))
+    return _query_embedding
+
+
+def get_milvus_db() -> MilvusDB:
+    """Process-wide MilvusDB, created on first use rather than at import."""
+    global _milvus_db
+    if _milvus_db is None:
+        with _lock:
+            if _milvus_db is None:
+                _milvus_db = MilvusDB()
+    return _milvus_db
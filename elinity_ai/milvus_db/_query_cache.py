@@ -0,0 +1,92 @@
+from collections import OrderedDict
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+import numpy as np
+import redis
+from dotenv import load_dotenv
+from core.logging import logger
+
+load_dotenv()
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold and collapse whitespace so trivially different queries share a key."""
+    query = unicodedata.normalize("NFKC", query or "")
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class QueryEmbeddingCache:
+    """Two-tier cache for query embeddings.
+
+    Tier one is an in-process LRU of numpy vectors. Tier two is Redis, shared by
+    every API worker, holding the raw float32 bytes. Redis is optional: if
+    ``REDIS_URL`` is unset or unreachable the cache silently degrades to LRU only.
+    """
+
+    def __init__(self, model_name: str, maxsize: int = None, ttl: int = None, redis_url: str = None):
+        self.model_name = model_name
+        self.maxsize = maxsize or int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", 4096))
+        self.ttl = ttl or int(os.getenv("QUERY_EMBEDDING_CACHE_TTL", 7 * 24 * 3600))
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"lru_hits": 0, "redis_hits": 0, "misses": 0}
+        redis_url = redis_url or os.getenv("REDIS_URL")
+        self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.05) if redis_url else None
+
+    def _key(self, normalized: str) -> str:
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+        return f"query_embedding:{self.model_name}:{digest}"
+
+    def _remember(self, key, vector):
+        with self._lock:
+            self._lru[key] = vector
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.maxsize:
+                self._lru.popitem(last=False)
+
+    def get(self, normalized: str):
+        key = self._key(normalized)
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+                self._stats["lru_hits"] += 1
+                return vector
+
+        if self._redis is not None:
+            try:
+                raw = self._redis.get(key)
+            except redis.RedisError as e:
+                logger.debug(f"Query embedding cache: redis get failed: {e}")
+                raw = None
+            if raw:
+                vector = np.frombuffer(raw, dtype=np.float32)
+                self._remember(key, vector)
+                with self._lock:
+                    self._stats["redis_hits"] += 1
+                return vector
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def set(self, normalized: str, vector):
+        key = self._key(normalized)
+        vector = np.asarray(vector, dtype=np.float32)
+        self._remember(key, vector)
+        if self._redis is not None:
+            try:
+                self._redis.set(key, vector.tobytes(), ex=self.ttl)
+            except redis.RedisError as e:
+                logger.debug(f"Query embedding cache: redis set failed: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["lru_size"] = len(self._lru)
+        lookups = stats["lru_hits"] + stats["redis_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["lru_hits"] + stats["redis_hits"]) / lookups if lookups else 0.0
+        return stats
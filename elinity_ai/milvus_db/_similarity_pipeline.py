@@ -1,17 +1,27 @@
 from pymilvus import connections, Collection
 from dotenv import load_dotenv
+import asyncio
+import threading
 import os 
 
 load_dotenv()
 
+# Only fetch what the recommendation endpoints need, not the stored tenant blob
+DEFAULT_OUTPUT_FIELDS = ["id"]
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
 class MilvusUserSimilarityPipeline:
-    def __init__(self, collection_name="tenants", uri=None, token=None):
+    def __init__(self, collection_name="tenants", uri=None, token=None, alias="default"):
         """Initialize the Milvus similarity search pipeline using URI and token.
         
         Args:
             collection_name: Name of the Milvus collection
             uri: Milvus URI (defaults to environment variable)
             token: Milvus token (defaults to environment variable)
+            alias: Connection alias, reused if it is already connected
         """
         # Get URI and token from environment variables if not provided
         self.uri = uri or os.getenv("MILVUS_URI")
@@ -20,15 +30,18 @@ class MilvusUserSimilarityPipeline:
         if not self.uri or not self.token:
             raise ValueError("Milvus URI and token must be provided or set as environment variables")
         
+        self.alias = alias
+
         # Connect to Milvus server using URI and token
-        connections.connect(
-            alias="default",
-            uri=self.uri,
-            token=self.token
-        )
+        if not connections.has_connection(self.alias):
+            connections.connect(
+                alias=self.alias,
+                uri=self.uri,
+                token=self.token
+            )
         
         # Get the collection
-        self.collection = Collection(collection_name)
+        self.collection = Collection(collection_name, using=self.alias)
         self.collection.load()
     
     def get_user_vector_by_id(self, user_id):
@@ -47,7 +60,7 @@ class MilvusUserSimilarityPipeline:
         user_vector = results[0]["vector"]
         return user_vector
     
-    def find_similar_users(self, query_vector, top_k=10, exclude_ids=None):
+    def find_similar_users(self, query_vector, top_k=10, exclude_ids=None, output_fields=None):
         """Find similar users based on vector similarity."""
         search_params = {
             "metric_type": "COSINE",  # or "IP" for inner product, "COSINE" for cosine similarity
@@ -61,7 +74,7 @@ class MilvusUserSimilarityPipeline:
             param=search_params,
             limit=top_k,
             expr=None if not exclude_ids else f"id != {exclude_ids}",
-            output_fields=["id", "*"]  # Return ID and all metadata fields
+            output_fields=output_fields or DEFAULT_OUTPUT_FIELDS
         )
         
         # Process and return results
@@ -91,7 +104,21 @@ class MilvusUserSimilarityPipeline:
         
         return similar_users
     
+    async def afind_similar_users_by_id(self, user_id, top_k=10, include_self=False):
+        """Async wrapper that runs the search in a worker thread."""
+        return await asyncio.to_thread(self.find_similar_users_by_id, user_id, top_k, include_self)
+    
     def close(self):
         """Close the connection to Milvus."""
-        connections.disconnect("default")
+        connections.disconnect(self.alias)
+
+
+def get_similarity_pipeline():
+    """Return the process-wide pipeline, connecting and loading the collection once."""
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = MilvusUserSimilarityPipeline()
+    return _pipeline
 
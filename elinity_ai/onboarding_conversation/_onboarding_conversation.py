@@ -10,6 +10,7 @@ from google.genai.types import (
 )
 import json
 from ._prompts import ONBOARD_PROMPT
+from elinity_ai.llm_gateway import get_llm_gateway
 from pydantic import BaseModel
 
 class ConversationChat(BaseModel):
@@ -27,24 +28,18 @@ def welcome_message():
 
 class ElinityOnboardingConversation: 
     
-    def __init__(self, model_name="gemini-2.0-flash",system_prompt=ONBOARD_PROMPT,api_key=None,welcome_message="",generation_config=None,safety_settings=None,conversation_history=None):
-        """Configure the Gemini API with the API key.
+    def __init__(self, model_name="gemini-2.0-flash",system_prompt=ONBOARD_PROMPT,welcome_message="",generation_config=None,safety_settings=None,conversation_history=None):
+        """Start an onboarding chat on the shared LLM gateway, which holds the GOOGLE_API_KEY.
     
-        Args:
-            custom_api_key: Optional API key to override the one in .env file
-            
-        Returns:
-            bool: True if configuration was successful
         Variables: 
             model_name: The name of the model to use
             system_prompt: The system prompt to use
-            api_key: The API key to use
             chat: The chat object
             session_end: Whether the session has ended
             current_question_index: The index of the current question
             conversation_history: List of conversation messages i.e List[ConversationChat]
         Raises:
-            ValueError: If no API key is available
+            RuntimeError: If GOOGLE_API_KEY is not set
         """ 
         self.generation_config = generation_config or  {
             "temperature": 0.7,
@@ -70,13 +65,10 @@ class ElinityOnboardingConversation:
         }
         
         self.welcome_message = "Hello! I'm ElinityAI, your personal social connection guide. I'm here to get to know you better so I can help you find meaningful connections. Let's have a relaxed conversation. Could you start by telling me a little about yourself?"
-        api_key = api_key or os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            raise  ValueError("No API key provided. Either set GOOGLE_API_KEY environment variable in .env file or provide a custom API key.")
-        genai.configure(api_key=api_key)
         self.default_role = "system"
-        self.model = genai.GenerativeModel(
-            model_name=model_name,
+        # Shared with every other conversation on the same settings; a chat session only holds history
+        self.model = get_llm_gateway().model(
+            model_name,
             safety_settings=safety_settings,
             generation_config=generation_config
         )
@@ -100,29 +92,28 @@ class ElinityOnboardingConversation:
         chat = ConversationChat(role=role,content=content)
         self.conversation_history.append(chat) 
     
+    def _user_turn(self,user_message):
+        """Add the user's message to history and format it for Gemini with a brevity reminder."""
+        self.add_message(role="user",content=user_message)
+        message_with_reminder = f"{user_message}\n\nRemember to keep your response very brief (1-3 sentences) and conversational."
+        return {"parts": [{"text": message_with_reminder}]}
+
     def get_next_prompt(self,user_message):
         """Get the next prompt from Gemini based on the user's message."""
         if not user_message:
             return "I didn't catch that. Could you please repeat?"
-            
-        # Add user message to history
-        self.add_message(role="user",content=user_message) 
-        
-        # Format message for Gemini with brevity reminder
-        message_with_reminder = f"{user_message}\n\nRemember to keep your response very brief (1-3 sentences) and conversational."
-        
-        # Send message to Gemini with proper format
-        assistant_response = self.chat.send_message(
-            {"parts": [{"text": message_with_reminder}]}
-        ) 
-        
+        assistant_response = get_llm_gateway().send_message(self.chat, self._user_turn(user_message))
         # Add Gemini Response to conversation history 
-        self.add_message(assistant_response.text, role="user")
-        
-        # Add Gemini Response to conversation history 
-        self.add_message(assistant_response.text)
-        
-        return assistant_response.text 
+        self.add_message(assistant_response)
+        return assistant_response
+
+    async def aget_next_prompt(self,user_message):
+        """Like get_next_prompt, without blocking the event loop on the Gemini call."""
+        if not user_message:
+            return "I didn't catch that. Could you please repeat?"
+        assistant_response = await get_llm_gateway().asend_message(self.chat, self._user_turn(user_message))
+        self.add_message(assistant_response)
+        return assistant_response
 
     def start_conversation(self):
         # Add welcome message to the user 
@@ -0,0 +1,3 @@
+from ._registry import PromptRegistry, PROMPT_NAMES, get_prompt_registry, get_prompt
+
+__all__ = ["PromptRegistry", "PROMPT_NAMES", "get_prompt_registry", "get_prompt"]
@@ -0,0 +1,146 @@
+"""
+LangSmith prompts held in memory, refreshed in the background and kept on disk
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from dotenv import load_dotenv
+from core.logging import logger
+from elinity_ai.embedding_service import get_client
+
+load_dotenv()
+
+# Every prompt the AI components pull, loaded together at startup
+PROMPT_NAMES = (
+    "elinity-mode-selector",
+    "elinity-deep-conversation",
+    "elinity-socratic-mode",
+    "elinity-relationship-fourish-mode",
+    "elinity-therapy-mode",
+    "elinity-personal-coach-mode",
+    "match-insight-generation",
+    "match-insight-batch",
+    "question-card-generator",
+)
+
+
+class PromptRegistry:
+    """Named LangSmith prompts, pulled once and served from memory.
+
+    A prompt older than ``ttl`` seconds (``PROMPT_TTL``) is still returned at
+    once while a background thread pulls the current version, so no request
+    waits on LangSmith after warm-up. Every successful pull is also written to
+    ``cache_dir`` (``PROMPT_CACHE_DIR``); when LangSmith is unreachable, at a
+    cold start or on refresh, the last-known-good copy is used instead.
+    """
+
+    def __init__(self, ttl: float = None, cache_dir: str = None, api_key: str = None):
+        self.ttl = ttl or float(os.getenv("PROMPT_TTL", 300))
+        self.cache_dir = cache_dir or os.getenv("PROMPT_CACHE_DIR", "data/prompts")
+        self.api_key = api_key or os.getenv("LANGSMITH_API_KEY")
+        self._client = None
+        self._prompts: Dict[str, Tuple[object, float]] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None and self.api_key:
+            from langsmith import Client
+            self._client = Client(api_key=self.api_key)
+        return self._client
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.cache_dir, f"{name}.json")
+
+    def _save(self, name: str, prompt) -> None:
+        from langchain_core.load import dumps
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = self._file(name) + ".tmp"
+            with open(tmp_path, "w") as f:
+                f.write(dumps(prompt))
+            os.replace(tmp_path, self._file(name))
+        except Exception as e:
+            logger.warning(f"Could not save prompt {name} to {self.cache_dir}: {e}")
+
+    def _load_saved(self, name: str):
+        from langchain_core.load import loads
+        with open(self._file(name)) as f:
+            return loads(f.read())
+
+    def _pull(self, name: str):
+        if self.client is None:
+            raise RuntimeError("LANGSMITH_API_KEY not found")
+        prompt = self.client.pull_prompt(name)
+        self._save(name, prompt)
+        return prompt
+
+    def _load(self, name: str):
+        """Pull ``name``, or fall back to its last-known-good copy on disk."""
+        try:
+            return self._pull(name)
+        except Exception as e:
+            if not os.path.exists(self._file(name)):
+                raise RuntimeError(f"Failed to pull prompt {name} and no saved copy exists: {e}")
+            logger.warning(f"Failed to pull prompt {name} ({e}), using the saved copy")
+            return self._load_saved(name)
+
+    def _refresh(self, name: str) -> None:
+        try:
+            prompt = self._pull(name)
+            with self._lock:
+                self._prompts[name] = (prompt, time.monotonic())
+        except Exception as e:
+            # Keep serving the current version; retry after another ttl
+            logger.warning(f"Failed to refresh prompt {name}: {e}")
+            with self._lock:
+                if name in self._prompts:
+                    self._prompts[name] = (self._prompts[name][0], time.monotonic())
+        finally:
+            with self._lock:
+                self._refreshing.discard(name)
+
+    def get(self, name: str):
+        """The prompt ``name``; only the first use of a prompt not warmed up waits for it."""
+        entry = self._prompts.get(name)
+        if entry is None:
+            prompt = self._load(name)
+            with self._lock:
+                entry = self._prompts.setdefault(name, (prompt, time.monotonic()))
+        elif time.monotonic() - entry[1] > self.ttl:
+            with self._lock:
+                stale = name not in self._refreshing
+                self._refreshing.add(name)
+            if stale:
+                threading.Thread(target=self._refresh, args=(name,), name=f"prompt-refresh-{name}", daemon=True).start()
+        return entry[0]
+
+    def warm_up(self, names: Optional[Iterable[str]] = None) -> List[str]:
+        """Load ``names`` (default ``PROMPT_NAMES``) concurrently; returns the ones that failed."""
+        names = list(names or PROMPT_NAMES)
+        failed = []
+
+        def load(name):
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.error(f"Prompt {name} unavailable: {e}")
+                failed.append(name)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(names)) as pool:
+            list(pool.map(load, names))
+        logger.info(f"Loaded {len(names) - len(failed)}/{len(names)} prompts in {time.perf_counter() - started:.2f}s")
+        return failed
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """The process' PromptRegistry; a forked worker starts its own from the copies on disk."""
+    return get_client("prompt_registry", PromptRegistry)
+
+
+def get_prompt(name: str):
+    return get_prompt_registry().get(name)
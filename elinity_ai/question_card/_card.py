@@ -1,5 +1,3 @@
-from langchain_core.language_models.llms import LLM
-from google.generativeai import GenerativeModel
 from dotenv import load_dotenv
 import os
 from typing import Dict, List, Optional,Literal,Any
@@ -7,37 +5,16 @@ from pydantic import BaseModel, Field
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.runnables import RunnableSequence
-from langsmith import Client
+from elinity_ai.prompt_registry import get_prompt
 from enum import Enum 
 from dataclasses import dataclass
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from core.logging import logger
+from elinity_ai.llm_gateway import GeminiLLM
 
 load_dotenv()
 
-# --- Placeholder GeminiLLM for demonstration ---
-# Replace this with your actual GeminiLLM import and implementation
-class GeminiLLM(LLM):
-    model_name: str = Field(default="gemini-2.0-flash")
-    model: GenerativeModel = Field(default=None, exclude=True)
-
-    @property
-    def _llm_type(self) -> str:
-        return "gemini_custom"
-
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        from google import generativeai as genai
-        genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-        self.model = genai.GenerativeModel(self.model_name)
-
-    def _call(self, prompt: str, stop: Optional[List[str]] = None) -> str:
-        response = self.model.generate_content(prompt)
-        return response.text if hasattr(response, 'text') else response.parts[0].text
-
-
-
 @dataclass
 class PerformanceResult:
     """Container for performance metrics"""
@@ -102,14 +79,12 @@ class QuestionCardGenerator:
         # Store prompt_repo as instance variable
         self.prompt_repo = prompt_repo
         
-        # Initialize LangSmith client
+        # Prompts come from the process-wide registry, warmed up at startup
         self.langsmith_api_key = langsmith_api_key or os.getenv("LANGSMITH_API_KEY")
         if self.langsmith_api_key:
             os.environ["LANGSMITH_API_KEY"] = self.langsmith_api_key
-            self.langsmith_client = Client(api_key=self.langsmith_api_key)
         else:
-            print("Warning: LANGSMITH_API_KEY not found. Will use fallback prompt.")
-            self.langsmith_client = None
+            print("Warning: LANGSMITH_API_KEY not found. Will use the saved prompt.")
             
         # Initialize LangChain components - Fixed the class name
         self.llm = GeminiLLM(model_name=model_name)  
@@ -135,14 +110,8 @@ class QuestionCardGenerator:
             PromptTemplate: Loaded or fallback prompt template
         """
         try:
-            if self.langsmith_client:
-                # Try to pull from LangSmith hub 
-                prompt_template = self.langsmith_client.pull_prompt(prompt_repo)
-                print(f"Successfully loaded prompt from LangSmith: {prompt_repo}")
-                return prompt_template
-            else:
-                raise Exception("LangSmith client not initialized")
-                
+            # Served from memory; pulled from LangSmith or the saved copy on first use
+            return get_prompt(prompt_repo)
         except Exception as e:
             raise RuntimeError(f"Failed to load prompt from LangSmith ({e}). Using fallback prompt.")
     
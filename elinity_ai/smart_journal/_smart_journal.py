@@ -1,26 +1,16 @@
-import google.generativeai as genai
-import os
+from elinity_ai.llm_gateway import get_llm_gateway
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class ElinitySmartJournal: 
-    def __init__(self): 
-        genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-        self.model =  genai.GenerativeModel('gemini-2.0-flash')  # Or 'gemini-1.5-pro' if you have access
+    @property
+    def gateway(self):
+        # Looked up per call: the router builds this object at import, before workers fork
+        return get_llm_gateway()
 
-    def generate_insights(self,transcript):
-        """
-        Generates a self-description from the given JSON data using generative AI.
-    
-        Args:
-            json_data: A string containing valid JSON data.
-    
-        Returns:
-            A string containing the generated self-description, or None if an error occurs.
-        """
-    
-        prompt = f""" 
+    def _prompt(self,transcript):
+        return f""" 
             Analyze the following transcript and generate comprehensive AI insights that:
     
             1. Identify the main topics, themes, and key concepts present in the text
@@ -54,9 +44,28 @@ class ElinitySmartJournal:
             TRANSCRIPT:
             {transcript} 
             """ 
+
+    def generate_insights(self,transcript):
+        """
+        Generates a self-description from the given JSON data using generative AI.
+    
+        Args:
+            json_data: A string containing valid JSON data.
+    
+        Returns:
+            A string containing the generated self-description, or None if an error occurs.
+        """
+    
+        try:
+            return self.gateway.generate(self._prompt(transcript))
+        except Exception as e:
+            print(f"Error during generation: {e}")
+            return None
+
+    async def agenerate_insights(self,transcript):
+        """Like generate_insights, without blocking the event loop."""
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            return await self.gateway.agenerate(self._prompt(transcript))
         except Exception as e:
             print(f"Error during generation: {e}")
             return None
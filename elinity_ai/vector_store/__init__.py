@@ -0,0 +1,18 @@
+from ._base import VectorStore
+from ._numpy_store import NumpyVectorStore
+from ._vector_store import create_vector_store, get_vector_store, close_vector_store
+from ._fields import SCALAR_FIELDS, tenant_vector_fields, normalize_filters
+from ._upsert import upsert_by_id
+
+
+__all__ = [
+    "VectorStore",
+    "NumpyVectorStore",
+    "create_vector_store",
+    "get_vector_store",
+    "close_vector_store",
+    "SCALAR_FIELDS",
+    "tenant_vector_fields",
+    "normalize_filters",
+    "upsert_by_id",
+]
@@ -0,0 +1,63 @@
+from abc import ABC, abstractmethod
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+
+
+class VectorStore(ABC):
+    """Common interface for tenant vector search backends.
+
+    Records are plain dicts with an integer ``id`` (the tenant ``embedding_id``),
+    a ``vector`` and the scalar fields from ``tenant_vector_fields``. Search results use the
+    same shape as ``MilvusUserSimilarityPipeline.find_similar_users``:
+    ``{"id": ..., "score": ..., "metadata": {...}}`` ordered by descending score.
+    """
+
+    dim: int
+    # Whether writers should call ``flush`` after each upsert, or leave it to scheduled maintenance
+    flush_after_upsert: bool = True
+
+    @abstractmethod
+    def upsert(self, records: List[Dict[str, Any]]) -> int:
+        """Insert or replace records by id. Returns the number of records written."""
+
+    @abstractmethod
+    def search(self, query_vector, top_k: int = 10, exclude_ids: Optional[Iterable[int]] = None, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Return the ``top_k`` nearest records to ``query_vector`` (cosine similarity).
+
+        ``exclude_ids`` (any iterable with ``len``, e.g. a list or numpy array) and
+        ``filters`` (see ``normalize_filters``) are applied inside the search, so
+        excluded or filtered-out records never use up a result slot.
+        """
+
+    @abstractmethod
+    def get_vector(self, id: int) -> Optional[np.ndarray]:
+        """Return the stored vector for ``id`` or None if it does not exist."""
+
+    @abstractmethod
+    def delete(self, ids: Iterable[int]) -> int:
+        """Delete records by id. Returns the number of records removed."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of vectors currently stored."""
+
+    async def asearch(self, query_vector, top_k: int = 10, exclude_ids: Optional[Iterable[int]] = None, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Run ``search`` in a worker thread so the event loop is never blocked."""
+        return await asyncio.to_thread(self.search, query_vector, top_k, exclude_ids, filters)
+
+    async def aget_vector(self, id: int) -> Optional[np.ndarray]:
+        """Run ``get_vector`` in a worker thread so the event loop is never blocked."""
+        return await asyncio.to_thread(self.get_vector, id)
+
+    def warm_up(self) -> None:
+        """Open connections and load data ahead of the first request."""
+
+    def flush(self) -> None:
+        """Persist pending writes. Backends without buffering can ignore this."""
+
+    def compact(self) -> None:
+        """Reclaim space held by replaced or deleted records. Backends that do this on write can ignore it."""
+
+    def close(self) -> None:
+        """Release any connection held by the backend."""
@@ -0,0 +1,111 @@
+"""
+Typed scalar fields stored next to each tenant vector, and the filters over them
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+# Name -> python type of every scalar field kept with a vector
+SCALAR_FIELDS = {
+    "age": int,
+    "gender": str,
+    "location": str,
+    "seeking_romantic": bool,
+    "seeking_friendship": bool,
+    "seeking_collaboration": bool,
+    # Login time as of the last embedding. Logging in does not re-embed, so this
+    # is not filtered on: recency is checked against tenants.last_login instead
+    "last_login": int,
+}
+GENDER_MAX_LENGTH = 32
+LOCATION_MAX_LENGTH = 64
+
+
+def location_bucket(location: Optional[str]) -> str:
+    """Coarse, comparable location key: "Berlin, Germany" -> "berlin"."""
+    if not location:
+        return ""
+    return location.split(",")[0].strip().lower()[:LOCATION_MAX_LENGTH]
+
+
+def _epoch(value) -> int:
+    if not value:
+        return 0
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return 0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def tenant_vector_fields(tenant: Dict[str, Any]) -> Dict[str, Any]:
+    """Scalar fields for a tenant dict as produced by ``tenant_to_dict``."""
+    personal = tenant.get("personal_info") or {}
+    relationship = tenant.get("relationship_preferences") or {}
+    friendship = tenant.get("friendship_preferences") or {}
+    collaboration = tenant.get("collaboration_preferences") or {}
+    intentions = tenant.get("intentions") or {}
+    try:
+        age = max(int(personal.get("age") or 0), 0)
+    except (TypeError, ValueError):
+        age = 0
+    return {
+        "age": age,
+        "gender": (personal.get("gender") or "").strip().lower()[:GENDER_MAX_LENGTH],
+        "location": location_bucket(personal.get("location")),
+        "seeking_romantic": bool(relationship.get("seeking") or intentions.get("romantic")),
+        "seeking_friendship": bool(friendship.get("seeking") or intentions.get("social")),
+        "seeking_collaboration": bool(collaboration.get("seeking") or intentions.get("professional")),
+        "last_login": _epoch(tenant.get("last_login")),
+    }
+
+
+def normalize_filters(filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Drop unset values and bring filters into the same form as the stored fields.
+
+    Supported keys: ``min_age``, ``max_age``, ``gender``, ``location`` and
+    ``seeking`` (romantic/friendship/collaboration).
+    """
+    normalized = {}
+    for key, value in (filters or {}).items():
+        if value is None or value == "":
+            continue
+        if key in ("min_age", "max_age"):
+            normalized[key] = int(value)
+        elif key == "gender":
+            normalized[key] = str(value).strip().lower()[:GENDER_MAX_LENGTH]
+        elif key == "location":
+            normalized[key] = location_bucket(str(value))
+        elif key == "seeking":
+            field = f"seeking_{str(value).strip().lower()}"
+            if field not in SCALAR_FIELDS:
+                raise ValueError(f"Unknown seeking filter: {value}")
+            normalized[key] = field
+        else:
+            raise ValueError(f"Unknown filter: {key}")
+    return normalized
+
+
+def _quote(value: str) -> str:
+    return '"' + value.replace("\\", "").replace('"', "") + '"'
+
+
+def to_milvus_expr(filters: Optional[Dict[str, Any]], exclude_ids=None) -> str:
+    """Milvus boolean expression for normalized filters plus an id exclusion list."""
+    parts = []
+    filters = filters or {}
+    if "min_age" in filters:
+        parts.append(f"age >= {filters['min_age']}")
+    if "max_age" in filters:
+        parts.append(f"age <= {filters['max_age']}")
+    if "gender" in filters:
+        parts.append(f"gender == {_quote(filters['gender'])}")
+    if "location" in filters:
+        parts.append(f"location == {_quote(filters['location'])}")
+    if "seeking" in filters:
+        parts.append(f"{filters['seeking']} == true")
+    if exclude_ids:
+        parts.append(f"id not in {list(exclude_ids)}")
+    return " and ".join(parts)
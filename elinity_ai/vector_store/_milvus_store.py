@@ -0,0 +1,191 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import os
+import re
+import numpy as np
+import pymilvus
+from pymilvus import MilvusClient, DataType
+from dotenv import load_dotenv
+from core.logging import logger
+from ._base import VectorStore
+from ._fields import GENDER_MAX_LENGTH, LOCATION_MAX_LENGTH, normalize_filters, to_milvus_expr
+from ._quantization import check_quantization
+from ._upsert import upsert_by_id
+
+load_dotenv()
+
+# HNSW_SQ with refinement and IVF_RABITQ, the quantized indexes, are Milvus 2.6 features
+QUANTIZED_INDEX_MIN_VERSION = (2, 6)
+
+
+def _version(text: str) -> Optional[Tuple[int, int]]:
+    """(major, minor) from a version string such as ``v2.6.1`` or ``2.5.10``, None if there is none."""
+    match = re.search(r"(\d+)\.(\d+)", text or "")
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+class MilvusVectorStore(VectorStore):
+    """VectorStore backed by a Milvus collection through a single ``MilvusClient``.
+
+    The client holds one gRPC channel that is safe to share between threads, so
+    a single instance serves every request in the process. Searches only return
+    the primary key and score unless ``output_fields`` asks for more, which keeps
+    the stored tenant blob off the wire.
+
+    Writes are durable and searchable without a flush, so upserts do not
+    flush; ``maintain_vector_store`` flushes and compacts on a schedule instead
+    of sealing a tiny segment after every embedding batch.
+    """
+
+    flush_after_upsert = False
+
+    def __init__(self, collection_name="tenants", dim=768, uri=None, token=None, quantization=None, rescore_factor=4):
+        self._uri = uri or os.getenv("MILVUS_URI")
+        if not self._uri:
+            raise RuntimeError("MILVUS_URI not found")
+        self._token = token or os.getenv("MILVUS_TOKEN")
+        if not self._token:
+            raise RuntimeError("MILVUS_TOKEN not found")
+        self.dim = dim
+        self.collection_name = collection_name
+        self.client = MilvusClient(uri=self._uri, token=self._token)
+        self.index_params = {
+            "M": int(os.getenv("MILVUS_HNSW_M", 16)),
+            "efConstruction": int(os.getenv("MILVUS_HNSW_EF_CONSTRUCTION", 200)),
+        }
+        self.search_ef = int(os.getenv("MILVUS_HNSW_EF", 64))
+        self.quantization = check_quantization(quantization)
+        self.rescore_factor = max(int(rescore_factor), 1)
+        if not self.client.has_collection(collection_name=self.collection_name):
+            self._create_collection()
+
+    def _vector_index(self):
+        """Index type and build params for the configured quantization.
+
+        Quantized indexes scan compact codes and keep the FP32 vectors for
+        refinement, the Milvus equivalent of rescoring with full precision.
+        """
+        if self.quantization == "none":
+            return "HNSW", self.index_params
+        self._check_quantized_index_support()
+        if self.quantization in ("float16", "int8"):
+            sq_type = {"float16": "FP16", "int8": "SQ8"}[self.quantization]
+            return "HNSW_SQ", {**self.index_params, "sq_type": sq_type, "refine": True, "refine_type": "FP32"}
+        return "IVF_RABITQ", {"nlist": int(os.getenv("MILVUS_IVF_NLIST", 1024)), "refine": True, "refine_type": "FP32"}
+
+    def _check_quantized_index_support(self):
+        """Fail with a clear error, before creating anything, if client or server predates the quantized indexes."""
+        required = ".".join(map(str, QUANTIZED_INDEX_MIN_VERSION))
+        client_version = _version(pymilvus.__version__)
+        if client_version is not None and client_version < QUANTIZED_INDEX_MIN_VERSION:
+            raise RuntimeError(
+                f"VECTOR_STORE_QUANTIZATION={self.quantization} needs pymilvus>={required}, "
+                f"found {pymilvus.__version__}; upgrade it or set VECTOR_STORE_QUANTIZATION=none"
+            )
+        server = self.client.get_server_version()
+        server_version = _version(server)
+        if server_version is None:
+            logger.warning(f"Could not parse Milvus server version {server!r}, assuming it supports {self.quantization} indexes")
+        elif server_version < QUANTIZED_INDEX_MIN_VERSION:
+            raise RuntimeError(
+                f"VECTOR_STORE_QUANTIZATION={self.quantization} needs a Milvus {required} server, "
+                f"{self._uri} runs {server}; upgrade it or set VECTOR_STORE_QUANTIZATION=none"
+            )
+
+    def _search_params(self, top_k: int) -> Dict[str, Any]:
+        if self.quantization == "binary":
+            params = {"nprobe": int(os.getenv("MILVUS_IVF_NPROBE", 32)), "refine_k": self.rescore_factor}
+        else:
+            params = {"ef": max(self.search_ef, top_k)}
+            if self.quantization != "none":
+                params["refine_k"] = self.rescore_factor
+        return {"metric_type": "COSINE", "params": params}
+
+    def _create_collection(self):
+        """Create the collection with typed scalar fields and an HNSW index.
+
+        Only the fields in ``SCALAR_FIELDS`` are stored next to the vector, so
+        filters run inside the ANN search and no tenant blob is kept per vector.
+        """
+        schema = self.client.create_schema(auto_id=False, enable_dynamic_field=False)
+        schema.add_field(field_name="id", datatype=DataType.INT64, is_primary=True)
+        schema.add_field(field_name="vector", datatype=DataType.FLOAT_VECTOR, dim=self.dim)
+        schema.add_field(field_name="age", datatype=DataType.INT16)
+        schema.add_field(field_name="gender", datatype=DataType.VARCHAR, max_length=GENDER_MAX_LENGTH)
+        schema.add_field(field_name="location", datatype=DataType.VARCHAR, max_length=LOCATION_MAX_LENGTH)
+        schema.add_field(field_name="seeking_romantic", datatype=DataType.BOOL)
+        schema.add_field(field_name="seeking_friendship", datatype=DataType.BOOL)
+        schema.add_field(field_name="seeking_collaboration", datatype=DataType.BOOL)
+        schema.add_field(field_name="last_login", datatype=DataType.INT64)
+
+        index_params = self.client.prepare_index_params()
+        index_type, vector_params = self._vector_index()
+        index_params.add_index(field_name="vector", index_type=index_type, metric_type="COSINE", params=vector_params)
+        for field_name in ("gender", "location"):
+            index_params.add_index(field_name=field_name, index_type="INVERTED")
+        for field_name in ("age", "last_login"):
+            index_params.add_index(field_name=field_name, index_type="STL_SORT")
+
+        self.client.create_collection(
+            collection_name=self.collection_name,
+            schema=schema,
+            index_params=index_params,
+        )
+
+    def warm_up(self) -> None:
+        self.client.load_collection(collection_name=self.collection_name)
+
+    def upsert(self, records: List[Dict[str, Any]]) -> int:
+        if not records:
+            return 0
+        # Upsert, not insert: re-embedding a tenant replaces the row with the same primary key
+        return upsert_by_id(self.client, self.collection_name, records)
+
+    def search(self, query_vector, top_k: int = 10, exclude_ids: Optional[Iterable[int]] = None, filters: Optional[Dict[str, Any]] = None, output_fields=None) -> List[Dict[str, Any]]:
+        # Applied as a filter expression so excluded profiles never take a top_k slot
+        exclude_ids = [int(i) for i in exclude_ids] if exclude_ids is not None else []
+        results = self.client.search(
+            collection_name=self.collection_name,
+            anns_field="vector",
+            data=[np.asarray(query_vector, dtype=np.float32).tolist()],
+            limit=top_k,
+            filter=to_milvus_expr(normalize_filters(filters), exclude_ids),
+            output_fields=output_fields,
+            search_params=self._search_params(top_k),
+        )
+        similar = []
+        for hits in results:
+            for hit in hits:
+                similar.append({
+                    "id": hit["id"],
+                    "score": hit["distance"],
+                    "metadata": hit.get("entity", {}),
+                })
+        return similar
+
+    def get_vector(self, id: int) -> Optional[np.ndarray]:
+        results = self.client.get(collection_name=self.collection_name, ids=[int(id)], output_fields=["vector"])
+        if not results:
+            return None
+        return np.asarray(results[0]["vector"], dtype=np.float32)
+
+    def delete(self, ids: Iterable[int]) -> int:
+        ids = [int(i) for i in ids]
+        if not ids:
+            return 0
+        res = self.client.delete(collection_name=self.collection_name, ids=ids)
+        return res.get("delete_count", len(ids)) if isinstance(res, dict) else len(ids)
+
+    def count(self) -> int:
+        stats = self.client.get_collection_stats(collection_name=self.collection_name)
+        return int(stats.get("row_count", 0))
+
+    def flush(self) -> None:
+        self.client.flush(collection_name=self.collection_name)
+
+    def compact(self) -> None:
+        # Merges small segments and drops the rows replaced by upserts; runs in the background
+        job_id = self.client.compact(collection_name=self.collection_name)
+        logger.info(f"Started compaction {job_id} of Milvus collection {self.collection_name}")
+
+    def close(self) -> None:
+        self.client.close()
@@ -0,0 +1,345 @@
+import fcntl
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from core.logging import logger
+from ._base import VectorStore
+from ._fields import SCALAR_FIELDS, normalize_filters
+from ._quantization import approximate_scores, check_quantization, quantize
+
+VECTORS_FILE = "vectors.npy"
+IDS_FILE = "ids.npy"
+METADATA_FILE = "metadata.json"
+SCALES_FILE = "scales.npy"
+# Name of the current snapshot directory under SNAPSHOTS_DIR, replaced atomically by each flush
+CURRENT_FILE = "CURRENT"
+SNAPSHOTS_DIR = "snapshots"
+LOCK_FILE = ".lock"
+# Older snapshots are deleted; readers that already mapped them keep their pages
+KEEP_SNAPSHOTS = 2
+
+
+def _codes_file(method: str) -> str:
+    return f"codes.{method}.npy"
+
+
+class NumpyVectorStore(VectorStore):
+    """In-process exact cosine search over a flat float32 matrix.
+
+    Vectors are L2-normalized on write so a search is a single matrix-vector
+    product followed by ``argpartition``. When ``path`` is set the matrix is
+    persisted as ``.npy`` files and memory-mapped on load, so several processes
+    (API workers, Celery) can share the same pages. Readers pick up a new
+    snapshot written by another process on their next call.
+
+    Several processes may write too. Each ``flush`` holds an exclusive
+    ``flock`` on the store, reloads the latest snapshot, replays this process's
+    unflushed writes onto it and publishes the result as a new snapshot
+    directory. A reader never sees a partial snapshot: the ``CURRENT`` pointer
+    is swapped only after every file is written. Unflushed writes also survive
+    a reload triggered by another process's flush.
+
+    With ``quantization`` set to ``float16``, ``int8`` or ``binary`` the scan runs
+    over compact codes (2x, ~4x or 32x smaller than float32). The best
+    ``top_k * rescore_factor`` rows are then rescored against the float32 matrix.
+    Persisted stores memory-map that matrix, so only the rescored rows are read.
+    """
+
+    def __init__(self, path: Optional[str] = None, dim: int = 768, quantization: Optional[str] = None, rescore_factor: int = 4):
+        self.path = path
+        self.dim = dim
+        self.quantization = check_quantization(quantization)
+        self.rescore_factor = max(int(rescore_factor), 1)
+        self._lock = threading.RLock()
+        self._vectors = np.empty((0, dim), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._rows: Dict[int, int] = {}
+        self._metadata: Dict[int, Dict[str, Any]] = {}
+        # Scalar fields as arrays aligned with rows, rebuilt lazily after writes
+        self._columns = None
+        # Quantized codes aligned with rows, rebuilt lazily after writes
+        self._codes = None
+        self._scales = None
+        # Name of the loaded snapshot ("" for the flat layout of older versions)
+        self._snapshot = None
+        # Writes since the last flush, replayed onto any snapshot loaded before it
+        self._pending: List[Tuple[str, Any]] = []
+        if self.path and self._current_snapshot() is not None:
+            self.load()
+
+    def _file(self, name: str, snapshot: str = "") -> str:
+        if snapshot:
+            return os.path.join(self.path, SNAPSHOTS_DIR, snapshot, name)
+        return os.path.join(self.path, name)
+
+    def _current_snapshot(self) -> Optional[str]:
+        try:
+            with open(self._file(CURRENT_FILE)) as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            # Stores flushed before snapshots existed keep their files at the top level
+            return "" if os.path.exists(self._file(VECTORS_FILE)) else None
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the store across processes, for the whole reload-replay-publish of a flush."""
+        os.makedirs(self.path, exist_ok=True)
+        with open(self._file(LOCK_FILE), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (vectors / norms).astype(np.float32, copy=False)
+
+    def _maybe_reload(self):
+        """Reload the on-disk snapshot if another process published a newer one."""
+        if not self.path:
+            return
+        snapshot = self._current_snapshot()
+        if snapshot is not None and snapshot != self._snapshot:
+            self.load()
+
+    def warm_up(self):
+        with self._lock:
+            self._maybe_reload()
+
+    def load(self):
+        """Load the current snapshot, then reapply the writes not flushed yet."""
+        with self._lock:
+            for attempt in range(3):
+                snapshot = self._current_snapshot()
+                try:
+                    self._load_snapshot(snapshot)
+                    break
+                except FileNotFoundError:
+                    # Pruned by two flushes since we read CURRENT: read it again
+                    if attempt == 2:
+                        raise
+            for operation, argument in self._pending:
+                if operation == "upsert":
+                    self._apply_upsert(argument)
+                else:
+                    self._apply_delete(argument)
+
+    def _load_snapshot(self, snapshot: str):
+        vectors = np.load(self._file(VECTORS_FILE, snapshot), mmap_mode="r")
+        ids = np.load(self._file(IDS_FILE, snapshot))
+        metadata_path = self._file(METADATA_FILE, snapshot)
+        if os.path.exists(metadata_path):
+            with open(metadata_path) as f:
+                metadata = {int(k): v for k, v in json.load(f).items()}
+        else:
+            metadata = {}
+        codes = scales = None
+        codes_path = self._file(_codes_file(self.quantization), snapshot)
+        if self.quantization != "none" and os.path.exists(codes_path):
+            codes = np.load(codes_path, mmap_mode="r")
+            # A snapshot written without codes (or by an older writer) is quantized on first search
+            if len(codes) != len(ids):
+                codes = None
+            elif self.quantization == "int8":
+                scales = np.load(self._file(SCALES_FILE, snapshot))
+        self._vectors, self._ids, self._metadata = vectors, ids, metadata
+        self._rows = {int(id_): row for row, id_ in enumerate(ids)}
+        self._columns = None
+        self._codes, self._scales = codes, scales
+        self._snapshot = snapshot
+        logger.debug(f"Loaded {len(ids)} vectors from {self.path} ({snapshot or 'flat layout'})")
+
+    def flush(self):
+        if not self.path:
+            return
+        with self._lock, self._file_lock():
+            # Another writer may have published since our last load: build on its snapshot
+            self._maybe_reload()
+            if not self._pending and self._snapshot is not None:
+                return
+            snapshot = f"{time.time_ns():020d}-{os.getpid()}"
+            directory = os.path.join(self.path, SNAPSHOTS_DIR, snapshot)
+            os.makedirs(directory)
+            arrays = [(IDS_FILE, self._ids), (VECTORS_FILE, self._vectors)]
+            if self.quantization != "none":
+                codes, scales = self._compact()
+                arrays.append((_codes_file(self.quantization), codes))
+                if scales is not None:
+                    arrays.append((SCALES_FILE, scales))
+            for name, array in arrays:
+                with open(os.path.join(directory, name), "wb") as f:
+                    np.save(f, np.ascontiguousarray(array))
+            with open(os.path.join(directory, METADATA_FILE), "w") as f:
+                json.dump({str(k): v for k, v in self._metadata.items()}, f, default=str)
+            # Publish: readers switch to the new snapshot only once it is complete
+            tmp_path = self._file(CURRENT_FILE + ".tmp")
+            with open(tmp_path, "w") as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self._file(CURRENT_FILE))
+            self._snapshot = snapshot
+            self._pending = []
+            self._prune_snapshots()
+
+    def _prune_snapshots(self):
+        snapshots = sorted(os.listdir(os.path.join(self.path, SNAPSHOTS_DIR)))
+        for snapshot in snapshots[:-KEEP_SNAPSHOTS]:
+            shutil.rmtree(os.path.join(self.path, SNAPSHOTS_DIR, snapshot), ignore_errors=True)
+
+    def upsert(self, records: List[Dict[str, Any]]) -> int:
+        if not records:
+            return 0
+        vectors = self._normalize(np.asarray([r["vector"] for r in records], dtype=np.float32).reshape(len(records), self.dim))
+        records = [{**record, "vector": vector} for record, vector in zip(records, vectors)]
+        with self._lock:
+            self._maybe_reload()
+            self._apply_upsert(records)
+            if self.path:
+                self._pending.append(("upsert", records))
+            return len(records)
+
+    def _apply_upsert(self, records: List[Dict[str, Any]]):
+        """Write normalized records into the matrix; caller holds the lock."""
+        # Memory-mapped snapshots are read-only, copy before mutating.
+        matrix = np.array(self._vectors, dtype=np.float32)
+        new_ids, new_rows = [], []
+        for record in records:
+            id_ = int(record["id"])
+            row = self._rows.get(id_)
+            if row is None:
+                self._rows[id_] = len(self._ids) + len(new_ids)
+                new_ids.append(id_)
+                new_rows.append(record["vector"])
+            else:
+                matrix[row] = record["vector"]
+            self._metadata[id_] = {k: v for k, v in record.items() if k not in ("id", "vector")}
+        if new_ids:
+            matrix = np.vstack([matrix, np.asarray(new_rows, dtype=np.float32)])
+            self._ids = np.concatenate([self._ids, np.asarray(new_ids, dtype=np.int64)])
+        self._vectors = matrix
+        self._columns = None
+        self._codes = self._scales = None
+
+    def delete(self, ids: Iterable[int]) -> int:
+        with self._lock:
+            self._maybe_reload()
+            drop = {int(i) for i in ids if int(i) in self._rows}
+            if not drop:
+                return 0
+            self._apply_delete(drop)
+            if self.path:
+                self._pending.append(("delete", drop))
+            return len(drop)
+
+    def _apply_delete(self, drop: set):
+        """Remove ids from the matrix; caller holds the lock."""
+        keep = np.array([int(i) not in drop for i in self._ids], dtype=bool)
+        self._vectors = np.array(self._vectors[keep], dtype=np.float32)
+        self._ids = self._ids[keep]
+        self._rows = {int(id_): row for row, id_ in enumerate(self._ids)}
+        for id_ in drop:
+            self._metadata.pop(id_, None)
+        self._columns = None
+        self._codes = self._scales = None
+
+    def get_vector(self, id: int) -> Optional[np.ndarray]:
+        with self._lock:
+            self._maybe_reload()
+            row = self._rows.get(int(id))
+            if row is None:
+                return None
+            return np.array(self._vectors[row])
+
+    def count(self) -> int:
+        with self._lock:
+            self._maybe_reload()
+            return len(self._ids)
+
+    def _compact(self):
+        """Quantized codes and scales for the current matrix; caller holds the lock."""
+        if self._codes is None:
+            self._codes, self._scales = quantize(self._vectors, self.quantization)
+        return self._codes, self._scales
+
+    def _scalar_columns(self) -> Dict[str, np.ndarray]:
+        if self._columns is None:
+            records = [self._metadata.get(int(id_), {}) for id_ in self._ids]
+            columns = {}
+            for name, kind in SCALAR_FIELDS.items():
+                values = [record.get(name) for record in records]
+                if kind is str:
+                    columns[name] = np.array([value or "" for value in values], dtype=object)
+                elif kind is bool:
+                    columns[name] = np.array([bool(value) for value in values], dtype=bool)
+                else:
+                    columns[name] = np.array([int(value or 0) for value in values], dtype=np.int64)
+            self._columns = columns
+        return self._columns
+
+    def _filter_mask(self, filters: Dict[str, Any]) -> np.ndarray:
+        columns = self._scalar_columns()
+        mask = np.ones(len(self._ids), dtype=bool)
+        if "min_age" in filters:
+            mask &= columns["age"] >= filters["min_age"]
+        if "max_age" in filters:
+            mask &= columns["age"] <= filters["max_age"]
+        if "gender" in filters:
+            mask &= columns["gender"] == filters["gender"]
+        if "location" in filters:
+            mask &= columns["location"] == filters["location"]
+        if "seeking" in filters:
+            mask &= columns[filters["seeking"]]
+        return mask
+
+    def search(self, query_vector, top_k: int = 10, exclude_ids: Optional[Iterable[int]] = None, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        filters = normalize_filters(filters)
+        with self._lock:
+            self._maybe_reload()
+            vectors, ids = self._vectors, self._ids
+            rows = self._rows
+            metadata = self._metadata
+            mask = self._filter_mask(filters) if filters else None
+            codes, scales = self._compact() if self.quantization != "none" and len(ids) else (None, None)
+        if len(ids) == 0 or top_k <= 0:
+            return []
+
+        query = self._normalize(np.asarray(query_vector, dtype=np.float32).reshape(self.dim))
+        if codes is None:
+            scores = vectors @ query
+        else:
+            scores = approximate_scores(codes, scales, query, self.quantization)
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf).astype(np.float32)
+        if exclude_ids is not None and len(exclude_ids):
+            excluded = [rows[int(i)] for i in exclude_ids if int(i) in rows]
+            if excluded:
+                scores = np.array(scores)
+                scores[excluded] = -np.inf
+
+        if codes is not None:
+            # Rescore the best approximate candidates with the full precision vectors
+            n_candidates = min(top_k * self.rescore_factor, len(ids))
+            candidates = np.argpartition(-scores, n_candidates - 1)[:n_candidates]
+            candidates = np.sort(candidates[np.isfinite(scores[candidates])])
+            scores = np.full(len(ids), -np.inf, dtype=np.float32)
+            scores[candidates] = np.asarray(vectors[candidates], dtype=np.float32) @ query
+
+        k = min(top_k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            {
+                "id": int(ids[row]),
+                "score": float(scores[row]),
+                "metadata": metadata.get(int(ids[row]), {}),
+            }
+            for row in top
+            if np.isfinite(scores[row])
+        ]
@@ -0,0 +1,78 @@
+"""
+Compact vector codes for approximate scans, rescored in full precision
+"""
+from typing import Optional, Tuple
+import numpy as np
+
+QUANTIZATIONS = ("none", "float16", "int8", "binary")
+
+# Rows converted to float32 at a time while scanning codes; small blocks stay in cache
+BLOCK_ROWS = 256
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def check_quantization(method: Optional[str]) -> str:
+    method = (method or "none").lower()
+    if method not in QUANTIZATIONS:
+        raise ValueError(f"Unknown quantization: {method}, expected one of {', '.join(QUANTIZATIONS)}")
+    return method
+
+
+def bytes_per_vector(dim: int, method: str) -> int:
+    """Bytes one vector takes in the scanned representation."""
+    return {
+        "none": 4 * dim,
+        "float16": 2 * dim,
+        "int8": dim + 4,  # codes plus a float32 scale
+        "binary": (dim + 7) // 8,
+    }[method]
+
+
+def quantize(vectors: np.ndarray, method: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Codes (and per-vector scales for int8) for L2-normalized float32 ``vectors``.
+
+    - float16: half precision copy
+    - int8: symmetric per-vector scale, ``vector ~= codes * scale``
+    - binary: sign bits packed 8 per byte
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if method == "float16":
+        return vectors.astype(np.float16), None
+    if method == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    if method == "binary":
+        return np.packbits(vectors > 0, axis=1), None
+    raise ValueError(f"Cannot quantize with method: {method}")
+
+
+def _popcount(bits: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bits)
+    return _POPCOUNT[bits]
+
+
+def approximate_scores(codes: np.ndarray, scales: Optional[np.ndarray], query: np.ndarray, method: str) -> np.ndarray:
+    """Approximate cosine scores of a normalized ``query`` against every code row.
+
+    Binary scores are ``1 - 2 * hamming / dim``, which ranks like the angle
+    between sign vectors rather than estimating the cosine itself.
+    """
+    scores = np.empty(len(codes), dtype=np.float32)
+    if method == "binary":
+        dim = len(query)
+        query_bits = np.packbits(query > 0)
+        for start in range(0, len(codes), BLOCK_ROWS):
+            block = codes[start:start + BLOCK_ROWS]
+            hamming = _popcount(np.bitwise_xor(block, query_bits)).sum(axis=1, dtype=np.int32)
+            scores[start:start + len(block)] = 1.0 - 2.0 * hamming / dim
+        return scores
+    for start in range(0, len(codes), BLOCK_ROWS):
+        block = np.asarray(codes[start:start + BLOCK_ROWS], dtype=np.float32)
+        scores[start:start + len(block)] = block @ query
+    if method == "int8":
+        scores *= scales
+    return scores
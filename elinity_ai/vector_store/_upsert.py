@@ -0,0 +1,35 @@
+"""
+Idempotent, chunked upserts into a Milvus collection
+"""
+import os
+from typing import Any, Dict, List
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Rows per upsert request; large batches are split so no request exceeds the gRPC message limit
+MILVUS_UPSERT_BATCH_SIZE = int(os.getenv("MILVUS_UPSERT_BATCH_SIZE", 500))
+
+
+def upsert_by_id(client, collection_name: str, records: List[Dict[str, Any]], batch_size: int = None) -> int:
+    """Insert or replace ``records`` by primary key ``id``, ``batch_size`` rows per request.
+
+    Milvus upsert deletes the previous row with the same key, so running it
+    again for the same tenants leaves one vector each. A key repeated within
+    the records keeps its last record only, since one request must not repeat a key.
+    ``client`` is a ``pymilvus.MilvusClient``; this module does not import
+    pymilvus so the package stays usable without it.
+    """
+    by_id = {}
+    for record in records:
+        if record.get("id") is None:
+            raise ValueError("Every record needs an id to be upserted")
+        by_id[int(record["id"])] = record
+    rows = list(by_id.values())
+    batch_size = batch_size or MILVUS_UPSERT_BATCH_SIZE
+    count = 0
+    for start in range(0, len(rows), batch_size):
+        chunk = rows[start:start + batch_size]
+        res = client.upsert(collection_name=collection_name, data=chunk)
+        count += res.get("upsert_count", len(chunk)) if isinstance(res, dict) else len(chunk)
+    return count
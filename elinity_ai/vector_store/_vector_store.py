@@ -0,0 +1,65 @@
+import os
+import threading
+from dotenv import load_dotenv
+from core.logging import logger
+from ._base import VectorStore
+
+load_dotenv()
+
+_vector_store = None
+_vector_store_pid = None
+_lock = threading.Lock()
+
+
+def create_vector_store(backend: str = None) -> VectorStore:
+    """Build a vector store for ``backend`` (``VECTOR_STORE_BACKEND``, default ``milvus``).
+
+    ``numpy`` keeps every vector in process and persists to ``VECTOR_STORE_PATH``;
+    ``milvus`` talks to the collection configured by ``MILVUS_URI``/``MILVUS_TOKEN``.
+    ``VECTOR_STORE_QUANTIZATION`` (none, float16, int8, binary) picks compact codes
+    for the scan, rescored with full precision over ``VECTOR_STORE_RESCORE_FACTOR``
+    times as many candidates. On the ``milvus`` backend the quantized indexes need
+    Milvus 2.6 and pymilvus 2.6; older versions are refused when the collection is created.
+    """
+    backend = (backend or os.getenv("VECTOR_STORE_BACKEND", "milvus")).lower()
+    dim = int(os.getenv("VECTOR_STORE_DIM", 768))
+    quantization = os.getenv("VECTOR_STORE_QUANTIZATION", "none")
+    rescore_factor = int(os.getenv("VECTOR_STORE_RESCORE_FACTOR", 4))
+    if backend == "numpy":
+        from ._numpy_store import NumpyVectorStore
+        return NumpyVectorStore(
+            path=os.getenv("VECTOR_STORE_PATH", "data/vector_store"), dim=dim,
+            quantization=quantization, rescore_factor=rescore_factor,
+        )
+    if backend == "milvus":
+        from ._milvus_store import MilvusVectorStore
+        return MilvusVectorStore(
+            collection_name=os.getenv("MILVUS_COLLECTION", "tenants"), dim=dim,
+            quantization=quantization, rescore_factor=rescore_factor,
+        )
+    raise RuntimeError(f"Unknown VECTOR_STORE_BACKEND: {backend}")
+
+
+def get_vector_store() -> VectorStore:
+    """Return the process-wide vector store, creating it on first use.
+
+    A store inherited across a fork is not reused: its connections belong to
+    the parent, so the child builds its own.
+    """
+    global _vector_store, _vector_store_pid
+    if _vector_store is None or _vector_store_pid != os.getpid():
+        with _lock:
+            if _vector_store is None or _vector_store_pid != os.getpid():
+                _vector_store = create_vector_store()
+                _vector_store_pid = os.getpid()
+                logger.info(f"Vector store initialized: {type(_vector_store).__name__}")
+    return _vector_store
+
+
+def close_vector_store() -> None:
+    """Close the process-wide vector store, e.g. on application shutdown."""
+    global _vector_store
+    with _lock:
+        if _vector_store is not None:
+            _vector_store.close()
+            _vector_store = None
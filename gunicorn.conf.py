@@ -0,0 +1,25 @@
+"""
+Gunicorn settings for running main:app with several worker processes:
+
+    gunicorn -c gunicorn.conf.py main:app
+
+The app and the embedding models are loaded once in the master; workers are
+forked afterwards and share the model weights copy-on-write.
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', 8000)}"
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+
+
+def on_starting(server):
+    from elinity_ai.embedding_service import preload_models
+    server.log.info(f"Preloaded models: {', '.join(preload_models())}")
+
+
+def post_fork(server, worker):
+    from elinity_ai.embedding_service import reset_clients
+    reset_clients()
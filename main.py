@@ -16,6 +16,8 @@ from api.routers.websockets import websocket, onboarding, group_chat
 from fastapi.responses import HTMLResponse
 from database.session import engine, Base
 from core.limiter import RateLimiter
+from elinity_ai.vector_store import get_vector_store, close_vector_store
+from elinity_ai.prompt_registry import get_prompt_registry
 from dotenv import load_dotenv
 
 # 👇 NEW: import Gradio and your onboarding app
@@ -32,7 +34,14 @@ limiter = RateLimiter(requests=5, window=60)
 async def lifespan(app: FastAPI):
     # Create database tables on startup
     Base.metadata.create_all(bind=engine)
+    # Connect and load the vector collection once, shared by all requests
+    get_vector_store().warm_up()
+    # Pull every LangSmith prompt now so no request waits on LangSmith
+    get_prompt_registry().warm_up()
+    # Trait matrix for the compatibility re-rank, loaded before the first request
+    recommendations.compatibility.warm_up()
     yield
+    close_vector_store()
     # Optional: drop tables on shutdown
     # Base.metadata.drop_all(bind=engine)
 
@@ -0,0 +1,67 @@
+from sqlalchemy import Column, String, DateTime, Integer, Float, Boolean, Text, ForeignKey, CheckConstraint, UniqueConstraint
+import uuid
+from datetime import datetime, timezone
+from database.session import Base
+
+
+def gen_uuid():
+    return str(uuid.uuid4())
+
+
+BACKFILL_STATUSES = ['running', 'completed', 'failed']
+
+
+class EmbeddingBackfillRun(Base):
+    """Progress of one full embedding backfill.
+
+    ``last_tenant_id`` is the checkpoint: every tenant up to and including it
+    has been processed, so a crashed run resumes with the tenants after it.
+    ``window`` batches are in flight at a time; ``elapsed_seconds`` only
+    counts time spent working, not the time a crashed run sat idle.
+    """
+    __tablename__ = "embedding_backfill_runs"
+    id = Column(String, primary_key=True, default=gen_uuid)
+    status = Column(String, nullable=False, default="running")
+    only_dirty = Column(Boolean, nullable=False, default=True)
+    batch_size = Column(Integer, nullable=False)
+    window = Column(Integer, nullable=False, default=1)
+    last_tenant_id = Column(String, nullable=True)
+    processed = Column(Integer, nullable=False, default=0)
+    embedded = Column(Integer, nullable=False, default=0)
+    unchanged = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    elapsed_seconds = Column(Float, nullable=False, default=0.0)
+    started_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        CheckConstraint("status IN ('running', 'completed', 'failed')", name="check_embedding_backfill_status"),
+    )
+
+    class Config:
+        from_attributes = True
+
+
+class ProfileDescription(Base):
+    """LLM self-description a tenant's embedding was built from.
+
+    Valid while ``content_hash`` equals the tenant's current profile content
+    hash; ``prompt_version`` changes whenever the prompt or LLM does, so
+    re-embedding an unchanged profile reuses the text instead of calling the LLM.
+    """
+    __tablename__ = "profile_descriptions"
+    id = Column(String, primary_key=True, default=gen_uuid)
+    tenant = Column(String, ForeignKey("tenants.id"), nullable=False)
+    prompt_version = Column(String, nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    description = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        UniqueConstraint("tenant", "prompt_version", name="uq_profile_description_tenant_prompt"),
+    )
+
+    class Config:
+        from_attributes = True
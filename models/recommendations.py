@@ -0,0 +1,76 @@
+from sqlalchemy import Column, String, DateTime, Date, Float, Integer, ForeignKey, Text, UniqueConstraint, Index, CheckConstraint
+from sqlalchemy.orm import relationship
+import uuid
+from datetime import datetime, timezone
+from database.session import Base
+
+
+def gen_uuid():
+    return str(uuid.uuid4())
+
+
+class MatchInsight(Base):
+    """AI insight explaining why ``candidate`` was recommended to ``viewer``.
+
+    ``profile_hash`` captures both tenants' ``profile_version``; a cached row is
+    only reused while it matches, so editing either profile invalidates it.
+    """
+    __tablename__ = "match_insights"
+    id = Column(String, primary_key=True, default=gen_uuid)
+    viewer = Column(String, ForeignKey("tenants.id"), nullable=False, index=True)
+    candidate = Column(String, ForeignKey("tenants.id"), nullable=False)
+    query = Column(String, nullable=False, default="")
+    profile_hash = Column(String, nullable=False)
+    insight = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        UniqueConstraint("viewer", "candidate", "query", name="uq_match_insight_viewer_candidate_query"),
+    )
+
+    class Config:
+        from_attributes = True
+
+
+class DailyRecommendation(Base):
+    """One precomputed match in a tenant's daily feed, written by the nightly Celery job."""
+    __tablename__ = "daily_recommendations"
+    id = Column(String, primary_key=True, default=gen_uuid)
+    tenant = Column(String, ForeignKey("tenants.id"), nullable=False)
+    candidate = Column(String, ForeignKey("tenants.id"), nullable=False)
+    rank = Column(Integer, nullable=False)
+    score = Column(Float, nullable=False)
+    ai_insight = Column(Text, nullable=True)
+    feed_date = Column(Date, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    candidate_obj = relationship("Tenant", foreign_keys=[candidate])
+
+    __table_args__ = (
+        Index("ix_daily_recommendations_tenant_rank", "tenant", "rank"),
+    )
+
+    class Config:
+        from_attributes = True
+
+
+PROFILE_DECISIONS = ['declined', 'archived', 'matched']
+
+
+class ProfileDecision(Base):
+    """What a tenant did with a recommended profile. Decided profiles are excluded from future searches."""
+    __tablename__ = "profile_decisions"
+    id = Column(String, primary_key=True, default=gen_uuid)
+    tenant = Column(String, ForeignKey("tenants.id"), nullable=False, index=True)
+    candidate = Column(String, ForeignKey("tenants.id"), nullable=False)
+    decision = Column(String, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        UniqueConstraint("tenant", "candidate", name="uq_profile_decision_tenant_candidate"),
+        CheckConstraint("decision IN ('declined', 'archived', 'matched')", name="check_profile_decision"),
+    )
+
+    class Config:
+        from_attributes = True
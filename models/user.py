@@ -1,16 +1,20 @@
 from datetime import datetime
 from pydantic import BaseModel
-from sqlalchemy import Column, String, DateTime, JSON, ForeignKey, Float,Integer
+from sqlalchemy import Column, String, DateTime, JSON, ForeignKey, Float,Integer, Sequence
 import uuid
 from datetime import timezone
 from database.session import Base
-from sqlalchemy.orm import relationship
+from sqlalchemy import event
+from sqlalchemy.orm import relationship, Session as OrmSession
 
 def gen_uuid():
     return str(uuid.uuid4())
 
 USER_ROLES = ['user','admin']
 
+# Vector store primary keys; drawn from a sequence so parallel embedding workers never collide
+EMBEDDING_ID_SEQUENCE = Sequence("tenant_embedding_id_seq", metadata=Base.metadata)
+
 class Tenant(Base):
     __tablename__ = "tenants"
     id = Column(String, primary_key=True, default=gen_uuid)
@@ -22,6 +26,11 @@ class Tenant(Base):
     created_at = Column(DateTime, default=datetime.now(timezone.utc))
     updated_at = Column(DateTime, nullable=True)
     embedding_id = Column(Integer, nullable=True)
+    # Bumped whenever any profile section changes, see bump_profile_version below
+    profile_version = Column(Integer, default=0, server_default="0", nullable=False)
+    # profile_version and content hash the current embedding was built from
+    embedded_version = Column(Integer, nullable=True)
+    embedding_hash = Column(String(64), nullable=True)
     
 
     # Relationships to profile data
@@ -218,3 +227,31 @@ class IdealCharacteristics(Base):
     innovative = Column(Float, default=0.0)
     dedicated = Column(Float, default=0.0)
     ethical = Column(Float, default=0.0)
+
+
+PROFILE_SECTION_MODELS = (
+    PersonalInfo, BigFiveTraits, MBTITraits, Psychology, InterestsAndHobbies,
+    ValuesBeliefsAndGoals, Favorites, RelationshipPreferences, FriendshipPreferences,
+    CollaborationPreferences, PersonalFreeForm, Intentions, AspirationAndReflections,
+    IdealCharacteristics,
+)
+
+
+@event.listens_for(OrmSession, "before_flush")
+def bump_profile_version(session, flush_context, instances):
+    """Increment Tenant.profile_version when any of its profile sections is written.
+
+    Caches derived from a profile (match insights, embeddings) compare this
+    version instead of diffing every section.
+    """
+    tenant_ids = {
+        obj.tenant
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        if isinstance(obj, PROFILE_SECTION_MODELS) and obj.tenant
+        and (obj in session.new or obj in session.deleted or session.is_modified(obj))
+    }
+    for tenant_id in tenant_ids:
+        tenant = session.get(Tenant, tenant_id)
+        if tenant is not None:
+            tenant.profile_version = (tenant.profile_version or 0) + 1
+            tenant.updated_at = datetime.now(timezone.utc)
@@ -0,0 +1,34 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Literal, Optional
+
+
+class ProfileDecisionCreate(BaseModel):
+    candidate_id: str
+    decision: Literal['declined', 'archived', 'matched']
+
+
+class ProfileDecisionSchema(BaseModel):
+    id: str
+    tenant: str
+    candidate: str
+    decision: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class RecommendationFilters(BaseModel):
+    """Optional filters for recommendation endpoints.
+
+    All but ``active_within_days`` are applied inside the vector search; recency
+    is checked against ``tenants.last_login``, which changes on every login, with
+    the search paging on until enough recently active matches are found.
+    """
+    min_age: Optional[int] = None
+    max_age: Optional[int] = None
+    gender: Optional[str] = None
+    location: Optional[str] = None
+    seeking: Optional[Literal['romantic', 'friendship', 'collaboration']] = None
+    active_within_days: Optional[int] = None
@@ -0,0 +1,57 @@
+"""
+Backfill tenant embeddings, resumably.
+
+Walks the tenants table in primary key order (keyset pagination) and embeds
+it batch by batch, checkpointing after every window of batches. A crashed or
+interrupted run continues from its last checkpoint with --resume.
+
+    python scripts/backfill_embeddings.py                    # in this process
+    python scripts/backfill_embeddings.py --celery           # fan batches out to the workers
+    python scripts/backfill_embeddings.py --all              # re-embed every tenant, not just stale ones
+    python scripts/backfill_embeddings.py --resume RUN_ID
+    python scripts/backfill_embeddings.py --status RUN_ID
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+
+from services.embedding_backfill import EmbeddingBackfillService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, help="tenants per batch (EMBEDDING_BACKFILL_BATCH_SIZE)")
+    parser.add_argument("--window", type=int, help="batches between checkpoints (EMBEDDING_BACKFILL_WINDOW)")
+    parser.add_argument("--all", action="store_true", help="re-embed tenants whose embedding is current too")
+    parser.add_argument("--celery", action="store_true", help="dispatch each window as a Celery chord")
+    parser.add_argument("--resume", metavar="RUN_ID", help="continue a run from its last checkpoint")
+    parser.add_argument("--status", metavar="RUN_ID", help="print a run's progress and exit")
+    args = parser.parse_args()
+
+    service = EmbeddingBackfillService()
+
+    if args.status:
+        run = service.get_run(args.status)
+        if run is None:
+            sys.exit(f"No embedding backfill run {args.status}")
+        print(f"{run.id} {run.status}: {service.summary(run)}")
+        return
+
+    run = service.resume(args.resume) if args.resume else service.start(args.batch_size, args.window, only_dirty=not args.all)
+    print(f"Backfill run {run.id} from checkpoint {run.last_tenant_id}")
+
+    # Imported late so --status does not load the embedding stack
+    from core.celery import backfill_embeddings, embed_tenant_batch, maintain_vector_store
+    if args.celery:
+        backfill_embeddings.delay(run.id)
+        print(f"Dispatched to Celery, follow it with --status {run.id}")
+        return
+    run = service.run_local(run.id, embed_tenant_batch)
+    if run.status == "completed":
+        maintain_vector_store()
+    print(f"{run.id} {run.status}: {service.summary(run)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Memory per worker with and without pre-fork model loading.
+
+Forks N workers the way gunicorn/Celery prefork do. Each worker encodes a
+sentence and reports its memory from /proc (Linux only):
+
+- RSS: resident pages, shared ones counted in full in every worker
+- PSS: shared pages split between the processes sharing them
+- USS: pages private to the worker (what one more worker really costs)
+
+    python scripts/benchmark_model_memory.py --workers 4
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import multiprocessing as mp
+import subprocess
+
+from elinity_ai.embedding_service import DEFAULT_MODEL, get_sentence_model, preload_models
+
+
+def memory_kb() -> dict:
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:", "Private_Clean:", "Private_Dirty:"):
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "uss": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def worker(model_name: str, results):
+    get_sentence_model(model_name).encode(["Hi, I'm Sam and I love climbing."])
+    results.put(memory_kb())
+
+
+def run_mode(mode: str, workers: int, model_name: str):
+    if mode == "preloaded":
+        preload_models([model_name])
+    ctx = mp.get_context("fork")
+    results = ctx.Queue()
+    processes = [ctx.Process(target=worker, args=(model_name, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    stats = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    def mb(key):
+        return sum(stat[key] for stat in stats) / len(stats) / 1024
+
+    print(f"{mode:<11} workers={workers}  avg RSS {mb('rss'):8.1f} MB  avg PSS {mb('pss'):8.1f} MB  avg USS {mb('uss'):8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--mode", choices=["per-worker", "preloaded"])
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.workers, args.model)
+        return
+    # Each mode runs in a fresh interpreter so the parent starts from the same state
+    for mode in ("per-worker", "preloaded"):
+        subprocess.run([sys.executable, __file__, "--mode", mode, "--workers", str(args.workers), "--model", args.model], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Recall and latency of quantized vector search against exact float32 search.
+
+Embeds the personas in scripts/data/personas.json (or loads cached embeddings)
+and searches with every persona as the query, excluding itself. For each
+quantization it reports recall@k against the exact result, mean and p95 query
+latency, and bytes per vector in the scanned representation. ``--scale N`` adds
+noisy copies of the persona vectors to measure latency at a realistic size.
+
+    python scripts/benchmark_quantization.py --top-k 10 --scale 100000
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import time
+import numpy as np
+
+from elinity_ai.vector_store import NumpyVectorStore
+from elinity_ai.vector_store._quantization import QUANTIZATIONS, bytes_per_vector
+
+PERSONAS = os.path.join(os.path.dirname(__file__), "data", "personas.json")
+
+
+def persona_text(value) -> str:
+    """Flatten every string in a persona record into one description."""
+    if isinstance(value, dict):
+        return ". ".join(filter(None, (persona_text(v) for v in value.values())))
+    if isinstance(value, list):
+        return ", ".join(filter(None, (persona_text(v) for v in value)))
+    return value if isinstance(value, str) else ""
+
+
+def load_embeddings(cache_path: str = None) -> np.ndarray:
+    if cache_path and os.path.exists(cache_path):
+        return np.load(cache_path)
+    from elinity_ai.embedding_service import get_sentence_model
+    with open(PERSONAS) as f:
+        personas = json.load(f)
+    embeddings = get_sentence_model().encode([persona_text(p) for p in personas], batch_size=64, convert_to_numpy=True)
+    if cache_path:
+        np.save(cache_path, embeddings)
+    return embeddings
+
+
+def scale_up(embeddings: np.ndarray, size: int, seed: int = 0) -> np.ndarray:
+    """Pad with noisy copies of the real vectors so the corpus keeps its structure."""
+    if size <= len(embeddings):
+        return embeddings
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(embeddings), size - len(embeddings))
+    noise = rng.normal(scale=0.5 * embeddings.std(), size=(len(picks), embeddings.shape[1]))
+    return np.vstack([embeddings, embeddings[picks] + noise]).astype(np.float32)
+
+
+def run(vectors: np.ndarray, queries: int, top_k: int, rescore_factor: int):
+    dim = vectors.shape[1]
+    records = [{"id": i, "vector": vector} for i, vector in enumerate(vectors)]
+    query_ids = list(range(min(queries, len(vectors))))
+    exact = None
+    print(f"{len(vectors)} vectors, dim {dim}, {len(query_ids)} queries, recall@{top_k}, rescore x{rescore_factor}")
+    for quantization in QUANTIZATIONS:
+        store = NumpyVectorStore(dim=dim, quantization=quantization, rescore_factor=rescore_factor)
+        store.upsert(records)
+        store.search(vectors[0], top_k=top_k)  # builds the codes outside the timed loop
+        latencies, results = [], []
+        for i in query_ids:
+            started = time.perf_counter()
+            hits = store.search(vectors[i], top_k=top_k, exclude_ids=[i])
+            latencies.append(time.perf_counter() - started)
+            results.append({hit["id"] for hit in hits})
+        if exact is None:
+            exact = results
+        recall = np.mean([len(got & want) / len(want) for got, want in zip(results, exact)])
+        print(
+            f"{quantization:<8} recall {recall:.3f}  mean {1000 * np.mean(latencies):7.2f} ms  "
+            f"p95 {1000 * np.percentile(latencies, 95):7.2f} ms  {bytes_per_vector(dim, quantization):5d} B/vector"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=395)
+    parser.add_argument("--rescore-factor", type=int, default=4)
+    parser.add_argument("--scale", type=int, default=0, help="pad the corpus to this many vectors")
+    parser.add_argument("--embeddings", help="cache persona embeddings in this .npy file")
+    args = parser.parse_args()
+
+    vectors = scale_up(load_embeddings(args.embeddings), args.scale)
+    run(vectors, args.queries, args.top_k, args.rescore_factor)
+
+
+if __name__ == "__main__":
+    main()
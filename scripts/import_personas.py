@@ -0,0 +1,42 @@
+"""
+Stream a persona export into the Pinecone index.
+
+Records are read incrementally from a JSON array (or .jsonl) file, so large
+exports never have to fit in memory, and several upsert batches are kept in
+flight with retry and backoff. Progress is logged in records/sec.
+
+    python scripts/import_personas.py scripts/data/personas.json --concurrency 8
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+
+from elinity_ai.embeddings import get_pinecone_client, iter_json_records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?", default=os.path.join(os.path.dirname(__file__), "data", "personas.json"))
+    parser.add_argument("--namespace", default="personas")
+    parser.add_argument("--batch-size", type=int, default=96)
+    parser.add_argument("--concurrency", type=int, help="batches in flight (PINECONE_UPSERT_CONCURRENCY)")
+    parser.add_argument("--max-retries", type=int, help="retries per batch (PINECONE_UPSERT_MAX_RETRIES)")
+    args = parser.parse_args()
+
+    stats = get_pinecone_client().bulk_upsert_personas(
+        iter_json_records(args.path),
+        namespace=args.namespace,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        max_retries=args.max_retries,
+    )
+    print(
+        f"{stats['upserted']}/{stats['records']} records upserted in {stats['seconds']:.1f}s "
+        f"({stats['records_per_sec']:.1f} records/sec), {stats['failed_batches']} failed batches"
+    )
+    sys.exit(1 if stats["failed_batches"] else 0)
+
+
+if __name__ == "__main__":
+    main()
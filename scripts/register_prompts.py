@@ -0,0 +1,48 @@
+"""
+Create the LangSmith prompts that ship with a built-in copy in the code.
+
+Once a prompt exists in LangSmith it is edited there and served through the
+prompt registry; the built-in copy is only a fallback. Existing prompts are
+left alone unless --force is given.
+
+    python scripts/register_prompts.py
+    python scripts/register_prompts.py --force     # overwrite with the built-in copies
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+
+from dotenv import load_dotenv
+from langchain_core.prompts import ChatPromptTemplate
+from langsmith import Client
+
+from elinity_ai.insights._insights import BATCH_INSIGHT_PROMPT
+
+load_dotenv()
+
+BUILT_IN_PROMPTS = {
+    "match-insight-batch": BATCH_INSIGHT_PROMPT,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--force", action="store_true", help="push the built-in copy even if the prompt exists")
+    args = parser.parse_args()
+
+    client = Client(api_key=os.getenv("LANGSMITH_API_KEY"))
+    for name, template in BUILT_IN_PROMPTS.items():
+        if not args.force:
+            try:
+                client.pull_prompt(name)
+                print(f"{name}: already registered, skipped")
+                continue
+            except Exception:
+                pass
+        url = client.push_prompt(name, object=ChatPromptTemplate.from_template(template))
+        print(f"{name}: pushed {url}")
+
+
+if __name__ == "__main__":
+    main()
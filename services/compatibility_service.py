@@ -0,0 +1,251 @@
+"""
+Vectorized compatibility re-ranking over structured personality traits
+"""
+import asyncio
+import os
+import threading
+import time
+import warnings
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional
+import numpy as np
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from core.logging import logger
+from database.session import Session as SessionLocal
+from models.user import Tenant, BigFiveTraits, MBTITraits, Psychology, IdealCharacteristics
+
+BIG_FIVE_FIELDS = ("openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism")
+MBTI_FIELDS = ("introversion", "extraversion", "agreeableness", "neuroticism")
+SECURE_FIELDS = ("secure", "trusting", "supportive")
+INSECURE_FIELDS = ("anxious", "avoidant")
+IDEAL_FIELDS = ("passionate", "adventurous", "supportive", "funny", "reliable", "open_minded", "innovative", "dedicated", "ethical")
+
+# Column layout of the trait matrix: (model, field) per column
+COLUMNS = (
+    [(BigFiveTraits, field) for field in BIG_FIVE_FIELDS]
+    + [(MBTITraits, field) for field in MBTI_FIELDS]
+    + [(Psychology, field) for field in SECURE_FIELDS + INSECURE_FIELDS]
+    + [(IdealCharacteristics, field) for field in IDEAL_FIELDS]
+)
+BIG_FIVE = slice(0, 5)
+MBTI = slice(5, 9)
+SECURE = slice(9, 12)
+INSECURE = slice(12, 14)
+IDEAL = slice(14, 23)
+SECTIONS = (BIG_FIVE, MBTI, slice(9, 14), IDEAL)
+
+# Declared upper bound of each column (all start at 0): Big Five is 0-1, MBTI and
+# ideal characteristics are rated 0-10. Values are divided by it before comparing.
+COLUMN_SCALES = np.array(
+    [1.0] * len(BIG_FIVE_FIELDS)
+    + [10.0] * len(MBTI_FIELDS)
+    + [1.0] * len(SECURE_FIELDS + INSECURE_FIELDS)
+    + [10.0] * len(IDEAL_FIELDS),
+    dtype=np.float32,
+)
+
+DEFAULT_WEIGHTS = {"big_five": 0.4, "values": 0.3, "attachment": 0.2, "mbti": 0.1}
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def trait_row(values) -> np.ndarray:
+    """Matrix row for one tenant's trait values, in ``COLUMNS`` order.
+
+    Every column defaults to 0.0, so a section whose values are all zero was
+    never filled in: it is NaN (missing), like a section without a row.
+    """
+    row = np.array([_to_float(v) for v in values], dtype=np.float32)
+    for section in SECTIONS:
+        if np.all(np.nan_to_num(row[section]) == 0.0):
+            row[section] = np.nan
+    return row
+
+
+def compatibility_scores(viewer: np.ndarray, candidates: np.ndarray, weights: Dict[str, float] = None, scales: np.ndarray = None) -> np.ndarray:
+    """Weighted trait compatibility in [0, 1] of every candidate row with the viewer row.
+
+    Each column is first divided by its scale (``COLUMN_SCALES`` by default) so
+    that every trait lies in [0, 1]. Missing traits are NaN and drop out of the
+    weighted mean; a candidate with no comparable traits at all gets NaN.
+
+    - big_five / mbti: 1 - mean absolute difference (similar temperaments)
+    - values: cosine similarity of the ideal characteristics both people value
+    - attachment: the candidate's secure minus insecure attachment scores
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    scales = COLUMN_SCALES if scales is None else scales
+    candidates = np.clip(np.atleast_2d(candidates) / scales, 0.0, 1.0)
+    viewer = np.clip(viewer / scales, 0.0, 1.0)
+
+    # nanmean over an all-NaN row warns; missing sections are expected here
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        big_five = 1.0 - np.nanmean(np.abs(candidates[:, BIG_FIVE] - viewer[BIG_FIVE]), axis=1)
+        mbti = 1.0 - np.nanmean(np.abs(candidates[:, MBTI] - viewer[MBTI]), axis=1)
+
+        ideal_v = np.nan_to_num(viewer[IDEAL])
+        ideal_c = np.nan_to_num(candidates[:, IDEAL])
+        norms = np.linalg.norm(ideal_c, axis=1) * np.linalg.norm(ideal_v)
+        values = np.where(norms > 0, ideal_c @ ideal_v / np.where(norms > 0, norms, 1.0), np.nan)
+
+        attachment = (
+            np.nanmean(candidates[:, SECURE], axis=1) - np.nanmean(candidates[:, INSECURE], axis=1) + 1.0
+        ) / 2.0
+
+        components = np.stack([big_five, values, attachment, mbti], axis=1)
+        component_weights = np.array([weights["big_five"], weights["values"], weights["attachment"], weights["mbti"]])
+        present = ~np.isnan(components)
+        total_weight = present @ component_weights
+        weighted = np.nan_to_num(components) @ component_weights
+        return np.where(total_weight > 0, weighted / np.where(total_weight > 0, total_weight, 1.0), np.nan)
+
+
+class CompatibilityService:
+    """Keeps a float32 trait matrix for all tenants and blends trait compatibility into ANN scores.
+
+    The matrix is loaded once per process at startup (``warm_up``), then
+    refreshed incrementally from ``Tenant.updated_at`` (bumped whenever a profile
+    section changes). Tenants it has not seen yet, e.g. freshly embedded ones, are
+    loaded together in one query. Queries run outside the lock; only swapping
+    the results into the matrix holds it, so re-ranking never waits on Postgres.
+    """
+
+    def __init__(self, blend: float = None, overfetch: int = None, refresh_interval: int = None, weights: Dict[str, float] = None):
+        self.blend = blend if blend is not None else float(os.getenv("RERANK_WEIGHT", 0.3))
+        self.overfetch = overfetch or int(os.getenv("RERANK_OVERFETCH", 3))
+        self.refresh_interval = refresh_interval or int(os.getenv("RERANK_REFRESH_INTERVAL", 60))
+        self.weights = weights or DEFAULT_WEIGHTS
+        self._lock = threading.RLock()
+        self._matrix = np.empty((0, len(COLUMNS)), dtype=np.float32)
+        # Declared scales, widened to the largest value seen so off-scale data does not saturate
+        self._scales = COLUMN_SCALES.copy()
+        self._row_by_tenant: Dict[str, int] = {}
+        self._row_by_embedding: Dict[int, int] = {}
+        self._loaded = False
+        self._refreshing = False
+        self._last_refresh = None
+        self._last_refresh_at = 0.0
+
+    def _query(self, db: Session):
+        query = db.query(Tenant.id, Tenant.embedding_id, *[getattr(model, field) for model, field in COLUMNS])
+        for model in (BigFiveTraits, MBTITraits, Psychology, IdealCharacteristics):
+            query = query.outerjoin(model, model.tenant == Tenant.id)
+        return query
+
+    def _apply(self, rows):
+        """Insert or overwrite matrix rows; caller holds the lock."""
+        new_rows = []
+        for row in rows:
+            tenant_id, embedding_id, values = row[0], row[1], trait_row(row[2:])
+            self._scales = np.fmax(self._scales, np.abs(values))
+            index = self._row_by_tenant.get(tenant_id)
+            if index is None:
+                index = len(self._row_by_tenant)
+                self._row_by_tenant[tenant_id] = index
+                new_rows.append(values)
+            else:
+                self._matrix[index] = values
+            if embedding_id is not None:
+                self._row_by_embedding[int(embedding_id)] = index
+        if new_rows:
+            self._matrix = np.vstack([self._matrix, np.asarray(new_rows, dtype=np.float32)])
+
+    def load(self, db: Session):
+        started = time.perf_counter()
+        loaded_from = datetime.now(timezone.utc)
+        rows = self._query(db).all()
+        with self._lock:
+            self._apply(rows)
+            self._loaded = True
+            self._last_refresh = loaded_from
+            self._last_refresh_at = time.monotonic()
+        logger.info(f"Trait matrix loaded: {len(self._row_by_tenant)} tenants in {time.perf_counter() - started:.2f}s")
+
+    def warm_up(self):
+        """Load the whole matrix; called at startup so no request pays for it."""
+        with SessionLocal() as db:
+            self.load(db)
+
+    def refresh(self, db: Session, force: bool = False):
+        """Reload tenants whose profile changed since the last refresh.
+
+        Does nothing before ``warm_up``: ``ensure`` still loads the rows a
+        request needs. The window reaches back one extra ``refresh_interval``
+        because ``updated_at`` is set at flush time, so a row flushed before
+        the last refresh but committed after it is picked up by this one.
+        """
+        with self._lock:
+            if not self._loaded or self._refreshing:
+                return
+            if not force and time.monotonic() - self._last_refresh_at < self.refresh_interval:
+                return
+            self._refreshing = True
+            since = self._last_refresh - timedelta(seconds=self.refresh_interval)
+        try:
+            refreshed_from = datetime.now(timezone.utc)
+            changed = self._query(db).filter(Tenant.updated_at >= since).all()
+            with self._lock:
+                self._apply(changed)
+                self._last_refresh = refreshed_from
+                self._last_refresh_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._refreshing = False
+        if changed:
+            logger.debug(f"Trait matrix refreshed: {len(changed)} tenants")
+
+    def ensure(self, db: Session, tenant_ids: Iterable[str] = (), embedding_ids: Iterable[int] = ()):
+        """Load any of the given tenants that are not in the matrix yet, in a single query."""
+        with self._lock:
+            missing_tenants = [t for t in tenant_ids if t not in self._row_by_tenant]
+            missing_embeddings = [int(e) for e in embedding_ids if int(e) not in self._row_by_embedding]
+        if not missing_tenants and not missing_embeddings:
+            return
+        conditions = []
+        if missing_tenants:
+            conditions.append(Tenant.id.in_(missing_tenants))
+        if missing_embeddings:
+            conditions.append(Tenant.embedding_id.in_(missing_embeddings))
+        rows = self._query(db).filter(or_(*conditions)).all()
+        with self._lock:
+            self._apply(rows)
+
+    def rerank(self, db: Session, viewer: Tenant, score_map: Dict[int, float], top_k: Optional[int] = None) -> Dict[int, float]:
+        """Blend trait compatibility into ANN scores and keep the ``top_k`` best.
+
+        ``score_map`` maps embedding_id to the embedding similarity. The result has
+        the same shape, ordered best first. Candidates without comparable traits
+        keep their embedding score.
+        """
+        if not score_map:
+            return {}
+        self.refresh(db)
+        self.ensure(db, tenant_ids=[viewer.id], embedding_ids=score_map.keys())
+
+        embedding_ids = list(score_map.keys())
+        ann_scores = np.array([score_map[e] for e in embedding_ids], dtype=np.float32)
+        with self._lock:
+            viewer_row = self._row_by_tenant.get(viewer.id)
+            rows = np.array([self._row_by_embedding.get(int(e), -1) for e in embedding_ids])
+            viewer_traits = self._matrix[viewer_row] if viewer_row is not None else None
+            candidate_traits = self._matrix[np.maximum(rows, 0)] if len(self._matrix) else None
+            scales = self._scales
+
+        blended = ann_scores
+        if viewer_traits is not None and candidate_traits is not None and self.blend > 0:
+            compat = compatibility_scores(viewer_traits, candidate_traits, self.weights, scales)
+            compat[rows < 0] = np.nan
+            blended = np.where(np.isnan(compat), ann_scores, (1.0 - self.blend) * ann_scores + self.blend * compat)
+
+        order = np.argsort(-blended)[:top_k]
+        return {embedding_ids[i]: float(blended[i]) for i in order}
+
+    async def arerank(self, db: Session, viewer: Tenant, score_map: Dict[int, float], top_k: Optional[int] = None) -> Dict[int, float]:
+        return await asyncio.to_thread(self.rerank, db, viewer, score_map, top_k)
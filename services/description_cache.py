@@ -0,0 +1,51 @@
+"""
+Persistent cache of LLM self-descriptions used to build profile embeddings
+"""
+from datetime import datetime, timezone
+from typing import Dict
+from sqlalchemy.orm import Session
+from models.embeddings import ProfileDescription
+
+
+class ProfileDescriptionCache:
+    """One description per tenant and prompt version, valid for one profile content hash.
+
+    Arguments map tenant ids to their current ``profile_content_hash``.
+    """
+
+    def get_many(self, db: Session, prompt_version: str, content_hashes: Dict[str, str]) -> Dict[str, str]:
+        """Cached descriptions by tenant id, skipping rows written for older profile content."""
+        if not content_hashes:
+            return {}
+        rows = db.query(ProfileDescription).filter(
+            ProfileDescription.tenant.in_(list(content_hashes)),
+            ProfileDescription.prompt_version == prompt_version,
+        )
+        return {row.tenant: row.description for row in rows if row.content_hash == content_hashes[row.tenant]}
+
+    def set_many(self, db: Session, prompt_version: str, content_hashes: Dict[str, str], descriptions: Dict[str, str]):
+        """Insert or replace the descriptions of the given tenants in one transaction."""
+        tenant_ids = [tenant_id for tenant_id in content_hashes if descriptions.get(tenant_id)]
+        if not tenant_ids:
+            return
+        existing = {
+            row.tenant: row
+            for row in db.query(ProfileDescription).filter(
+                ProfileDescription.tenant.in_(tenant_ids),
+                ProfileDescription.prompt_version == prompt_version,
+            )
+        }
+        now = datetime.now(timezone.utc)
+        for tenant_id in tenant_ids:
+            row = existing.get(tenant_id)
+            if row is None:
+                row = ProfileDescription(tenant=tenant_id, prompt_version=prompt_version, created_at=now)
+                db.add(row)
+            row.content_hash = content_hashes[tenant_id]
+            row.description = descriptions[tenant_id]
+            row.updated_at = now
+        try:
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
@@ -0,0 +1,143 @@
+"""
+Resumable full backfill of tenant embeddings
+"""
+import os
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from core.logging import logger
+from database.session import Session
+from models.embeddings import EmbeddingBackfillRun
+from services.user_service import UserService
+
+BACKFILL_BATCH_SIZE = int(os.getenv("EMBEDDING_BACKFILL_BATCH_SIZE", 50))
+# Batches dispatched together between two checkpoints
+BACKFILL_WINDOW = int(os.getenv("EMBEDDING_BACKFILL_WINDOW", 8))
+
+STAT_KEYS = ("embedded", "unchanged", "failed")
+# Batch results also count tenants embedded elsewhere since the window was read
+PROCESSED_KEYS = STAT_KEYS + ("skipped",)
+
+
+def _seconds_since(timestamp: datetime) -> float:
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return max((datetime.now(timezone.utc) - timestamp).total_seconds(), 0.0)
+
+
+class EmbeddingBackfillService:
+    """Walks every tenant in primary key order, a window of batches at a time.
+
+    After each window the run row is checkpointed with the last tenant id of
+    the window and the accumulated counts. Batches are idempotent (already
+    embedded tenants are skipped, ids are stable), so after a crash the
+    unfinished window is simply processed again.
+    """
+
+    def __init__(self, user_service: UserService = None):
+        self.user_service = user_service or UserService()
+
+    def start(self, batch_size: int = None, window: int = None, only_dirty: bool = True) -> EmbeddingBackfillRun:
+        with Session() as db:
+            run = EmbeddingBackfillRun(
+                batch_size=batch_size or BACKFILL_BATCH_SIZE,
+                window=window or BACKFILL_WINDOW,
+                only_dirty=only_dirty,
+            )
+            db.add(run)
+            db.commit()
+            db.refresh(run)
+            return run
+
+    def get_run(self, run_id: str) -> Optional[EmbeddingBackfillRun]:
+        with Session() as db:
+            return db.get(EmbeddingBackfillRun, run_id)
+
+    def resume(self, run_id: str) -> EmbeddingBackfillRun:
+        """Mark a stopped run running again, from its last checkpoint."""
+        with Session() as db:
+            run = db.get(EmbeddingBackfillRun, run_id)
+            if run is None:
+                raise ValueError(f"No embedding backfill run {run_id}")
+            if run.status == "completed":
+                raise ValueError(f"Embedding backfill run {run_id} already completed")
+            run.status = "running"
+            # The time the run sat crashed is not part of its throughput
+            run.updated_at = datetime.now(timezone.utc)
+            db.commit()
+            db.refresh(run)
+            return run
+
+    def next_window(self, run_id: str) -> Optional[Tuple[List[List[str]], Optional[str], bool]]:
+        """``(batches, last_tenant_id, force)`` for the tenants after the checkpoint.
+
+        ``None`` if the run is not running any more; no batches once every
+        tenant has been visited.
+        """
+        run = self.get_run(run_id)
+        if run is None or run.status != "running":
+            return None
+        ids = self.user_service.get_tenant_id_page(run.last_tenant_id, run.batch_size * run.window, only_dirty=run.only_dirty)
+        batches = [ids[i:i + run.batch_size] for i in range(0, len(ids), run.batch_size)]
+        return batches, (ids[-1] if ids else run.last_tenant_id), not run.only_dirty
+
+    def checkpoint(self, run_id: str, last_tenant_id: str, results: Iterable[Dict[str, int]]) -> EmbeddingBackfillRun:
+        """Record a finished window: everything up to ``last_tenant_id`` is done."""
+        results = list(results)
+        with Session() as db:
+            run = db.get(EmbeddingBackfillRun, run_id)
+            for key in STAT_KEYS:
+                setattr(run, key, getattr(run, key) + sum(result.get(key, 0) for result in results))
+            run.processed += sum(result.get(key, 0) for result in results for key in PROCESSED_KEYS)
+            run.elapsed_seconds += _seconds_since(run.updated_at)
+            run.last_tenant_id = last_tenant_id
+            run.updated_at = datetime.now(timezone.utc)
+            db.commit()
+            db.refresh(run)
+            return run
+
+    def finish(self, run_id: str, status: str = "completed") -> EmbeddingBackfillRun:
+        with Session() as db:
+            run = db.get(EmbeddingBackfillRun, run_id)
+            run.status = status
+            run.finished_at = datetime.now(timezone.utc)
+            db.commit()
+            db.refresh(run)
+            return run
+
+    @staticmethod
+    def rate(run: EmbeddingBackfillRun) -> float:
+        """Tenants per second over the time the run has been working."""
+        return run.processed / run.elapsed_seconds if run.elapsed_seconds else 0.0
+
+    def summary(self, run: EmbeddingBackfillRun) -> str:
+        return (
+            f"{run.processed} tenants ({run.embedded} embedded, {run.unchanged} unchanged, {run.failed} failed) "
+            f"in {run.elapsed_seconds:.1f}s, {self.rate(run):.1f} tenants/sec, checkpoint {run.last_tenant_id}"
+        )
+
+    def run_local(self, run_id: str, embed_batch: Callable[[List[str], bool], Dict[str, int]]) -> EmbeddingBackfillRun:
+        """Run a backfill in this process, one batch after another.
+
+        ``embed_batch(tenant_ids, force)`` embeds one batch and returns its counts.
+        """
+        try:
+            while True:
+                window = self.next_window(run_id)
+                if window is None:
+                    return self.get_run(run_id)
+                batches, last_tenant_id, force = window
+                if not batches:
+                    return self.finish(run_id)
+                started = time.perf_counter()
+                results = [embed_batch(batch, force) for batch in batches]
+                run = self.checkpoint(run_id, last_tenant_id, results)
+                window_count = sum(len(batch) for batch in batches)
+                logger.info(
+                    f"Backfill {run_id}: {window_count / (time.perf_counter() - started):.1f} tenants/sec this window, "
+                    f"{self.summary(run)}"
+                )
+        except BaseException:
+            # Interrupted: stays resumable from the last checkpoint
+            self.finish(run_id, status="failed")
+            raise
@@ -0,0 +1,112 @@
+"""
+Per-tenant set of profiles to keep out of recommendation searches
+"""
+import os
+from datetime import datetime, timezone
+from typing import List
+import numpy as np
+import redis
+from sqlalchemy.orm import Session
+from core.logging import logger
+from models.user import Tenant
+from models.recommendations import ProfileDecision, DailyRecommendation
+
+
+class ExclusionService:
+    """Declined, archived and matched profiles of a tenant as a set of ``embedding_id``s.
+
+    ``profile_decisions`` is the source of truth. The resolved ids are cached in
+    Redis as a sorted uint32 array (4 bytes per profile) so a search only costs a
+    single GET, even for tenants who have declined thousands of profiles. The set
+    is handed to the vector store as ``exclude_ids`` and applied inside the search,
+    so every returned candidate is usable.
+    """
+
+    def __init__(self, redis_url: str = None, ttl: int = None):
+        self.ttl = ttl or int(os.getenv("EXCLUSION_CACHE_TTL", 24 * 3600))
+        redis_url = redis_url or os.getenv("REDIS_URL")
+        self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.05) if redis_url else None
+
+    def _key(self, tenant_id: str) -> str:
+        return f"exclusions:{tenant_id}"
+
+    def _load(self, db: Session, tenant_id: str) -> np.ndarray:
+        rows = (
+            db.query(Tenant.embedding_id)
+            .join(ProfileDecision, ProfileDecision.candidate == Tenant.id)
+            .filter(ProfileDecision.tenant == tenant_id, Tenant.embedding_id.isnot(None))
+            .all()
+        )
+        return np.unique(np.asarray([row[0] for row in rows], dtype=np.uint32))
+
+    def _store(self, tenant_id: str, ids: np.ndarray):
+        if self._redis is None:
+            return
+        try:
+            self._redis.set(self._key(tenant_id), ids.astype(np.uint32).tobytes(), ex=self.ttl)
+        except redis.RedisError as e:
+            logger.debug(f"Exclusion cache: redis set failed: {e}")
+
+    def get(self, db: Session, tenant_id: str) -> np.ndarray:
+        """Sorted embedding ids the tenant should never be shown again."""
+        if self._redis is not None:
+            try:
+                raw = self._redis.get(self._key(tenant_id))
+                if raw is not None:
+                    return np.frombuffer(raw, dtype=np.uint32)
+            except redis.RedisError as e:
+                logger.debug(f"Exclusion cache: redis get failed: {e}")
+        ids = self._load(db, tenant_id)
+        self._store(tenant_id, ids)
+        return ids
+
+    def invalidate_candidates(self, db: Session, candidate_ids: List[str]):
+        """Drop the cached sets of every tenant that decided on ``candidate_ids``.
+
+        Called when those candidates are given their first ``embedding_id``: a
+        decision made before then could not be resolved to an id yet.
+        """
+        if self._redis is None or not candidate_ids:
+            return
+        tenant_ids = [
+            tenant_id for (tenant_id,) in
+            db.query(ProfileDecision.tenant).filter(ProfileDecision.candidate.in_(candidate_ids)).distinct()
+        ]
+        if not tenant_ids:
+            return
+        try:
+            self._redis.delete(*[self._key(tenant_id) for tenant_id in tenant_ids])
+        except redis.RedisError as e:
+            logger.debug(f"Exclusion cache: redis delete failed: {e}")
+
+    def record(self, db: Session, tenant_id: str, candidate_id: str, decision: str) -> ProfileDecision:
+        """Insert or update a decision and refresh the cached exclusion set."""
+        row = (
+            db.query(ProfileDecision)
+            .filter(ProfileDecision.tenant == tenant_id, ProfileDecision.candidate == candidate_id)
+            .first()
+        )
+        if row is None:
+            row = ProfileDecision(tenant=tenant_id, candidate=candidate_id)
+            db.add(row)
+        row.decision = decision
+        row.created_at = datetime.now(timezone.utc)
+        # Drop it from today's precomputed feed as well
+        db.query(DailyRecommendation).filter(
+            DailyRecommendation.tenant == tenant_id,
+            DailyRecommendation.candidate == candidate_id,
+        ).delete(synchronize_session=False)
+        db.commit(); db.refresh(row)
+        self._store(tenant_id, self._load(db, tenant_id))
+        return row
+
+    def remove(self, db: Session, tenant_id: str, candidate_id: str) -> bool:
+        """Undo a decision so the profile can be recommended again."""
+        deleted = (
+            db.query(ProfileDecision)
+            .filter(ProfileDecision.tenant == tenant_id, ProfileDecision.candidate == candidate_id)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        self._store(tenant_id, self._load(db, tenant_id))
+        return bool(deleted)
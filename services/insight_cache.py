@@ -0,0 +1,65 @@
+"""
+Persistent cache of AI match insights shown on recommendation pages
+"""
+import hashlib
+from datetime import datetime, timezone
+from typing import Dict, List
+from sqlalchemy.orm import Session
+from models.user import Tenant
+from models.recommendations import MatchInsight
+
+
+def profile_hash(viewer: Tenant, candidate: Tenant) -> str:
+    """Hash of both tenants' profile versions; changes whenever either profile is edited."""
+    key = f"{viewer.id}:{viewer.profile_version or 0}:{candidate.id}:{candidate.profile_version or 0}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+class MatchInsightCache:
+    def get_many(self, db: Session, viewer: Tenant, candidates: List[Tenant], query: str) -> Dict[str, str]:
+        """Return cached insights by candidate id, skipping rows whose profiles have changed since."""
+        if not candidates:
+            return {}
+        by_id = {candidate.id: candidate for candidate in candidates}
+        rows = (
+            db.query(MatchInsight)
+            .filter(
+                MatchInsight.viewer == viewer.id,
+                MatchInsight.candidate.in_(list(by_id)),
+                MatchInsight.query == query,
+            )
+            .all()
+        )
+        return {
+            row.candidate: row.insight
+            for row in rows
+            if row.profile_hash == profile_hash(viewer, by_id[row.candidate])
+        }
+
+    def set_many(self, db: Session, viewer: Tenant, candidates: List[Tenant], query: str, insights: Dict[str, str]):
+        """Insert or refresh cached insights for the given candidates in one transaction."""
+        candidates = [candidate for candidate in candidates if insights.get(candidate.id)]
+        if not candidates:
+            return
+        existing = {
+            row.candidate: row
+            for row in db.query(MatchInsight).filter(
+                MatchInsight.viewer == viewer.id,
+                MatchInsight.candidate.in_([candidate.id for candidate in candidates]),
+                MatchInsight.query == query,
+            )
+        }
+        now = datetime.now(timezone.utc)
+        for candidate in candidates:
+            row = existing.get(candidate.id)
+            if row is None:
+                row = MatchInsight(viewer=viewer.id, candidate=candidate.id, query=query, created_at=now)
+                db.add(row)
+            row.profile_hash = profile_hash(viewer, candidate)
+            row.insight = insights[candidate.id]
+            row.updated_at = now
+        try:
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
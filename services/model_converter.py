@@ -1,10 +1,20 @@
 """
 Service for converting SQLAlchemy models to dict/JSON for embeddings
 """
+import hashlib
+import json
 from models.user import Tenant
 from schemas.user import User
 from typing import Dict, Any
 
+# Columns that change without the profile content changing, or that never
+# belong in a self-description, left out of the embedding content hash
+NON_CONTENT_FIELDS = {
+    "id", "tenant", "created_at", "updated_at", "last_login", "email", "phone",
+    "password", "role", "embedding_id", "profile_version", "embedded_version",
+    "embedding_hash", "profile_pictures",
+}
+
 
 def sqlalchemy_to_dict(obj: Any) -> Dict:
     """
@@ -85,6 +95,25 @@ def tenant_to_dict(tenant: Tenant) -> Dict:
     return result
 
 
+def embedding_content(value: Any) -> Any:
+    """The part of a ``tenant_to_dict`` result that an embedding is built from."""
+    if isinstance(value, dict):
+        return {k: embedding_content(v) for k, v in value.items() if k not in NON_CONTENT_FIELDS}
+    if isinstance(value, list):
+        return [embedding_content(v) for v in value]
+    return value
+
+
+def profile_content_hash(tenant_dict: Dict) -> str:
+    """Stable SHA-256 of the embedding-relevant profile content.
+
+    Keys are sorted, so the hash only changes when a value that feeds the
+    self-description changes, not when a section is merely re-saved.
+    """
+    content = json.dumps(embedding_content(tenant_dict), sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
 def tenant_to_pydantic(tenant: Tenant) -> Dict:
     """
     Convert a Tenant SQLAlchemy model to a Pydantic model and then to a dictionary.
@@ -0,0 +1,178 @@
+"""
+Shared helpers for recommendation cards and the precomputed daily feed
+"""
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import exists
+from sqlalchemy.orm import Session, joinedload
+from core.logging import logger
+from database.session import Session as SessionLocal
+from models.user import Tenant
+from models.recommendations import DailyRecommendation, ProfileDecision
+from services.insight_cache import MatchInsightCache
+from services.exclusion_service import ExclusionService
+from services.compatibility_service import CompatibilityService
+
+
+def candidate_fields(tenant: Tenant, score: float) -> dict:
+    """Fields of a recommended tenant that the insight prompts need."""
+    personal_info = tenant.personal_info
+    name_parts = [
+        personal_info.first_name,
+        personal_info.middle_name,
+        personal_info.last_name
+    ] if personal_info else []
+    interests = tenant.interests_and_hobbies.interests if tenant.interests_and_hobbies else []
+    return {
+        "user_id": tenant.id,
+        "user_name": " ".join(part for part in name_parts if part),
+        "score": score,
+        "user_interests": ','.join(interests or []),
+    }
+
+
+def active_since(days: int) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(days=days)
+
+
+def filter_active(db: Session, score_map: Dict[int, float], active_within_days: Optional[int]) -> Dict[int, float]:
+    """Keep the vector hits whose tenant logged in within ``active_within_days``.
+
+    Checked in Postgres rather than in the vector store: a login does not
+    re-embed the tenant, so a copy stored with the vector would go stale.
+    """
+    if not active_within_days or not score_map:
+        return score_map
+    active = {
+        embedding_id for (embedding_id,) in
+        db.query(Tenant.embedding_id).filter(
+            Tenant.embedding_id.in_(list(score_map.keys())),
+            Tenant.last_login >= active_since(active_within_days),
+        )
+    }
+    return {embedding_id: score for embedding_id, score in score_map.items() if embedding_id in active}
+
+
+def fallback_insight(candidate: dict) -> str:
+    return f"Could not generate insight for {candidate['user_name']}."
+
+
+class DailyRecommendationService:
+    def __init__(self, count: int = None, active_days: int = None, max_age_days: int = None, batch_size: int = 100):
+        self.count = count or int(os.getenv("DAILY_RECOMMENDATIONS_COUNT", 10))
+        self.active_days = active_days or int(os.getenv("DAILY_RECOMMENDATIONS_ACTIVE_DAYS", 30))
+        # A feed older than this is not served: the tenant dropped out of the nightly run
+        self.max_age_days = max_age_days if max_age_days is not None else int(os.getenv("DAILY_RECOMMENDATIONS_MAX_AGE_DAYS", 1))
+        self.batch_size = batch_size
+        self.insight_cache = MatchInsightCache()
+        self.exclusions = ExclusionService()
+        self.compatibility = CompatibilityService()
+
+    def get_active_tenants(self, db: Session, after_id: str = None) -> List[Tenant]:
+        """Next batch of embedded tenants that logged in recently, walked by primary key."""
+        query = db.query(Tenant).filter(
+            Tenant.embedding_id.isnot(None),
+            Tenant.last_login >= active_since(self.active_days),
+        )
+        if after_id is not None:
+            query = query.filter(Tenant.id > after_id)
+        return query.order_by(Tenant.id).limit(self.batch_size).all()
+
+    def build_feed(self, db: Session, viewer: Tenant, vector_store, insights) -> int:
+        """Compute and store one tenant's feed, replacing the previous one. Returns the feed size."""
+        user_vector = vector_store.get_vector(viewer.embedding_id)
+        if user_vector is None:
+            return 0
+
+        exclude_ids = [viewer.embedding_id, *self.exclusions.get(db, viewer.id).tolist()]
+        similar_users = vector_store.search(user_vector, top_k=self.count * self.compatibility.overfetch, exclude_ids=exclude_ids)
+        score_map = self.compatibility.rerank(db, viewer, {user['id']: user['score'] for user in similar_users}, self.count)
+        tenants = (
+            db.query(Tenant)
+            .options(joinedload(Tenant.personal_info), joinedload(Tenant.interests_and_hobbies))
+            .filter(Tenant.embedding_id.in_(list(score_map.keys())), Tenant.id != viewer.id)
+            .all()
+        ) if score_map else []
+        tenants.sort(key=lambda tenant: score_map[tenant.embedding_id], reverse=True)
+        candidates = {tenant.id: candidate_fields(tenant, score_map[tenant.embedding_id]) for tenant in tenants}
+
+        cached = self.insight_cache.get_many(db, viewer, tenants, "")
+        missing = [candidate for tenant_id, candidate in candidates.items() if tenant_id not in cached]
+        generated: Dict[str, str] = {}
+        if missing:
+            try:
+                generated = insights.generate_insights("", missing)
+            except Exception as e:
+                logger.warning(f"Daily feed insights failed for tenant {viewer.id}: {e}")
+        ai_insights = {**cached, **generated}
+
+        feed_date = datetime.now(timezone.utc).date()
+        db.query(DailyRecommendation).filter(DailyRecommendation.tenant == viewer.id).delete(synchronize_session=False)
+        db.add_all([
+            DailyRecommendation(
+                tenant=viewer.id,
+                candidate=tenant.id,
+                rank=rank,
+                score=score_map[tenant.embedding_id],
+                ai_insight=ai_insights.get(tenant.id) or fallback_insight(candidates[tenant.id]),
+                feed_date=feed_date,
+            )
+            for rank, tenant in enumerate(tenants, start=1)
+        ])
+        db.commit()
+        if generated:
+            self.insight_cache.set_many(db, viewer, tenants, "", generated)
+        return len(tenants)
+
+    def generate_all(self, vector_store, insights) -> int:
+        """Rebuild the feed of every active tenant. A failing tenant does not stop the run."""
+        # Every tenant is re-ranked, so load the whole trait matrix once up front
+        self.compatibility.warm_up()
+        processed, after_id = 0, None
+        while True:
+            with SessionLocal(expire_on_commit=False) as db:
+                viewers = self.get_active_tenants(db, after_id)
+                if not viewers:
+                    break
+                for viewer in viewers:
+                    try:
+                        self.build_feed(db, viewer, vector_store, insights)
+                        processed += 1
+                    except Exception as e:
+                        db.rollback()
+                        logger.error(f"Failed to build daily feed for tenant {viewer.id}: {e}")
+                after_id = viewers[-1].id
+        # Feeds of tenants who are no longer active would never be served again
+        with SessionLocal() as db:
+            db.query(DailyRecommendation).filter(DailyRecommendation.feed_date < self.oldest_feed_date()).delete(synchronize_session=False)
+            db.commit()
+        return processed
+
+    def oldest_feed_date(self) -> date:
+        return datetime.now(timezone.utc).date() - timedelta(days=self.max_age_days)
+
+    def get_feed(self, db: Session, tenant_id: str) -> List[DailyRecommendation]:
+        """A tenant's latest feed in a single indexed query.
+
+        Empty when the feed is older than ``max_age_days``: a tenant who lapsed
+        out of the nightly run and came back is not shown an old feed, the
+        caller falls back to live matches instead. Profiles the tenant has decided on since the feed was built are left
+        out. ``ExclusionService.record`` also deletes their rows, but a nightly
+        build that read the exclusions before the decision writes them back.
+        """
+        decided = exists().where(
+            ProfileDecision.tenant == DailyRecommendation.tenant,
+            ProfileDecision.candidate == DailyRecommendation.candidate,
+        )
+        return (
+            db.query(DailyRecommendation)
+            .options(joinedload(DailyRecommendation.candidate_obj))
+            .filter(
+                DailyRecommendation.tenant == tenant_id,
+                DailyRecommendation.feed_date >= self.oldest_feed_date(),
+                ~decided,
+            )
+            .order_by(DailyRecommendation.rank)
+            .all()
+        )
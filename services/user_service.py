@@ -1,10 +1,30 @@
-from models.user import Tenant
+from models.user import Tenant, EMBEDDING_ID_SEQUENCE
 from sqlalchemy.orm import selectinload
-from sqlalchemy import func
+from sqlalchemy import func, or_, update, values, column, String, Integer
 from database.session import Session
-from typing import List
+from typing import Any, Callable, Dict, List
 from fastapi import HTTPException
 
+# Every relationship tenant_to_dict serializes, eager loaded for the embedding jobs
+PROFILE_RELATIONSHIPS = (
+    "profile_pictures",
+    "personal_info",
+    "big_five_traits",
+    "mbti_traits",
+    "psychology",
+    "interests_and_hobbies",
+    "values_beliefs_and_goals",
+    "favorites",
+    "relationship_preferences",
+    "friendship_preferences",
+    "collaboration_preferences",
+    "personal_free_form",
+    "intentions",
+    "aspiration_and_reflections",
+    "ideal_characteristics",
+)
+
+
 class UserService:
     def __init__(self):
         self.limit = 10
@@ -14,23 +34,7 @@ class UserService:
         with Session() as db:
             users = (
                 db.query(Tenant)
-                .options(
-                    selectinload(Tenant.profile_pictures),
-                    selectinload(Tenant.personal_info),
-                    selectinload(Tenant.big_five_traits),
-                    selectinload(Tenant.mbti_traits),
-                    selectinload(Tenant.psychology),
-                    selectinload(Tenant.interests_and_hobbies),
-                    selectinload(Tenant.values_beliefs_and_goals),
-                    selectinload(Tenant.favorites),
-                    selectinload(Tenant.relationship_preferences),
-                    selectinload(Tenant.friendship_preferences),
-                    selectinload(Tenant.collaboration_preferences),
-                    selectinload(Tenant.personal_free_form),
-                    selectinload(Tenant.intentions),
-                    selectinload(Tenant.aspiration_and_reflections),
-                    selectinload(Tenant.ideal_characteristics),
-                ) 
+                .options(*[selectinload(getattr(Tenant, name)) for name in PROFILE_RELATIONSHIPS])
                 .filter(Tenant.embedding_id.is_(None))
                 .limit(limit)
                 .offset(offset)
@@ -38,6 +42,135 @@ class UserService:
             )
             return users
 
+    def get_dirty_tenants(self, limit: int = 10) -> List[Tenant]:
+        """Tenants never embedded, or whose profile changed since their embedding was built."""
+        with Session() as db:
+            return (
+                db.query(Tenant)
+                .options(*[selectinload(getattr(Tenant, name)) for name in PROFILE_RELATIONSHIPS])
+                .filter(self._dirty_filter())
+                .order_by(Tenant.id)
+                .limit(limit)
+                .all()
+            )
+
+    def get_tenant_id_page(self, after_id: str = None, limit: int = 100, only_dirty: bool = True) -> List[str]:
+        """Next ``limit`` tenant ids after ``after_id`` in primary key order.
+
+        Keyset pagination: each page is an index range scan from the last id
+        seen, so page N costs the same as page 1, unlike ``OFFSET``, and rows
+        inserted or embedded meanwhile cannot shift later pages.
+        """
+        with Session() as db:
+            query = db.query(Tenant.id)
+            if after_id is not None:
+                query = query.filter(Tenant.id > after_id)
+            if only_dirty:
+                query = query.filter(self._dirty_filter())
+            return [id_ for (id_,) in query.order_by(Tenant.id).limit(limit)]
+
+    def get_tenants_by_ids(self, tenant_ids: List[str], only_dirty: bool = True) -> List[Tenant]:
+        """Profiles of ``tenant_ids``, optionally only those still needing an embedding."""
+        if not tenant_ids:
+            return []
+        with Session() as db:
+            query = (
+                db.query(Tenant)
+                .options(*[selectinload(getattr(Tenant, name)) for name in PROFILE_RELATIONSHIPS])
+                .filter(Tenant.id.in_(tenant_ids))
+            )
+            if only_dirty:
+                query = query.filter(self._dirty_filter())
+            return query.order_by(Tenant.id).all()
+
+    @staticmethod
+    def _dirty_filter():
+        return or_(
+            Tenant.embedding_id.is_(None),
+            Tenant.embedded_version.is_(None),
+            Tenant.embedded_version != Tenant.profile_version,
+        )
+
+    @staticmethod
+    def _embedded_update(rows: List[Dict[str, Any]]):
+        """Single ``UPDATE tenants ... FROM (VALUES ...)`` statement for ``mark_embedded``."""
+        data = values(
+            column("tenant_id", String),
+            column("embedding_id", Integer),
+            column("content_hash", String),
+            column("profile_version", Integer),
+            name="embedded",
+        ).data([(row["tenant_id"], row["embedding_id"], row["content_hash"], row["profile_version"]) for row in rows])
+        return (
+            update(Tenant)
+            .where(Tenant.id == data.c.tenant_id)
+            .values(
+                embedding_id=data.c.embedding_id,
+                embedding_hash=data.c.content_hash,
+                embedded_version=data.c.profile_version,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    def mark_embedded(self, rows: List[Dict[str, Any]], write_vectors: Callable[[], Any] = None):
+        """Record embedding bookkeeping for many tenants in one statement and transaction.
+
+        Each row has ``tenant_id``, ``embedding_id``, ``content_hash`` and the
+        ``profile_version`` that was read, not the current one, so an edit made
+        while embedding leaves the tenant dirty for the next run.
+
+        The update is only committed once ``write_vectors`` (the vector store
+        upsert) has succeeded; if it raises, nothing is written. If the commit
+        itself fails after the vectors were written, the tenants stay dirty and
+        the retry overwrites the same ids. Returns whatever ``write_vectors`` returned.
+        """
+        if not rows:
+            return write_vectors() if write_vectors else None
+        with Session() as db:
+            if db.get_bind().dialect.name == "postgresql":
+                db.execute(self._embedded_update(rows))
+            else:
+                # ORM bulk UPDATE by primary key, one executemany
+                db.execute(update(Tenant), [
+                    {
+                        "id": row["tenant_id"],
+                        "embedding_id": row["embedding_id"],
+                        "embedding_hash": row["content_hash"],
+                        "embedded_version": row["profile_version"],
+                    }
+                    for row in rows
+                ])
+            result = write_vectors() if write_vectors else None
+            db.commit()
+            return result
+
+    def reserve_embedding_ids(self, tenant_ids: List[str]) -> Dict[str, int]:
+        """Give every tenant without an embedding_id one, and return the ids of all ``tenant_ids``.
+
+        On Postgres the ids come from ``tenant_embedding_id_seq`` in a single
+        ``UPDATE ... WHERE embedding_id IS NULL``: a worker racing for the same
+        tenant re-checks the row after the first commit and keeps its id, so
+        any number of embedding workers can run at once. A reserved id stays
+        with the tenant even if embedding fails, so a retry replaces the same vector.
+        """
+        if not tenant_ids:
+            return {}
+        with Session() as db:
+            if db.get_bind().dialect.name == "postgresql":
+                db.execute(
+                    update(Tenant)
+                    .where(Tenant.id.in_(tenant_ids), Tenant.embedding_id.is_(None))
+                    .values(embedding_id=EMBEDDING_ID_SEQUENCE.next_value())
+                    .execution_options(synchronize_session=False)
+                )
+            else:
+                # No sequences (SQLite tests): count up from the current maximum
+                missing = [id_ for (id_,) in db.query(Tenant.id).filter(Tenant.id.in_(tenant_ids), Tenant.embedding_id.is_(None)).order_by(Tenant.id)]
+                start = (db.query(func.max(Tenant.embedding_id)).scalar() or 0) + 1
+                db.execute(update(Tenant), [{"id": id_, "embedding_id": start + i} for i, id_ in enumerate(missing)])
+            db.commit()
+            return dict(db.query(Tenant.id, Tenant.embedding_id).filter(Tenant.id.in_(tenant_ids)).all())
+
     def get_last_index(self):
         with Session() as db:
             # Get the maximum embedding_id value or 0 if no embeddings exist
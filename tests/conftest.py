@@ -2,14 +2,17 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
-from database import Base, get_db
-from main import app
+from database.session import Base, get_db
+import models.user, models.embeddings, models.recommendations
 
 # Use in-memory SQLite for tests
 SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///:memory:"
 engine = create_engine(
-    SQLALCHEMY_TEST_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_TEST_DATABASE_URL, connect_args={"check_same_thread": False},
+    # One shared connection: the app runs requests (and to_thread calls) on other threads
+    poolclass=StaticPool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -32,6 +35,8 @@ def db_session():
 # Override get_db dependency and provide a TestClient
 @pytest.fixture(scope="function")
 def client(db_session):
+    # Imported here so the database tests run without the app's optional dependencies
+    from main import app
     def override_get_db():
         yield db_session
     app.dependency_overrides[get_db] = override_get_db
@@ -0,0 +1,75 @@
+import pytest
+
+pytest.importorskip("langchain_google_genai")
+from langchain_core.prompts import ChatPromptTemplate
+import elinity_ai.insights._insights as insights_module
+from elinity_ai.insights import ElinityInsights
+from elinity_ai.insights._insights import BATCH_INSIGHT_PROMPT, BatchInsights, CandidateInsight
+
+
+class FakeStructuredLLM:
+    def __init__(self, response):
+        self.response = response
+        self.prompts = []
+
+    def invoke(self, messages):
+        self.prompts.append(messages[0].content)
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+
+def unavailable_prompt(name):
+    raise RuntimeError("LangSmith unreachable")
+
+
+def make_insights(monkeypatch, response, get_prompt=unavailable_prompt):
+    monkeypatch.setenv("LANGSMITH_API_KEY", "test-key")
+    monkeypatch.setattr(insights_module, "get_prompt", get_prompt)
+    llm = FakeStructuredLLM(response)
+    monkeypatch.setattr(ElinityInsights, "batch_llm", property(lambda self: llm))
+    return ElinityInsights(), llm
+
+
+def test_batch_insights_are_keyed_by_candidate_user_id(monkeypatch):
+    candidates = [
+        {"user_id": "u-1", "user_name": "Ann", "score": 0.91, "user_interests": "hiking"},
+        {"user_id": "u-2", "user_name": "Ben", "score": 0.84, "user_interests": "chess"},
+        {"user_id": "u-3", "user_name": "Cat", "score": 0.80, "user_interests": "jazz"},
+    ]
+    insights, llm = make_insights(monkeypatch, BatchInsights(insights=[
+        CandidateInsight(user_id="u-2", insight="You both think three moves ahead."),
+        CandidateInsight(user_id="u-1", insight="You both love trails."),
+        CandidateInsight(user_id="u-9", insight="Not a candidate."),
+        CandidateInsight(user_id="u-3", insight=""),
+    ]))
+
+    result = insights.generate_insights("outdoor friends", candidates)
+
+    # Order follows the model, ids the candidates; unknown and empty entries are dropped
+    assert result == {"u-1": "You both love trails.", "u-2": "You both think three moves ahead."}
+    assert len(llm.prompts) == 1
+    assert '"outdoor friends"' in llm.prompts[0] and '"user_id": "u-3"' in llm.prompts[0]
+
+
+def test_batch_insights_skip_the_llm_for_no_candidates_and_surface_errors(monkeypatch):
+    insights, llm = make_insights(monkeypatch, ValueError("quota exceeded"))
+    assert insights.generate_insights("", []) == {}
+    assert llm.prompts == []
+    with pytest.raises(RuntimeError, match="quota exceeded"):
+        insights.generate_insights("", [{"user_id": "u-1", "user_name": "Ann", "score": 0.9, "user_interests": ""}])
+
+
+def test_batch_insights_use_the_managed_prompt(monkeypatch):
+    pulled = []
+    managed = ChatPromptTemplate.from_template("Edited in LangSmith. Query: {query}\n{candidates}")
+    insights, llm = make_insights(
+        monkeypatch,
+        BatchInsights(insights=[CandidateInsight(user_id="u-1", insight="You both love trails.")]),
+        get_prompt=lambda name: pulled.append(name) or managed,
+    )
+
+    assert insights.generate_insights("hikers", [{"user_id": "u-1", "user_name": "Ann", "score": 0.9, "user_interests": "hiking"}]) == {"u-1": "You both love trails."}
+    assert pulled == ["match-insight-batch"]
+    assert "Edited in LangSmith. Query: hikers" in llm.prompts[0]
+    assert BATCH_INSIGHT_PROMPT.strip().splitlines()[0] not in llm.prompts[0]
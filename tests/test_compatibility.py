@@ -0,0 +1,115 @@
+import numpy as np
+from models.user import Tenant, BigFiveTraits, MBTITraits
+from services.compatibility_service import COLUMNS, IDEAL, MBTI, CompatibilityService, compatibility_scores
+
+
+def test_compatibility_scores_prefers_similar_traits():
+    viewer = np.full(len(COLUMNS), 0.5, dtype=np.float32)
+    candidates = np.stack([
+        np.full(len(COLUMNS), 0.5, dtype=np.float32),
+        np.full(len(COLUMNS), np.nan, dtype=np.float32),
+        np.where(np.arange(len(COLUMNS)) < 9, 1.0, 0.5).astype(np.float32),
+    ])
+    scores = compatibility_scores(viewer, candidates)
+    assert np.isnan(scores[1])
+    assert scores[0] > scores[2]
+    assert 0.0 <= scores[2] <= 1.0
+
+
+def test_rerank_blends_traits_into_vector_scores(db_session):
+    viewer = Tenant(email="rerank-viewer@example.com", password="x")
+    close = Tenant(email="rerank-close@example.com", password="x", embedding_id=9001)
+    far = Tenant(email="rerank-far@example.com", password="x", embedding_id=9002)
+    unknown = Tenant(email="rerank-unknown@example.com", password="x", embedding_id=9003)
+    db_session.add_all([viewer, close, far, unknown])
+    db_session.commit()
+    traits = dict(openness=0.8, conscientiousness=0.6, extraversion=0.3, agreeableness=0.7, neuroticism=0.2)
+    db_session.add_all([
+        BigFiveTraits(tenant=viewer.id, **traits),
+        BigFiveTraits(tenant=close.id, **traits),
+        BigFiveTraits(tenant=far.id, **{key: 1.0 - value for key, value in traits.items()}),
+    ])
+    db_session.commit()
+
+    service = CompatibilityService(blend=0.5)
+    ranked = service.rerank(db_session, viewer, {9002: 0.82, 9001: 0.80, 9003: 0.81}, top_k=2)
+    assert list(ranked) == [9001, 9003]
+    assert ranked[9003] == np.float32(0.81)
+
+
+def test_refresh_queries_outside_the_lock_and_overlaps_its_window(db_session):
+    import threading
+    from datetime import timedelta
+
+    tenant = Tenant(email="rerank-refresh@example.com", password="x", embedding_id=9011)
+    db_session.add(tenant)
+    db_session.commit()
+    db_session.add(BigFiveTraits(tenant=tenant.id, openness=0.1))
+    db_session.commit()
+
+    service = CompatibilityService()
+    service.load(db_session)
+    row = service._row_by_tenant[tenant.id]
+    assert service._matrix[row][0] == np.float32(0.1)
+
+    # Flushed just before the last refresh, committed after it
+    db_session.query(BigFiveTraits).filter(BigFiveTraits.tenant == tenant.id).update({"openness": 0.9})
+    tenant.updated_at = (service._last_refresh - timedelta(seconds=1)).replace(tzinfo=None)
+    db_session.commit()
+
+    lock_free_during_query = []
+    query = service._query
+
+    def observed_query(db):
+        def probe():
+            acquired = service._lock.acquire(timeout=1)
+            if acquired:
+                service._lock.release()
+            lock_free_during_query.append(acquired)
+
+        thread = threading.Thread(target=probe)
+        thread.start(); thread.join()
+        return query(db)
+
+    service._query = observed_query
+    service.refresh(db_session, force=True)
+    assert lock_free_during_query == [True]
+    assert service._matrix[row][0] == np.float32(0.9)
+
+
+def test_compatibility_scores_normalize_ten_point_traits():
+    viewer = np.full(len(COLUMNS), np.nan, dtype=np.float32)
+    viewer[MBTI] = 2.0
+    viewer[IDEAL] = [9, 8, 1, 1, 9, 2, 1, 8, 2]
+    similar, opposite = viewer.copy(), viewer.copy()
+    opposite[MBTI] = 9.0
+    opposite[IDEAL] = 10.0 - viewer[IDEAL]
+
+    scores = compatibility_scores(viewer, np.stack([opposite, similar]))
+    # Clipped to [0, 1] both candidates saturated to the same traits and tied
+    assert scores[1] > scores[0] + 0.3
+    assert np.isclose(scores[1], 1.0)
+
+
+def test_unfilled_sections_are_missing(db_session):
+    viewer = Tenant(email="rerank-scale-viewer@example.com", password="x")
+    similar = Tenant(email="rerank-scale-similar@example.com", password="x", embedding_id=9021)
+    opposite = Tenant(email="rerank-scale-opposite@example.com", password="x", embedding_id=9022)
+    blank = Tenant(email="rerank-scale-blank@example.com", password="x", embedding_id=9023)
+    db_session.add_all([viewer, similar, opposite, blank])
+    db_session.commit()
+    traits = dict(introversion=2.0, extraversion=7.5, agreeableness=6.0, neuroticism=1.5)
+    db_session.add_all([
+        MBTITraits(tenant=viewer.id, **traits),
+        MBTITraits(tenant=similar.id, **traits),
+        MBTITraits(tenant=opposite.id, **{key: 10.0 - value for key, value in traits.items()}),
+        # Created with the column defaults, never filled in
+        MBTITraits(tenant=blank.id),
+    ])
+    db_session.commit()
+
+    service = CompatibilityService(blend=0.5)
+    ranked = service.rerank(db_session, viewer, {9022: 0.82, 9023: 0.81, 9021: 0.80})
+    assert list(ranked) == [9021, 9023, 9022]
+    # The blank profile keeps its vector score instead of being compared to all zeros
+    assert ranked[9023] == np.float32(0.81)
@@ -0,0 +1,18 @@
+from models.user import Tenant
+from services.description_cache import ProfileDescriptionCache
+
+
+def test_description_cache_keyed_on_content_hash_and_prompt_version(db_session):
+    tenant = Tenant(email="described@example.com", password="x")
+    db_session.add(tenant)
+    db_session.commit()
+
+    cache = ProfileDescriptionCache()
+    cache.set_many(db_session, "v1", {tenant.id: "hash-a"}, {tenant.id: "Hi, I'm Ann."})
+    assert cache.get_many(db_session, "v1", {tenant.id: "hash-a"}) == {tenant.id: "Hi, I'm Ann."}
+    assert cache.get_many(db_session, "v2", {tenant.id: "hash-a"}) == {}
+    # Edited profile content invalidates the description
+    assert cache.get_many(db_session, "v1", {tenant.id: "hash-b"}) == {}
+
+    cache.set_many(db_session, "v1", {tenant.id: "hash-b"}, {tenant.id: "Hi, I'm Ann from Lisbon."})
+    assert cache.get_many(db_session, "v1", {tenant.id: "hash-b"}) == {tenant.id: "Hi, I'm Ann from Lisbon."}
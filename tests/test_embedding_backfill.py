@@ -0,0 +1,38 @@
+import services.embedding_backfill as embedding_backfill
+import services.user_service as user_service
+from models.user import Tenant
+from services.embedding_backfill import EmbeddingBackfillService
+
+
+def test_backfill_resumes_from_checkpoint(db_session, monkeypatch):
+    session_factory = lambda: type(db_session)(bind=db_session.get_bind())
+    monkeypatch.setattr(embedding_backfill, "Session", session_factory)
+    monkeypatch.setattr(user_service, "Session", session_factory)
+    # Only the tenants below still need an embedding
+    db_session.query(Tenant).update({Tenant.embedding_id: 0, Tenant.embedded_version: Tenant.profile_version})
+    tenants = [Tenant(id=f"backfill-{i:02d}", email=f"backfill{i}@example.com", password="x") for i in range(10)]
+    db_session.add_all(tenants)
+    db_session.commit()
+
+    service = EmbeddingBackfillService()
+    run = service.start(batch_size=3, window=1)
+    seen = []
+
+    def crash_on_third_batch(tenant_ids, force):
+        seen.append(tenant_ids)
+        if len(seen) == 3:
+            raise KeyboardInterrupt
+        return {"embedded": len(tenant_ids)}
+
+    try:
+        service.run_local(run.id, crash_on_third_batch)
+    except KeyboardInterrupt:
+        pass
+    run = service.get_run(run.id)
+    assert (run.status, run.last_tenant_id, run.processed) == ("failed", "backfill-05", 6)
+
+    # The unfinished batch is the first one processed again
+    service.resume(run.id)
+    run = service.run_local(run.id, lambda tenant_ids, force: seen.append(tenant_ids) or {"embedded": len(tenant_ids)})
+    assert seen[3][0] == "backfill-06"
+    assert (run.status, run.processed) == ("completed", 10)
@@ -0,0 +1,104 @@
+import asyncio
+import numpy as np
+from elinity_ai.embedding_service import EmbeddingBatcher
+
+
+class CountingEncoder:
+    """Deterministic stand-in for a SentenceTransformer that records batch sizes."""
+
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        self.batches.append(len(texts))
+        return np.array([[len(text), sum(map(ord, text))] for text in texts], dtype=np.float32)
+
+
+def test_concurrent_requests_share_one_batch():
+    encoder = CountingEncoder()
+    batcher = EmbeddingBatcher(encoder, max_batch_size=64, max_wait_ms=50)
+
+    async def run():
+        return await asyncio.gather(*(batcher.aencode(f"query {i % 10}") for i in range(40)))
+
+    vectors = asyncio.run(run())
+    batches = list(encoder.batches)
+    assert len(vectors) == 40
+    # 40 requests, 10 distinct texts, far fewer forward passes than requests
+    assert sum(batches) == 10
+    assert len(batches) < 40
+    np.testing.assert_array_equal(vectors[3], vectors[13])
+    np.testing.assert_array_equal(vectors[3], encoder.encode(["query 3"])[0])
+    assert batcher.encode("query 1").shape == (2,)
+
+
+def test_encode_errors_reach_every_caller():
+    class FailingEncoder:
+        def encode(self, texts, batch_size=32, convert_to_numpy=True):
+            raise ValueError("model unavailable")
+
+    batcher = EmbeddingBatcher(FailingEncoder(), max_wait_ms=1)
+    try:
+        batcher.encode("hello")
+    except ValueError as e:
+        assert "model unavailable" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_registry_builds_clients_once_per_process():
+    import multiprocessing as mp
+    from elinity_ai.embedding_service import get_client
+
+    built = []
+    client = get_client("test-registry-client", lambda: built.append(1) or object())
+    assert get_client("test-registry-client", object) is client
+    assert len(built) == 1
+
+    def child(results):
+        results.put(get_client("test-registry-client", lambda: "rebuilt") == "rebuilt")
+
+    ctx = mp.get_context("fork")
+    results = ctx.Queue()
+    process = ctx.Process(target=child, args=(results,))
+    process.start()
+    assert results.get(timeout=10) is True
+    process.join()
+
+
+def test_cancelled_request_does_not_stop_the_worker():
+    import threading
+
+    release = threading.Event()
+
+    class SlowEncoder(CountingEncoder):
+        def encode(self, texts, batch_size=32, convert_to_numpy=True):
+            release.wait(timeout=5)
+            self.texts.extend(texts)
+            return super().encode(texts, batch_size, convert_to_numpy)
+
+    encoder = SlowEncoder()
+    encoder.texts = []
+    batcher = EmbeddingBatcher(encoder, max_wait_ms=1)
+
+    async def cancel_while_queued():
+        # The first request occupies the worker, the second is cancelled while queued
+        busy = asyncio.ensure_future(batcher.aencode("first"))
+        await asyncio.sleep(0.05)
+        cancelled = asyncio.ensure_future(batcher.aencode("client went away"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        await busy
+        return cancelled
+
+    cancelled = asyncio.run(cancel_while_queued())
+    assert cancelled.cancelled()
+    assert batcher.submit("next query").result(timeout=2).shape == (2,)
+    assert "client went away" not in encoder.texts
+
+    # A worker that died anyway is restarted on the next request
+    batcher._thread = threading.Thread(target=lambda: None)
+    batcher._thread.start(); batcher._thread.join()
+    assert batcher.submit("after restart").result(timeout=2).shape == (2,)
@@ -0,0 +1,68 @@
+import re
+import threading
+
+import numpy as np
+
+import elinity_ai.embeddings._embeddings as embeddings_module
+from elinity_ai.embeddings import ElinityEmbedding
+
+
+class FakeBatcher:
+    def __init__(self, fail_batch=False):
+        self.fail_batch = fail_batch
+        self.batches = []
+
+    def encode(self, text):
+        if "unencodable" in text:
+            raise ValueError("cannot encode")
+        return np.array([len(text)], dtype=np.float32)
+
+    def encode_batch(self, texts):
+        self.batches.append(list(texts))
+        if self.fail_batch:
+            raise ValueError("batch failed")
+        return np.array([[len(text)] for text in texts], dtype=np.float32)
+
+
+class FakeGateway:
+    """Describes a profile only once ``parties`` calls are in flight together."""
+
+    def __init__(self, parties):
+        self.barrier = threading.Barrier(parties, timeout=5)
+
+    def generate(self, prompt, **kwargs):
+        self.barrier.wait()
+        name = re.search(r"'name': '(\w+)'", prompt).group(1)
+        if name == "Broken":
+            raise RuntimeError("LLM unavailable")
+        return f"Hi, I'm {name}"
+
+
+def make_embedding(monkeypatch, batcher, gateway, mode="llm"):
+    monkeypatch.setattr(embeddings_module, "get_sentence_model", lambda name: None)
+    monkeypatch.setattr(embeddings_module, "get_embedding_batcher", lambda name: batcher)
+    monkeypatch.setattr(embeddings_module, "get_llm_gateway", lambda: gateway)
+    return ElinityEmbedding(description_mode=mode)
+
+
+def test_create_embeddings_describes_concurrently_and_encodes_once(monkeypatch):
+    batcher = FakeBatcher()
+    # Sequential calls would break the barrier and fail every description
+    embedding = make_embedding(monkeypatch, batcher, FakeGateway(parties=3))
+    results = embedding.create_embeddings([{"name": "Ann"}, {"name": "Broken"}, {"name": "Bo"}], max_workers=3)
+
+    assert [text for text, _ in results] == ["Hi, I'm Ann", None, "Hi, I'm Bo"]
+    assert results[1] == (None, None)
+    # One forward pass for the described profiles, in input order
+    assert batcher.batches == [["Hi, I'm Ann", "Hi, I'm Bo"]]
+    assert [vector.tolist() for _, vector in (results[0], results[2])] == [[11.0], [10.0]]
+
+
+def test_create_embeddings_falls_back_to_per_text_encoding(monkeypatch):
+    batcher = FakeBatcher(fail_batch=True)
+    embedding = make_embedding(monkeypatch, batcher, gateway=None, mode="template")
+    results = embedding.create_embeddings(["first profile", "unencodable profile", "third"])
+
+    assert len(batcher.batches) == 1
+    assert results[1] == (None, None)
+    assert [(text, vector.tolist()) for text, vector in (results[0], results[2])] == [("first profile", [13.0]), ("third", [5.0])]
@@ -0,0 +1,121 @@
+import numpy as np
+from models.user import Tenant
+from models.recommendations import ProfileDecision
+from services.exclusion_service import ExclusionService
+from elinity_ai.vector_store import NumpyVectorStore
+from elinity_ai.vector_store._fields import normalize_filters, to_milvus_expr
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+
+def make_service():
+    service = ExclusionService()
+    service._redis = FakeRedis()
+    return service
+
+
+def add_tenants(db_session, prefix, embedding_ids):
+    tenants = [Tenant(email=f"{prefix}-{i}@example.com", password="x", embedding_id=e) for i, e in enumerate(embedding_ids)]
+    db_session.add_all(tenants)
+    db_session.commit()
+    return tenants
+
+
+def test_record_and_remove_refresh_the_cached_set(db_session):
+    service = make_service()
+    viewer, declined, matched = add_tenants(db_session, "exclusion-record", [None, 7101, 7102])
+
+    assert service.get(db_session, viewer.id).tolist() == []
+    service.record(db_session, viewer.id, declined.id, "declined")
+    service.record(db_session, viewer.id, matched.id, "archived")
+    # Changing a decision updates the row instead of adding one
+    row = service.record(db_session, viewer.id, matched.id, "matched")
+    assert row.decision == "matched"
+    assert db_session.query(ProfileDecision).filter(ProfileDecision.tenant == viewer.id).count() == 2
+
+    cached = service._redis.get(f"exclusions:{viewer.id}")
+    assert np.frombuffer(cached, dtype=np.uint32).tolist() == [7101, 7102]
+    assert service.get(db_session, viewer.id).tolist() == [7101, 7102]
+
+    assert service.remove(db_session, viewer.id, declined.id) is True
+    assert service.remove(db_session, viewer.id, declined.id) is False
+    assert service.get(db_session, viewer.id).tolist() == [7102]
+
+
+def test_first_embedding_id_invalidates_deciders_sets(db_session):
+    service = make_service()
+    viewer, candidate = add_tenants(db_session, "exclusion-new", [None, None])
+    service.record(db_session, viewer.id, candidate.id, "declined")
+    # Not embedded yet, so nothing to exclude
+    assert service.get(db_session, viewer.id).tolist() == []
+
+    candidate.embedding_id = 7201
+    db_session.commit()
+    service.invalidate_candidates(db_session, [candidate.id])
+    assert f"exclusions:{viewer.id}" not in service._redis.data
+    assert service.get(db_session, viewer.id).tolist() == [7201]
+
+
+def test_excluded_ids_are_applied_inside_the_search(db_session):
+    service = make_service()
+    viewer, declined = add_tenants(db_session, "exclusion-search", [7301, 7302])
+    service.record(db_session, viewer.id, declined.id, "declined")
+    exclude_ids = [viewer.embedding_id, *service.get(db_session, viewer.id).tolist()]
+
+    expr = to_milvus_expr(normalize_filters({"min_age": 25}), exclude_ids)
+    assert expr == "age >= 25 and id not in [7301, 7302]"
+
+    store = NumpyVectorStore(dim=4)
+    store.upsert([{"id": i, "vector": np.ones(4) + i * 0.01} for i in (7301, 7302, 7303)])
+    results = store.search(np.ones(4), top_k=3, exclude_ids=exclude_ids)
+    assert [r["id"] for r in results] == [7303]
+
+
+def test_decision_endpoints_exclude_from_search(client, db_session, monkeypatch):
+    from api.routers import recommendations
+    from main import app
+    from utils.token import get_current_user
+
+    viewer, candidate = add_tenants(db_session, "exclusion-api", [7401, 7402])
+    app.dependency_overrides[get_current_user] = lambda: viewer
+    monkeypatch.setattr(recommendations.exclusions, "_redis", FakeRedis())
+
+    searches = []
+
+    class FakeQueryEmbedding:
+        async def acreate_embedding(self, query):
+            return np.ones(4)
+
+    class FakeVectorStore:
+        async def asearch(self, vector, top_k, exclude_ids=None, filters=None):
+            searches.append({"exclude_ids": list(exclude_ids), "filters": filters})
+            return []
+
+    monkeypatch.setattr(recommendations, "get_query_embedding", lambda: FakeQueryEmbedding())
+    monkeypatch.setattr(recommendations, "get_vector_store", lambda: FakeVectorStore())
+
+    res = client.post("/recommendations/decisions", json={"candidate_id": candidate.id, "decision": "declined"})
+    assert res.status_code == 201
+    assert res.json()["decision"] == "declined"
+    assert client.post("/recommendations/decisions", json={"candidate_id": viewer.id, "decision": "declined"}).status_code == 400
+
+    assert client.get("/recommendations/search", params={"query": "hiking", "min_age": 25}).json() == []
+    assert searches[-1]["exclude_ids"] == [7401, 7402]
+    assert searches[-1]["filters"]["min_age"] == 25
+
+    assert client.delete(f"/recommendations/decisions/{candidate.id}").status_code == 204
+    assert client.delete(f"/recommendations/decisions/{candidate.id}").status_code == 404
+    client.get("/recommendations/search", params={"query": "hiking"})
+    assert searches[-1]["exclude_ids"] == [7401]
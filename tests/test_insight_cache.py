@@ -0,0 +1,20 @@
+from models.user import Tenant, PersonalInfo
+from services.insight_cache import MatchInsightCache
+
+
+def test_insight_cache_invalidates_on_profile_change(db_session):
+    viewer = Tenant(email="viewer@example.com", password="x")
+    candidate = Tenant(email="candidate@example.com", password="x")
+    db_session.add_all([viewer, candidate])
+    db_session.commit()
+
+    cache = MatchInsightCache()
+    cache.set_many(db_session, viewer, [candidate], "hiking", {candidate.id: "You both love trails."})
+    assert cache.get_many(db_session, viewer, [candidate], "hiking") == {candidate.id: "You both love trails."}
+    assert cache.get_many(db_session, viewer, [candidate], "startup cofounder") == {}
+
+    # Editing any profile section bumps profile_version and invalidates the cached insight
+    db_session.add(PersonalInfo(tenant=candidate.id, first_name="Casey"))
+    db_session.commit()
+    assert candidate.profile_version == 1
+    assert cache.get_many(db_session, viewer, [candidate], "hiking") == {}
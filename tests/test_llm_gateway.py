@@ -0,0 +1,37 @@
+import pytest
+
+pytest.importorskip("google.generativeai")
+from google.api_core import exceptions as google_exceptions
+from elinity_ai.llm_gateway import LLMGateway
+import elinity_ai.llm_gateway._gateway as gateway_module
+
+
+def test_gateway_retries_transient_errors_only(monkeypatch):
+    monkeypatch.setattr(gateway_module.time, "sleep", lambda seconds: None)
+    gateway = LLMGateway(api_key="test-key", max_retries=2)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise google_exceptions.ServiceUnavailable("busy")
+        return "ok"
+
+    assert gateway.call(flaky) == "ok"
+    assert len(calls) == 3
+
+    def bad_request():
+        calls.append(1)
+        raise google_exceptions.InvalidArgument("bad prompt")
+
+    calls.clear()
+    with pytest.raises(google_exceptions.InvalidArgument):
+        gateway.call(bad_request)
+    assert len(calls) == 1
+
+
+def test_gateway_shares_models_per_configuration():
+    gateway = LLMGateway(api_key="test-key")
+    config = {"generation_config": {"temperature": 0.7}}
+    assert gateway.model("gemini-2.0-flash", **config) is gateway.model("gemini-2.0-flash", **config)
+    assert gateway.model("gemini-2.0-flash") is not gateway.model("gemini-2.0-flash", **config)
@@ -0,0 +1,35 @@
+import asyncio
+import pytest
+
+pytest.importorskip("google.generativeai")
+import elinity_ai.onboarding_conversation._onboarding_conversation as onboarding
+
+
+class FakeGateway:
+    def model(self, name, **config):
+        return self
+
+    def start_chat(self, history):
+        return object()
+
+    def send_message(self, chat, content):
+        return "Nice to meet you! What do you enjoy doing on weekends?"
+
+    async def asend_message(self, chat, content):
+        return self.send_message(chat, content)
+
+
+def test_each_turn_is_recorded_once_with_its_role(monkeypatch):
+    monkeypatch.setattr(onboarding, "get_llm_gateway", lambda: FakeGateway())
+    conversation = onboarding.ElinityOnboardingConversation()
+
+    reply = conversation.get_next_prompt("I'm Sam, I love climbing.")
+    areply = asyncio.run(conversation.aget_next_prompt("Mostly bouldering."))
+
+    assert reply == areply
+    assert [(chat.role, chat.content) for chat in conversation.conversation_history[1:]] == [
+        ("user", "I'm Sam, I love climbing."),
+        ("system", reply),
+        ("user", "Mostly bouldering."),
+        ("system", reply),
+    ]
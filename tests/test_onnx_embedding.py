@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("onnxruntime")
+pytest.importorskip("optimum")
+
+from elinity_ai.embedding_service import DEFAULT_MODEL, get_sentence_model
+
+SENTENCES = [
+    "Hi, I'm Maya, a product designer who spends weekends hiking and painting.",
+    "Looking for a co-founder with backend experience for a climate startup.",
+    "I love jazz, board games and long conversations over coffee.",
+    "hiking partner in berlin",
+    "someone who enjoys cooking and travel",
+]
+
+
+def _normalized(vectors):
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("backend", ["onnx", "onnx-int8"])
+def test_onnx_backend_matches_pytorch(backend):
+    reference = _normalized(get_sentence_model(DEFAULT_MODEL, "torch").encode(SENTENCES, convert_to_numpy=True))
+    candidate = _normalized(get_sentence_model(DEFAULT_MODEL, backend).encode(SENTENCES, convert_to_numpy=True))
+
+    # Same vector space: each sentence lands next to its PyTorch embedding
+    cosine = np.sum(reference * candidate, axis=1)
+    assert cosine.min() > (0.999 if backend == "onnx" else 0.98)
+    # and pairwise similarities, which drive ranking, barely move
+    assert np.abs(reference @ reference.T - candidate @ candidate.T).max() < 0.05
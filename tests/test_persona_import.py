@@ -0,0 +1,19 @@
+import json
+import os
+
+from elinity_ai.embeddings import iter_json_records
+
+PERSONAS = os.path.join(os.path.dirname(__file__), "..", "scripts", "data", "personas.json")
+
+
+def test_iter_json_records_streams_the_whole_array():
+    with open(PERSONAS, encoding="utf-8") as f:
+        expected = json.load(f)
+    # Chunks far smaller than one record exercise records split across reads
+    assert list(iter_json_records(PERSONAS, chunk_size=257)) == expected
+
+
+def test_iter_json_records_reads_json_lines(tmp_path):
+    path = tmp_path / "personas.jsonl"
+    path.write_text('{"id": "a"}\n\n{"id": "b"}\n', encoding="utf-8")
+    assert [record["id"] for record in iter_json_records(str(path))] == ["a", "b"]
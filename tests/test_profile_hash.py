@@ -0,0 +1,24 @@
+from services.model_converter import profile_content_hash
+
+
+def test_profile_hash_ignores_bookkeeping_and_key_order():
+    profile = {
+        "id": "t1",
+        "email": "ann@example.com",
+        "profile_version": 3,
+        "updated_at": "2026-01-01T00:00:00",
+        "personal_info": {"id": "p1", "tenant": "t1", "first_name": "Ann", "location": "Berlin"},
+        "interests_and_hobbies": {"interests": ["climbing", "jazz"]},
+    }
+    same_content = {
+        "interests_and_hobbies": {"interests": ["climbing", "jazz"]},
+        "personal_info": {"location": "Berlin", "first_name": "Ann", "id": "p2"},
+        "id": "t1",
+        "profile_version": 9,
+        "embedding_hash": "abc",
+        "last_login": "2026-02-01T00:00:00",
+    }
+    assert profile_content_hash(profile) == profile_content_hash(same_content)
+
+    edited = {**profile, "personal_info": {**profile["personal_info"], "location": "Lisbon"}}
+    assert profile_content_hash(edited) != profile_content_hash(profile)
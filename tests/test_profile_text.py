@@ -0,0 +1,18 @@
+from elinity_ai.embeddings import profile_text
+
+
+def test_profile_text_is_deterministic_and_skips_missing_sections():
+    profile = {
+        "personal_info": {"first_name": "Ann", "age": 31, "location": "Berlin"},
+        "interests_and_hobbies": {"interests": ["climbing", "jazz"], "hobbies": None},
+        "favorites": None,
+        "big_five_traits": {"openness": 0.9, "neuroticism": 0.1, "agreeableness": 0.5},
+        "ideal_characteristics": {"funny": 0.8, "reliable": 0.2},
+    }
+    text = profile_text(profile)
+    assert text == (
+        "First name: Ann. Age: 31. Location: Berlin. Interests: climbing, jazz. "
+        "Personality traits: High openness, Low neuroticism. Values in others: funny"
+    )
+    assert profile_text(dict(reversed(list(profile.items())))) == text
+    assert profile_text({}) == ""
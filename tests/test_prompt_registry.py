@@ -0,0 +1,59 @@
+import time
+from langchain_core.prompts import PromptTemplate
+from elinity_ai.prompt_registry import PromptRegistry
+
+
+class FakeClient:
+    def __init__(self):
+        self.version = "v1"
+        self.pulls = 0
+        self.down = False
+
+    def pull_prompt(self, name):
+        self.pulls += 1
+        if self.down:
+            raise ConnectionError("LangSmith unavailable")
+        return PromptTemplate.from_template(f"{name} {self.version} {{topic}}")
+
+
+def make_registry(tmp_path, client, ttl=300):
+    registry = PromptRegistry(ttl=ttl, cache_dir=str(tmp_path))
+    registry._client = client
+    return registry
+
+
+def test_prompts_are_served_from_memory_and_refreshed_after_ttl(tmp_path):
+    client = FakeClient()
+    registry = make_registry(tmp_path, client, ttl=0.05)
+    assert registry.warm_up(["greeting"]) == []
+    registry.get("greeting")
+    assert client.pulls == 1
+
+    client.version = "v2"
+    time.sleep(0.1)
+    # Stale: the old version is served while a refresh runs in the background
+    assert "v1" in registry.get("greeting").template
+    for _ in range(50):
+        if "v2" in registry.get("greeting").template:
+            break
+        time.sleep(0.01)
+    assert registry.get("greeting").format(topic="x") == "greeting v2 x"
+
+
+def test_cold_start_falls_back_to_last_known_good_copy(tmp_path):
+    make_registry(tmp_path, FakeClient()).get("greeting")
+
+    client = FakeClient()
+    client.down = True
+    registry = make_registry(tmp_path, client)
+    assert registry.warm_up(["greeting", "missing"]) == ["missing"]
+    assert registry.get("greeting").format(topic="x") == "greeting v1 x"
+
+
+def test_registry_without_api_key_serves_saved_copies(tmp_path, monkeypatch):
+    make_registry(tmp_path, FakeClient()).get("greeting")
+
+    monkeypatch.delenv("LANGSMITH_API_KEY", raising=False)
+    registry = PromptRegistry(cache_dir=str(tmp_path))
+    assert registry.client is None
+    assert registry.get("greeting").format(topic="x") == "greeting v1 x"
@@ -0,0 +1,68 @@
+import numpy as np
+import redis
+from elinity_ai.milvus_db import QueryEmbeddingCache, normalize_query
+
+
+class FakeRedis:
+    """Shared between caches, like the Redis every API worker talks to."""
+
+    def __init__(self):
+        self.data = {}
+        self.down = False
+
+    def get(self, key):
+        if self.down:
+            raise redis.ConnectionError("redis unavailable")
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        if self.down:
+            raise redis.ConnectionError("redis unavailable")
+        self.data[key] = value
+
+
+def make_cache(shared=None, maxsize=2):
+    cache = QueryEmbeddingCache("test-model", maxsize=maxsize)
+    cache._redis = shared
+    return cache
+
+
+def test_normalize_query_folds_case_width_and_whitespace():
+    assert normalize_query("  Hiking\tBuddies \n in  BERLIN ") == "hiking buddies in berlin"
+    assert normalize_query("ｈｉｋｉｎｇ") == "hiking"
+    assert normalize_query(None) == ""
+
+
+def test_lru_evicts_least_recently_used():
+    cache = make_cache(maxsize=2)
+    cache.set("a", [1.0, 0.0])
+    cache.set("b", [0.0, 1.0])
+    assert cache.get("a") is not None
+    cache.set("c", [1.0, 1.0])
+    assert cache.get("b") is None
+    assert cache.get("a").dtype == np.float32
+    stats = cache.stats()
+    assert stats["lru_size"] == 2
+    assert stats["lru_hits"] == 2 and stats["misses"] == 1
+
+
+def test_redis_shares_vectors_between_workers_and_is_optional():
+    shared = FakeRedis()
+    vector = np.array([0.25, -1.5, 3.0], dtype=np.float32)
+    make_cache(shared).set("hiking", vector)
+
+    other_worker = make_cache(shared)
+    np.testing.assert_array_equal(other_worker.get("hiking"), vector)
+    assert other_worker.stats()["redis_hits"] == 1
+    # Now in the worker's LRU as well
+    other_worker.get("hiking")
+    assert other_worker.stats()["lru_hits"] == 1
+
+    # The model name is part of the key: another model never reads these vectors
+    assert QueryEmbeddingCache("other-model")._key("hiking") != other_worker._key("hiking")
+
+    shared.down = True
+    degraded = make_cache(shared)
+    degraded.set("chess", [1.0])
+    np.testing.assert_array_equal(degraded.get("chess"), [1.0])
+    assert degraded.get("hiking") is None
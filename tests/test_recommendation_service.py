@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta, timezone
+from models.user import Tenant
+from models.recommendations import DailyRecommendation, ProfileDecision
+from services.exclusion_service import ExclusionService
+from services.recommendation_service import DailyRecommendationService, filter_active
+
+
+def test_recency_is_checked_against_the_current_last_login(db_session):
+    now = datetime.now(timezone.utc)
+    daily, lapsed, never = (
+        Tenant(email="active-daily@example.com", password="x", embedding_id=7501, last_login=now - timedelta(days=40)),
+        Tenant(email="active-lapsed@example.com", password="x", embedding_id=7502, last_login=now - timedelta(days=40)),
+        Tenant(email="active-never@example.com", password="x", embedding_id=7503),
+    )
+    db_session.add_all([daily, lapsed, never])
+    db_session.commit()
+    score_map = {7501: 0.9, 7502: 0.8, 7503: 0.7}
+    assert filter_active(db_session, score_map, None) == score_map
+
+    # Both were embedded 40 days ago; logging in since does not re-embed
+    daily.last_login = now
+    db_session.commit()
+    assert filter_active(db_session, score_map, 7) == {7501: 0.9}
+
+
+def test_daily_feed_leaves_out_decided_profiles(db_session):
+    viewer, kept, declined, raced = (
+        Tenant(email="feed-viewer@example.com", password="x"),
+        Tenant(email="feed-kept@example.com", password="x"),
+        Tenant(email="feed-declined@example.com", password="x"),
+        Tenant(email="feed-raced@example.com", password="x"),
+    )
+    db_session.add_all([viewer, kept, declined, raced])
+    db_session.commit()
+    today = datetime.now(timezone.utc).date()
+    db_session.add_all([
+        DailyRecommendation(tenant=viewer.id, candidate=candidate.id, rank=rank, score=0.9, feed_date=today)
+        for rank, candidate in enumerate((kept, declined, raced), start=1)
+    ])
+    db_session.commit()
+
+    ExclusionService().record(db_session, viewer.id, declined.id, "declined")
+    # Decided while the nightly build was writing the feed: its row is still there
+    db_session.add(ProfileDecision(tenant=viewer.id, candidate=raced.id, decision="archived"))
+    db_session.commit()
+
+    feed = DailyRecommendationService().get_feed(db_session, viewer.id)
+    assert [item.candidate for item in feed] == [kept.id]
+
+
+def test_stale_daily_feed_falls_back_to_live_matches(client, db_session, monkeypatch):
+    from api.routers import recommendations
+    from main import app
+    from utils.token import get_current_user
+
+    viewer = Tenant(email="feed-returning@example.com", password="x", embedding_id=7700)
+    old_match, live_match = (
+        Tenant(email="feed-old-match@example.com", password="x", embedding_id=7701),
+        Tenant(email="feed-live-match@example.com", password="x", embedding_id=7702),
+    )
+    db_session.add_all([viewer, old_match, live_match])
+    db_session.commit()
+    # Built before the viewer lapsed out of the nightly run
+    db_session.add(DailyRecommendation(
+        tenant=viewer.id, candidate=old_match.id, rank=1, score=0.9, ai_insight="Old insight.",
+        feed_date=datetime.now(timezone.utc).date() - timedelta(days=20),
+    ))
+    db_session.commit()
+    assert DailyRecommendationService().get_feed(db_session, viewer.id) == []
+
+    async def fake_profile_matches(db, current_user, filters, top_k=5):
+        return {7702: 0.8}
+
+    async def fake_insights(candidates, query):
+        return {candidate["user_id"]: "Live insight." for candidate in candidates}
+
+    app.dependency_overrides[get_current_user] = lambda: viewer
+    monkeypatch.setattr(recommendations, "profile_matches", fake_profile_matches)
+    monkeypatch.setattr(recommendations, "generate_insights", fake_insights)
+    res = client.get("/recommendations/daily")
+    assert res.status_code == 200
+    assert [(item["tenant"]["id"], item["ai_insight"]) for item in res.json()] == [(live_match.id, "Live insight.")]
+
+
+def test_recency_filter_pages_on_until_enough_active_matches(db_session, monkeypatch):
+    import asyncio
+    import numpy as np
+    from api.routers import recommendations
+    from elinity_ai.vector_store import NumpyVectorStore
+    from schemas.recommendations import RecommendationFilters
+
+    now = datetime.now(timezone.utc)
+    # The 20 closest matches have not logged in for months, the next 3 did today
+    tenants = [
+        Tenant(email=f"paging-{i}@example.com", password="x", embedding_id=7800 + i,
+               last_login=now if 20 <= i < 23 else now - timedelta(days=90))
+        for i in range(30)
+    ]
+    db_session.add_all(tenants)
+    db_session.commit()
+    store = NumpyVectorStore(dim=2)
+    store.upsert([{"id": 7800 + i, "vector": [1.0, i / 10]} for i in range(30)])
+    monkeypatch.setattr(recommendations, "get_vector_store", lambda: store)
+    monkeypatch.setattr(recommendations.compatibility, "overfetch", 3)
+
+    score_map = asyncio.run(recommendations.search_candidates(
+        db_session, np.array([1.0, 0.0]), 1, [], RecommendationFilters(active_within_days=7)
+    ))
+    assert sorted(score_map) == [7820, 7821, 7822]
@@ -0,0 +1,53 @@
+import json
+from models.user import Tenant
+from services.insight_cache import MatchInsightCache
+
+
+def test_search_stream_is_ndjson_cards_then_insights_then_done(client, db_session, monkeypatch):
+    from api.routers import recommendations
+    from main import app
+    from utils.token import get_current_user
+
+    viewer = Tenant(email="stream-viewer@example.com", password="x", embedding_id=7600)
+    best, cached, failing = (
+        Tenant(email=f"stream-{name}@example.com", password="x", embedding_id=embedding_id)
+        for name, embedding_id in (("best", 7601), ("cached", 7602), ("failing", 7603))
+    )
+    db_session.add_all([viewer, best, cached, failing])
+    db_session.commit()
+    MatchInsightCache().set_many(db_session, viewer, [cached], "climbing partner", {cached.id: "Cached insight."})
+    app.dependency_overrides[get_current_user] = lambda: viewer
+
+    async def fake_search(db, current_user, query, filters):
+        return {7601: 0.93, 7602: 0.88, 7603: 0.71}
+
+    async def fake_insight(candidate, query):
+        return "Fresh insight." if candidate["user_id"] == best.id else None
+
+    saved = []
+    monkeypatch.setattr(recommendations, "search_matches", fake_search)
+    monkeypatch.setattr(recommendations, "generate_insight", fake_insight)
+    monkeypatch.setattr(recommendations, "_cache_insights", lambda *args: saved.append(args[-1]))
+
+    res = client.get("/recommendations/search/stream", params={"query": "  Climbing   partner"})
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    assert res.text.endswith("\n")
+    events = [json.loads(line) for line in res.text.splitlines()]
+
+    # Ranked cards first, cached insights filled in, the rest null
+    assert events[0]["type"] == "recommendations"
+    cards = events[0]["results"]
+    assert [card["tenant"]["id"] for card in cards] == [best.id, cached.id, failing.id]
+    assert [card["ai_insight"] for card in cards] == [None, "Cached insight.", None]
+
+    # One insight event per uncached tenant, a fallback when generation failed, then done
+    insights = {event["tenant_id"]: event["ai_insight"] for event in events[1:-1]}
+    assert all(event["type"] == "insight" for event in events[1:-1])
+    assert insights[best.id] == "Fresh insight."
+    assert insights[failing.id].startswith("Could not generate insight")
+    assert set(insights) == {best.id, failing.id}
+    assert events[-1] == {"type": "done"}
+
+    # Only generated insights are cached, after the stream
+    assert saved == [{best.id: "Fresh insight."}]
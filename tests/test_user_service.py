@@ -0,0 +1,119 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import services.user_service as user_service
+from models.user import Tenant
+from services.user_service import UserService
+
+
+@pytest.fixture
+def service(db_session, monkeypatch):
+    monkeypatch.setattr(user_service, "Session", lambda: type(db_session)(bind=db_session.get_bind()))
+    return UserService()
+
+
+def add_tenants(db_session, prefix, count):
+    tenants = [Tenant(id=f"{prefix}-{i:02d}", email=f"{prefix}{i}@example.com", password="x") for i in range(count)]
+    db_session.add_all(tenants)
+    db_session.commit()
+    return tenants
+
+
+def test_embedded_update_is_one_update_from_values():
+    rows = [
+        {"tenant_id": "a", "embedding_id": 1, "content_hash": "hash-a", "profile_version": 2},
+        {"tenant_id": "b", "embedding_id": 7, "content_hash": "hash-b", "profile_version": 5},
+    ]
+    compiled = UserService._embedded_update(rows).compile(dialect=postgresql.dialect())
+    sql = " ".join(str(compiled).split())
+
+    assert sql.startswith("UPDATE tenants SET ")
+    assert "FROM (VALUES (" in sql
+    assert "AS embedded (tenant_id, embedding_id, content_hash, profile_version)" in sql
+    assert sql.endswith("WHERE tenants.id = embedded.tenant_id")
+    assert list(compiled.params.values()) == ["a", 1, "hash-a", 2, "b", 7, "hash-b", 5]
+
+
+def test_mark_embedded_commits_only_after_vectors_written(db_session, service):
+    add_tenants(db_session, "marked", 2)
+    rows = [
+        {"tenant_id": f"marked-{i:02d}", "embedding_id": 100 + i, "content_hash": f"hash-{i}", "profile_version": 3}
+        for i in range(2)
+    ]
+
+    def failing_upsert():
+        raise RuntimeError("vector store down")
+
+    with pytest.raises(RuntimeError):
+        service.mark_embedded(rows, write_vectors=failing_upsert)
+    db_session.expire_all()
+    assert [t.embedding_id for t in db_session.query(Tenant).filter(Tenant.id.like("marked-%"))] == [None, None]
+
+    assert service.mark_embedded(rows, write_vectors=lambda: 2) == 2
+    db_session.expire_all()
+    stored = db_session.query(Tenant).filter(Tenant.id.like("marked-%")).order_by(Tenant.id)
+    assert [(t.embedding_id, t.embedding_hash, t.embedded_version) for t in stored] == [(100, "hash-0", 3), (101, "hash-1", 3)]
+
+
+def test_tenant_id_page_walks_by_primary_key(db_session, service):
+    # Only the tenants below still need an embedding
+    db_session.query(Tenant).update({Tenant.embedding_id: 0, Tenant.embedded_version: Tenant.profile_version})
+    db_session.commit()
+    add_tenants(db_session, "page", 5)
+
+    first = service.get_tenant_id_page(limit=2)
+    assert first == ["page-00", "page-01"]
+    # A tenant embedded meanwhile does not shift the next page
+    db_session.query(Tenant).filter(Tenant.id == "page-00").update({Tenant.embedding_id: 1, Tenant.embedded_version: Tenant.profile_version})
+    db_session.commit()
+    assert service.get_tenant_id_page(first[-1], limit=2) == ["page-02", "page-03"]
+    assert service.get_tenant_id_page("page-03", limit=2) == ["page-04"]
+    assert service.get_tenant_id_page("page-00", limit=4, only_dirty=False) == ["page-01", "page-02", "page-03", "page-04"]
+
+
+def test_reserve_embedding_ids_keeps_existing_ids(db_session, service):
+    tenants = add_tenants(db_session, "reserve", 3)
+    tenants[1].embedding_id = 5000
+    db_session.commit()
+
+    ids = service.reserve_embedding_ids([t.id for t in tenants])
+    assert ids["reserve-01"] == 5000
+    assert len(set(ids.values())) == 3
+    assert min(ids["reserve-00"], ids["reserve-02"]) > 5000
+    # Already reserved: a second call (a retry, or a racing worker) gets the same ids
+    assert service.reserve_embedding_ids([t.id for t in tenants]) == ids
+
+
+def test_reserve_embedding_ids_uses_the_sequence_on_postgres(db_session, service, monkeypatch):
+    statements = []
+
+    class PostgresSession:
+        def __init__(self):
+            self.session = type(db_session)(bind=db_session.get_bind())
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self.session.close()
+
+        def get_bind(self):
+            return type("Bind", (), {"dialect": postgresql.dialect()})()
+
+        def execute(self, statement, *args):
+            statements.append(statement)
+
+        def commit(self):
+            pass
+
+        def query(self, *entities):
+            return self.session.query(*entities)
+
+    monkeypatch.setattr(user_service, "Session", PostgresSession)
+    service.reserve_embedding_ids(["pg-00"])
+
+    sql = " ".join(str(statements[0].compile(dialect=postgresql.dialect())).split())
+    assert sql == (
+        "UPDATE tenants SET embedding_id=nextval('tenant_embedding_id_seq') "
+        "WHERE tenants.id IN (__[POSTCOMPILE_id_1]) AND tenants.embedding_id IS NULL"
+    )
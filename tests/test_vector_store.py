@@ -0,0 +1,194 @@
+import numpy as np
+from elinity_ai.vector_store import NumpyVectorStore
+
+
+def _records(n, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{"id": i, "vector": rng.normal(size=dim), "bio": f"tenant {i}"} for i in range(1, n + 1)]
+
+
+def test_numpy_store_search_matches_brute_force():
+    dim = 16
+    records = _records(200, dim)
+    store = NumpyVectorStore(dim=dim)
+    assert store.upsert(records) == 200
+
+    query = records[10]["vector"]
+    results = store.search(query, top_k=5)
+    assert results[0]["id"] == 11
+    assert results[0]["metadata"] == {"bio": "tenant 11"}
+
+    matrix = np.array([r["vector"] for r in records])
+    expected = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query))
+    assert [r["id"] for r in results] == [int(i) + 1 for i in np.argsort(-expected)[:5]]
+
+
+def test_numpy_store_exclude_upsert_and_delete():
+    dim = 8
+    store = NumpyVectorStore(dim=dim)
+    store.upsert(_records(10, dim))
+
+    query = store.get_vector(3)
+    assert all(r["id"] != 3 for r in store.search(query, top_k=10, exclude_ids=[3]))
+
+    # Re-upserting an id replaces the vector instead of adding a row
+    store.upsert([{"id": 3, "vector": np.ones(dim)}])
+    assert store.count() == 10
+    assert np.allclose(store.get_vector(3), np.ones(dim) / np.sqrt(dim))
+
+    assert store.delete([3, 42]) == 1
+    assert store.get_vector(3) is None
+    assert store.count() == 9
+
+
+def test_numpy_store_persists_and_memory_maps(tmp_path):
+    dim = 8
+    store = NumpyVectorStore(path=str(tmp_path), dim=dim)
+    store.upsert(_records(20, dim))
+    store.flush()
+
+    reopened = NumpyVectorStore(path=str(tmp_path), dim=dim)
+    assert isinstance(reopened._vectors, np.memmap)
+    assert reopened.count() == 20
+    assert reopened.search(store.get_vector(7), top_k=1)[0]["id"] == 7
+
+
+def test_numpy_store_concurrent_writers_keep_each_others_rows(tmp_path):
+    dim = 8
+    records = _records(12, dim)
+    # Two processes with the same snapshot loaded
+    first = NumpyVectorStore(path=str(tmp_path), dim=dim)
+    second = NumpyVectorStore(path=str(tmp_path), dim=dim)
+    first.upsert(records[:6])
+    second.upsert(records[6:])
+    second.delete([12])
+    first.flush()
+    # Picking up first's snapshot keeps second's unflushed writes
+    assert second.count() == 11
+    second.flush()
+
+    reopened = NumpyVectorStore(path=str(tmp_path), dim=dim)
+    assert sorted(int(i) for i in reopened._ids) == list(range(1, 12))
+    assert reopened.search(records[3]["vector"], top_k=1)[0]["metadata"]["bio"] == "tenant 4"
+    assert first.count() == 11
+
+
+def test_numpy_store_publishes_whole_snapshots(tmp_path):
+    dim = 8
+    store = NumpyVectorStore(path=str(tmp_path), dim=dim, quantization="int8")
+    for i in range(4):
+        store.upsert(_records(5 * (i + 1), dim))
+        store.flush()
+    snapshots = sorted((tmp_path / "snapshots").iterdir())
+    # Older snapshots are pruned, the current one has every file at the same length
+    assert len(snapshots) == 2
+    assert (tmp_path / "CURRENT").read_text() == snapshots[-1].name
+    assert {len(np.load(snapshots[-1] / name)) for name in ("ids.npy", "vectors.npy", "codes.int8.npy")} == {20}
+
+
+def test_async_search_matches_sync():
+    import asyncio
+
+    dim = 8
+    store = NumpyVectorStore(dim=dim)
+    store.upsert(_records(50, dim))
+    query = store.get_vector(5)
+    assert asyncio.run(store.asearch(query, top_k=3)) == store.search(query, top_k=3)
+
+
+def test_numpy_store_filters_inside_search():
+    from elinity_ai.vector_store import tenant_vector_fields
+
+    dim = 4
+    profiles = [
+        {"personal_info": {"age": 29, "gender": "Female", "location": "Berlin, Germany"}, "friendship_preferences": {"seeking": "hiking buddies"}},
+        {"personal_info": {"age": 41, "gender": "female", "location": "Berlin"}, "friendship_preferences": {"seeking": "chess"}},
+        {"personal_info": {"age": 30, "gender": "male", "location": "Berlin"}, "intentions": {"social": "yes"}},
+        {"personal_info": {"age": 33, "gender": "female", "location": "Paris"}, "intentions": {"social": "yes"}},
+    ]
+    store = NumpyVectorStore(dim=dim)
+    store.upsert([
+        {"id": i, "vector": np.ones(dim), **tenant_vector_fields(profile)}
+        for i, profile in enumerate(profiles, start=1)
+    ])
+
+    filters = {"min_age": 25, "max_age": 35, "gender": "Female", "location": "berlin", "seeking": "friendship"}
+    assert [r["id"] for r in store.search(np.ones(dim), top_k=4, filters=filters)] == [1]
+    assert {r["id"] for r in store.search(np.ones(dim), top_k=4, filters={"location": "Berlin"})} == {1, 2, 3}
+
+
+def test_milvus_filter_expression():
+    from elinity_ai.vector_store._fields import normalize_filters, to_milvus_expr
+
+    expr = to_milvus_expr(normalize_filters({"min_age": 25, "gender": 'fe"male', "seeking": "romantic", "max_age": None}), [7, 9])
+    assert expr == 'age >= 25 and gender == "female" and seeking_romantic == true and id not in [7, 9]'
+
+
+def test_numpy_store_quantized_search_rescores_exactly(tmp_path):
+    dim = 64
+    records = _records(500, dim, seed=3)
+    matrix = np.array([r["vector"] for r in records])
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+
+    for quantization in ("float16", "int8", "binary"):
+        store = NumpyVectorStore(path=str(tmp_path / quantization), dim=dim, quantization=quantization, rescore_factor=8)
+        store.upsert(records)
+        store.flush()
+        reloaded = NumpyVectorStore(path=str(tmp_path / quantization), dim=dim, quantization=quantization)
+        assert reloaded._codes is not None
+
+        for candidate in (store, reloaded):
+            query = records[42]["vector"]
+            results = candidate.search(query, top_k=5, exclude_ids=[1])
+            assert results[0]["id"] == 43
+            # Returned scores are the exact cosine, not the approximation
+            expected = matrix @ (query / np.linalg.norm(query))
+            assert np.isclose(results[1]["score"], expected[results[1]["id"] - 1], atol=1e-5)
+
+
+def test_milvus_upsert_by_id_chunks_and_dedupes():
+    import pytest
+    pytest.importorskip("pymilvus")
+    from elinity_ai.vector_store import upsert_by_id
+
+    class FakeClient:
+        def __init__(self):
+            self.requests = []
+
+        def upsert(self, collection_name, data):
+            self.requests.append([row["id"] for row in data])
+            return {"upsert_count": len(data)}
+
+    client = FakeClient()
+    records = [{"id": i % 5, "vector": [float(i)]} for i in range(8)]
+    assert upsert_by_id(client, "tenants", records, batch_size=2) == 5
+    assert client.requests == [[0, 1], [2, 3], [4]]
+
+
+def test_milvus_quantized_index_needs_milvus_2_6(monkeypatch):
+    import pytest
+    pymilvus = pytest.importorskip("pymilvus")
+    from elinity_ai.vector_store._milvus_store import MilvusVectorStore
+
+    class FakeClient:
+        server_version = "v2.5.4"
+
+        def get_server_version(self):
+            return self.server_version
+
+    store = object.__new__(MilvusVectorStore)
+    store.client, store._uri, store.index_params = FakeClient(), "http://milvus:19530", {"M": 16, "efConstruction": 200}
+    monkeypatch.setattr(pymilvus, "__version__", "2.6.0")
+
+    store.quantization = "none"
+    assert store._vector_index()[0] == "HNSW"
+    for quantization in ("int8", "binary"):
+        store.quantization = quantization
+        with pytest.raises(RuntimeError, match="needs a Milvus 2.6 server"):
+            store._vector_index()
+
+    store.client.server_version = "v2.6.1"
+    assert store._vector_index()[0] == "IVF_RABITQ"
+    monkeypatch.setattr(pymilvus, "__version__", "2.5.10")
+    with pytest.raises(RuntimeError, match="needs pymilvus>=2.6"):
+        store._vector_index()
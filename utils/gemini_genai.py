@@ -5,6 +5,7 @@ import requests
 from dotenv import load_dotenv
 import google.generativeai as genai
 from pydantic import ValidationError
+from elinity_ai.llm_gateway import get_llm_gateway
 
 # Use Elinity-AI schema (camelCase aliases)
 from schemas.user import User
@@ -13,12 +14,9 @@ from schemas.user import User
 load_dotenv()
 
 
-def configure_genai(custom_api_key=None):
-    """Configure Gemini with API key."""
-    api_key = custom_api_key or os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        raise ValueError("No API key provided. Set GOOGLE_API_KEY in .env or pass a custom key.")
-    genai.configure(api_key=api_key)
+def configure_genai():
+    """Configure Gemini with GOOGLE_API_KEY; the gateway does it once per process."""
+    get_llm_gateway()
     return genai
 
 
@@ -52,12 +50,9 @@ def transform_for_backend(profile: dict) -> dict:
 
 
 class GeminiGenAIClient:
-    def __init__(self, api_key=None, model_name="gemini-2.0-flash"):
-        self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
-        if not self.api_key:
-            raise ValueError("No API key provided. Set GOOGLE_API_KEY in .env or pass a custom key.")
-        genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel(model_name)
+    def __init__(self, model_name="gemini-2.0-flash"):
+        # Calls go through the shared LLM gateway, configured from GOOGLE_API_KEY
+        self.model_name = model_name
 
     def _clean_json_text(self, raw: str) -> str:
         """Strip ```json fences / markdown and extract first { ... } block."""
@@ -91,8 +86,7 @@ class GeminiGenAIClient:
                 f"{conversation_text}\n\n"
                 "Respond with JSON only."
             )
-            response = self.model.generate_content(prompt)
-            raw = (response.text or "").strip()
+            raw = (get_llm_gateway().generate(prompt, self.model_name) or "").strip()
             print("Raw Gemini response:", raw)
 
             json_str = self._clean_json_text(raw)